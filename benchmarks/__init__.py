@@ -0,0 +1 @@
+"""Benchmarks for the microgrid simulation and the NEAT pipeline. Run the modules with `python -m benchmarks.<name>`."""
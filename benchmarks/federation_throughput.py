@@ -0,0 +1,100 @@
+"""
+Throughput benchmark of microgrid_sim.federation over the number of grids and worker processes.
+
+Measures the federation steps per second (each stepping all the grids and settling them) and the
+construction time, and writes the results as CSV and JSON.
+
+Example:
+    python -m benchmarks.federation_throughput --grids 4 16 --workers 0 4 --steps 48
+"""
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from benchmarks.utils import write_results
+from microgrid_sim.environment import NUM_ACTIONS
+from microgrid_sim.federation import get_default_federation
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+START_IDX = 25
+
+
+@dataclass(slots=True)
+class FederationResult:
+    num_grids: int
+    workers: int
+    num_tcls: int
+    num_households: int
+    num_steps: int
+    construction_s: float
+    step_mean_ms: float
+    steps_per_s: float
+    grid_steps_per_s: float
+
+
+def run_case(
+    num_grids: int, workers: int, num_tcls: int, num_households: int, num_steps: int, data_path: str, seed: int
+) -> FederationResult:
+    start_t = time.perf_counter()
+    federation = get_default_federation(
+        data_path, START_IDX, num_grids, num_tcls, num_households, seed=seed, num_workers=workers
+    )
+    try:
+        federation.get_states()  # the workers have constructed their grids
+        construction_t = time.perf_counter() - start_t
+
+        actions = np.random.default_rng(seed).integers(0, NUM_ACTIONS, (num_steps, num_grids))
+        start_t = time.perf_counter()
+        for action_indices in actions:
+            federation.step_idx(action_indices)
+        step_t = time.perf_counter() - start_t
+    finally:
+        federation.close()
+
+    return FederationResult(
+        num_grids=num_grids,
+        workers=workers,
+        num_tcls=num_tcls,
+        num_households=num_households,
+        num_steps=num_steps,
+        construction_s=construction_t,
+        step_mean_ms=step_t / num_steps * 1e3,
+        steps_per_s=num_steps / step_t,
+        grid_steps_per_s=num_steps * num_grids / step_t,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grids", type=int, nargs="+", default=[4, 16])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, os.cpu_count() or 1],
+                        help="Numbers of worker processes, 0 steps the grids in the main process.")
+    parser.add_argument("--tcls", type=int, default=100)
+    parser.add_argument("--households", type=int, default=150)
+    parser.add_argument("--steps", type=int, default=48)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--output", default=os.path.join("benchmark_results", "federation_throughput"))
+    args = parser.parse_args()
+
+    results = []
+    for num_grids in args.grids:
+        for workers in args.workers:
+            result = run_case(
+                num_grids, workers, args.tcls, args.households, args.steps, args.data_path, args.seed
+            )
+            print(
+                f"grids: {num_grids:>4}  workers: {workers:>3}  construction: {result.construction_s:7.2f} s  "
+                f"step: {result.step_mean_ms:8.2f} ms  grid steps/s: {result.grid_steps_per_s:9.1f}"
+            )
+            results.append(result)
+    write_results(results, args.output)
+    print(f"Results written to {args.output}.csv and {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
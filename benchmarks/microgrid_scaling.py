@@ -0,0 +1,162 @@
+"""
+Scaling benchmark for the microgrid simulation over the number of TCLs and households.
+
+Measures reset latency (construction of the Environment), per-step latency and memory usage
+for each simulation backend and writes the results as CSV and JSON.
+
+Example:
+    python -m benchmarks.microgrid_scaling --tcl-counts 10 1000 100000 --household-counts 10 1000 100000
+"""
+
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass
+from random import Random
+from statistics import mean, median
+from typing import Any, Callable
+
+from benchmarks.utils import write_results
+from microgrid_sim.environment import Environment, get_default_microgrid_params, NUM_ACTIONS
+
+
+DEFAULT_COUNTS = [10, 100, 1000, 10000, 100000]
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+START_IDX = 25
+
+
+def _object_model(_params: dict[str, dict[str, Any]]) -> None:
+    """The default per-device object model, no changes to the parameters."""
+
+
+def _aggregate_tcl_model(params: dict[str, dict[str, Any]]) -> None:
+    """The TCLs as a population histogram (AggregateTCLAggregator), households as objects."""
+    params["tcl_params"]["model"] = "aggregate"
+
+
+# Simulation backends to benchmark: name -> function that modifies the default parameters to select the backend.
+BACKENDS: dict[str, Callable[[dict[str, dict[str, Any]]], None]] = {
+    "object": _object_model,
+    "aggregate": _aggregate_tcl_model,
+}
+
+
+@dataclass(slots=True)
+class ScalingResult:
+    backend: str
+    num_tcls: int
+    num_households: int
+    num_steps: int
+    reset_mean_s: float
+    reset_median_s: float
+    step_mean_s: float
+    step_median_s: float
+    step_p95_s: float
+    steps_per_s: float
+    memory_current_mb: float
+    memory_peak_mb: float
+
+
+def _create_environment(backend: str, num_tcls: int, num_households: int, data_path: str) -> Environment:
+    params = get_default_microgrid_params(data_path, num_tcls, num_households)
+    BACKENDS[backend](params)
+    prices_and_temps_path = os.path.join(data_path, "default_price_and_temperatures.npy")
+    return Environment(params, prices_and_temps_path, START_IDX)
+
+
+def _measure_resets(backend: str, num_tcls: int, num_households: int, data_path: str, repeats: int) -> list[float]:
+    times = []
+    for _ in range(repeats):
+        start_t = time.perf_counter()
+        _create_environment(backend, num_tcls, num_households, data_path)
+        times.append(time.perf_counter() - start_t)
+    return times
+
+
+def _measure_memory(backend: str, num_tcls: int, num_households: int, data_path: str) -> tuple[float, float]:
+    """Returns memory retained by a new environment and the peak memory during its construction, in MB."""
+    gc.collect()
+    tracemalloc.start()
+    env = _create_environment(backend, num_tcls, num_households, data_path)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del env
+    return current / 2 ** 20, peak / 2 ** 20
+
+
+def _measure_steps(env: Environment, num_steps: int, seed: int) -> list[float]:
+    rng = Random(seed)
+    times = []
+    for _ in range(num_steps):
+        action_idx = rng.randrange(NUM_ACTIONS)
+        start_t = time.perf_counter()
+        env.step_idx(action_idx)
+        times.append(time.perf_counter() - start_t)
+    return times
+
+
+def run_case(
+    backend: str, num_tcls: int, num_households: int, num_steps: int, num_resets: int, data_path: str, seed: int
+) -> ScalingResult:
+    """Benchmark a single (backend, number of TCLs, number of households) combination."""
+    reset_times = _measure_resets(backend, num_tcls, num_households, data_path, num_resets)
+    memory_current, memory_peak = _measure_memory(backend, num_tcls, num_households, data_path)
+    env = _create_environment(backend, num_tcls, num_households, data_path)
+    step_times = _measure_steps(env, num_steps, seed)
+    step_times_sorted = sorted(step_times)
+    return ScalingResult(
+        backend=backend,
+        num_tcls=num_tcls,
+        num_households=num_households,
+        num_steps=num_steps,
+        reset_mean_s=mean(reset_times),
+        reset_median_s=median(reset_times),
+        step_mean_s=mean(step_times),
+        step_median_s=median(step_times),
+        step_p95_s=step_times_sorted[min(len(step_times) - 1, int(0.95 * len(step_times)))],
+        steps_per_s=len(step_times) / sum(step_times),
+        memory_current_mb=memory_current,
+        memory_peak_mb=memory_peak,
+    )
+
+
+def get_cases(tcl_counts: list[int], household_counts: list[int], grid: bool) -> list[tuple[int, int]]:
+    """Pairs the counts element-wise, or forms all combinations if grid is True."""
+    if grid:
+        return [(n_tcls, n_households) for n_tcls in tcl_counts for n_households in household_counts]
+    if len(tcl_counts) != len(household_counts):
+        raise ValueError("TCL and household counts must have equal lengths unless a grid sweep is used.")
+    return list(zip(tcl_counts, household_counts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tcl-counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument("--household-counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument("--grid", action="store_true", help="Benchmark all combinations of the counts.")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--steps", type=int, default=24, help="Number of timesteps per case.")
+    parser.add_argument("--resets", type=int, default=3, help="Number of environment constructions per case.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--output", default=os.path.join("benchmark_results", "microgrid_scaling"))
+    args = parser.parse_args()
+
+    results = []
+    for backend in args.backends:
+        for num_tcls, num_households in get_cases(args.tcl_counts, args.household_counts, args.grid):
+            result = run_case(backend, num_tcls, num_households, args.steps, args.resets, args.data_path, args.seed)
+            print(
+                f"{backend:>8}  TCLs: {num_tcls:>7}  households: {num_households:>7}  "
+                f"reset: {result.reset_mean_s * 1000:9.2f} ms  step: {result.step_mean_s * 1000:9.3f} ms  "
+                f"memory: {result.memory_current_mb:8.2f} MB (peak {result.memory_peak_mb:8.2f} MB)"
+            )
+            results.append(result)
+    write_results(results, args.output)
+    print(f"Results written to {args.output}.csv and {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+End-to-end generation throughput benchmark for the NEAT pipeline of main.py.
+
+Runs a fixed number of generations of evaluate -> history bookkeeping -> reproduce -> speciate
+with fixed seeds for several population sizes and worker counts, using either a mock (random)
+fitness function or the real Grid-v0 fitness function of main.py. Reports wall time per phase,
+genomes per second and environment steps per second, and writes the results as CSV and JSON.
+
+Example:
+    python -m benchmarks.neat_throughput --fitness mock grid --population-sizes 50 150 --workers 1 4
+"""
+
+import argparse
+import os
+import random
+from dataclasses import dataclass
+from math import inf
+from multiprocessing import Pool
+from typing import Callable
+
+import main as grid_main
+from benchmarks.utils import write_results
+from neat.evolution import Evolution
+from neat.metrics import MetricsRecorder
+from neat.genetics.genome import Genome
+
+
+@dataclass(slots=True)
+class ThroughputResult:
+    fitness: str
+    population_size: int
+    workers: int
+    generations: int
+    evaluated_genomes: int
+    env_steps: int
+    evaluation_s: float
+    history_s: float
+    reproduction_s: float
+    speciation_s: float
+    total_s: float
+    genomes_per_s: float
+    env_steps_per_s: float
+
+
+def _mock_fitness_function(seed: int) -> Callable[[list[tuple[int, Genome]]], int]:
+    """Random fitness, reproducible per genome regardless of evaluation order. Returns number of env steps."""
+    def fitness_function(genomes: list[tuple[int, Genome]]) -> int:
+        for idx, genome in genomes:
+            genome.fitness = random.Random(seed * 1_000_003 + idx).random()
+        return 0
+    return fitness_function
+
+
+def _grid_fitness_function(pool: Pool) -> Callable[[list[tuple[int, Genome]]], int]:
+    """The real Grid-v0 fitness of main.py evaluated in the given pool. Returns number of env steps."""
+    def fitness_function(genomes: list[tuple[int, Genome]]) -> int:
+        results = pool.map(grid_main.evaluate_genome, genomes)
+        for (_, genome), (_, fitness) in zip(genomes, results):
+            genome.fitness = fitness
+        return len(genomes) * grid_main.NUM_EPISODES * grid_main.EPISODE_LENGTH
+    return fitness_function
+
+
+def run_case(fitness: str, population_size: int, workers: int, generations: int, seed: int) -> ThroughputResult:
+    """
+    Run the given number of generations and collect the phase timings from Evolution.run.
+    The evolution is seeded, and the grid episodes are seeded per genome (see main.get_episode_seeds),
+    so the evolved genomes are the same for any number of workers.
+    """
+    evolution = Evolution(
+        8, 80, grid_main.get_neat_params(population_size), grid_main.species_fitness_function, seed=seed
+    )
+
+    pool = None
+    if fitness == "grid":
+        pool = Pool(workers)
+        fitness_function = _grid_fitness_function(pool)
+    else:
+        fitness_function = _mock_fitness_function(seed)
+
+    metrics = MetricsRecorder()
+    try:
+        evolution.run(fitness_function, fitness_goal=inf, n=generations, metrics=metrics)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    evaluation_time = metrics.get_total_time("evaluation")
+    timings = [evaluation_time] + [metrics.get_total_time(p) for p in ("history", "reproduction", "speciation")]
+    total = sum(timings)
+    evaluated_genomes = sum(record.population_size for record in metrics.records)
+    env_steps = metrics.get_total_env_steps()
+    return ThroughputResult(
+        fitness=fitness,
+        population_size=population_size,
+        workers=workers if pool is not None else 1,
+        generations=generations,
+        evaluated_genomes=evaluated_genomes,
+        env_steps=env_steps,
+        evaluation_s=evaluation_time,
+        history_s=timings[1],
+        reproduction_s=timings[2],
+        speciation_s=timings[3],
+        total_s=total,
+        genomes_per_s=evaluated_genomes / total,
+        env_steps_per_s=env_steps / evaluation_time if env_steps else 0.0,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fitness", nargs="+", default=["mock", "grid"], choices=["mock", "grid"])
+    parser.add_argument("--population-sizes", type=int, nargs="+", default=[50, 150])
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count() or 1])
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join("benchmark_results", "neat_throughput"))
+    args = parser.parse_args()
+
+    results = []
+    for fitness in args.fitness:
+        worker_counts = args.workers if fitness == "grid" else [1]
+        for population_size in args.population_sizes:
+            for workers in worker_counts:
+                result = run_case(fitness, population_size, workers, args.generations, args.seed)
+                print(
+                    f"{fitness:>4}  population: {population_size:>5}  workers: {result.workers:>3}  "
+                    f"eval: {result.evaluation_s:8.3f} s  history: {result.history_s:8.3f} s  "
+                    f"repro: {result.reproduction_s:8.3f} s  speciation: {result.speciation_s:8.3f} s  "
+                    f"genomes/s: {result.genomes_per_s:9.1f}  env steps/s: {result.env_steps_per_s:9.1f}"
+                )
+                results.append(result)
+    write_results(results, args.output)
+    print(f"Results written to {args.output}.csv and {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
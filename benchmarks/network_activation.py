@@ -0,0 +1,115 @@
+"""
+Micro-benchmark of the network phenotypes of neat.nn.
+
+Grows genomes of the size used in main.py (8 inputs, 80 outputs) with the given number of added hidden
+nodes, and measures the build time and the single-input activations per second of each phenotype
+(and evaluation method, e.g. the argmax-only path used for action selection).
+
+Example:
+    python -m benchmarks.network_activation --hidden-nodes 0 10 50 --activations 2000
+"""
+
+import argparse
+import os
+import random
+from dataclasses import dataclass
+from itertools import count
+from time import perf_counter
+from typing import Any, Callable
+
+from benchmarks.utils import write_results
+from neat.genetics.genome import Genome, WeightOptions, MutationParams, Innovations
+from neat.nn.compiled import CompiledNetwork
+from neat.nn.pruning import get_effective_topology
+from neat.nn.recurrent import RecurrentNetwork
+
+NUM_INPUTS = 8
+NUM_OUTPUTS = 80
+
+# Name: (phenotype constructor, name of the evaluation method)
+PHENOTYPES: dict[str, tuple[Callable[[Genome], Any], str]] = {
+    "recurrent": (RecurrentNetwork.create, "activate"),
+    "recurrent-argmax": (RecurrentNetwork.create, "activate_argmax"),
+    "compiled": (CompiledNetwork.create, "activate"),
+}
+
+
+@dataclass(slots=True)
+class ActivationResult:
+    phenotype: str
+    hidden_nodes: int
+    enabled_connections: int
+    evaluated_connections: int
+    build_ms: float
+    activations: int
+    activations_per_s: float
+
+
+def get_genome(hidden_nodes: int, seed: int) -> Genome:
+    """Minimal genome grown by the given number of add node mutations (and twice as many add connection mutations)."""
+    rng = random.Random(seed)
+    options = WeightOptions(0.0, 2.0, 0.03, -10.0, 10.0)
+    genome = Genome.create_new(1, NUM_INPUTS, NUM_OUTPUTS, options, options, rng=rng)
+    params = MutationParams(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, options, options)
+    node_counter = count(NUM_INPUTS + NUM_OUTPUTS)
+    conn_counter = count(NUM_INPUTS * NUM_OUTPUTS + 1)  # after the innovations of Genome.create_new
+    for _ in range(hidden_nodes):
+        genome._mutate_add_node(node_counter, conn_counter, Innovations(), params, rng)
+        for _ in range(2):
+            genome._mutate_add_connection(conn_counter, Innovations(), options, rng)
+    return genome
+
+
+def run_case(phenotype: str, hidden_nodes: int, num_activations: int, seed: int) -> ActivationResult:
+    genome = get_genome(hidden_nodes, seed)
+    rng = random.Random(seed)
+    inputs = [[rng.gauss(0.0, 1.0) for _ in range(NUM_INPUTS)] for _ in range(num_activations)]
+
+    create, method = PHENOTYPES[phenotype]
+    start_t = perf_counter()
+    network = create(genome)
+    build_t = perf_counter() - start_t
+
+    activate = getattr(network, method)
+    start_t = perf_counter()
+    for x in inputs:
+        activate(x)
+    activation_t = perf_counter() - start_t
+
+    return ActivationResult(
+        phenotype=phenotype,
+        hidden_nodes=len(genome.nodes) - NUM_OUTPUTS,
+        enabled_connections=sum(1 for conn in genome.connections.values() if conn.enabled),
+        evaluated_connections=get_effective_topology(genome).stats.evaluated_connections,
+        build_ms=build_t * 1e3,
+        activations=num_activations,
+        activations_per_s=num_activations / activation_t,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phenotypes", nargs="+", default=list(PHENOTYPES), choices=list(PHENOTYPES))
+    parser.add_argument("--hidden-nodes", type=int, nargs="+", default=[0, 10, 50])
+    parser.add_argument("--activations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join("benchmark_results", "network_activation"))
+    args = parser.parse_args()
+
+    results = []
+    for hidden_nodes in args.hidden_nodes:
+        for phenotype in args.phenotypes:
+            result = run_case(phenotype, hidden_nodes, args.activations, args.seed)
+            print(
+                f"{phenotype:>16}  hidden nodes: {result.hidden_nodes:>4}  "
+                f"connections: {result.enabled_connections:>5} ({result.evaluated_connections:>5} evaluated)  "
+                f"build: {result.build_ms:8.2f} ms  "
+                f"activations/s: {result.activations_per_s:10.1f}"
+            )
+            results.append(result)
+    write_results(results, args.output)
+    print(f"Results written to {args.output}.csv and {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark of the price-level validation rules of microgrid_sim.components.pricing.
+
+Validates a random sequence of price levels over the base prices of the data with the cumulative rule, the
+rolling rule (scalar, and batched over several environments) and, as a reference, a rolling rule that re-sums
+a deque each step. Reports the time per validated level, the share of requested over-pricing levels that was
+allowed and the highest over-price of the window ending at an allowed over-pricing level (the rolling rule keeps
+it at most MAX_OVER_PRICE), and writes the results as CSV and JSON.
+
+Example:
+    python -m benchmarks.pricing_rules --steps 20000 --windows 24 168 --batch-sizes 16 256
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from benchmarks.utils import write_results
+from microgrid_sim.components.pricing import BatchRollingPricing, PricingManager, RollingPricingManager
+from microgrid_sim.data import Dataset
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+PRICE_INTERVAL = 0.0015
+MAX_OVER_PRICE = 0.029
+OVER_PRICING_THRESHOLD = 4
+
+
+@dataclass(slots=True)
+class PricingResult:
+    rule: str
+    window: int
+    batch_size: int
+    num_steps: int
+    validate_us: float  # per validated level
+    allowed_over_pricing: float  # share of the requested positive levels that were kept
+    max_window_over_price: float  # highest relative over-price of a full window ending at a positive level
+
+
+class _ResummingPricing:
+    """The rolling rule with deques which are re-summed on each step, for reference."""
+
+    def __init__(self, window: int):
+        self._prices = deque(maxlen=window)
+        self._levels = deque(maxlen=window)
+
+    def validate_price_level(self, price_level: int, base_price: float) -> int:
+        prices = list(self._prices)[1:] if len(self._prices) == self._prices.maxlen else list(self._prices)
+        levels = list(self._levels)[1:] if len(self._levels) == self._levels.maxlen else list(self._levels)
+        over_price = (sum(levels) + price_level) * PRICE_INTERVAL
+        if price_level > 0 and over_price > MAX_OVER_PRICE * (sum(prices) + base_price):
+            price_level = 0
+        self._prices.append(base_price)
+        self._levels.append(price_level)
+        return price_level
+
+
+def _get_window_over_prices(prices: np.ndarray, levels: np.ndarray, window: int) -> np.ndarray:
+    """Relative over-prices of the average prices of the full windows, by their last timestep, for each column."""
+    kernel = np.ones(window)
+    over = np.apply_along_axis(lambda column: np.convolve(column, kernel, "valid"), 0, levels * PRICE_INTERVAL)
+    base = np.apply_along_axis(lambda column: np.convolve(column, kernel, "valid"), 0, prices)
+    return over / base
+
+
+def _run_scalar(validate: Callable[[int, float], int], requested: list[int], prices: list[float]) -> tuple[float, list]:
+    start_t = time.perf_counter()
+    levels = [validate(level, price) for level, price in zip(requested, prices)]
+    return time.perf_counter() - start_t, levels
+
+
+def run_case(rule: str, window: int, batch_size: int, base_prices: np.ndarray, num_steps: int, seed: int):
+    rng = np.random.default_rng(seed)
+    requested = rng.integers(-2, 3, (num_steps, batch_size))
+    starts = rng.integers(0, len(base_prices) - num_steps, batch_size)
+    prices = base_prices[starts + np.arange(num_steps)[:, np.newaxis]]
+
+    if rule == "batch_rolling":
+        batch = BatchRollingPricing(batch_size, PRICE_INTERVAL, MAX_OVER_PRICE, window)
+        start_t = time.perf_counter()
+        levels = np.array([batch.validate_price_levels(requested[step], prices[step]) for step in range(num_steps)])
+        total_t = time.perf_counter() - start_t
+    else:
+        total_t = 0.0
+        columns = []
+        for env in range(batch_size):
+            if rule == "cumulative":
+                manager = PricingManager(OVER_PRICING_THRESHOLD)
+            elif rule == "rolling":
+                manager = RollingPricingManager(PRICE_INTERVAL, MAX_OVER_PRICE, window)
+            else:
+                manager = _ResummingPricing(window)
+            env_t, env_levels = _run_scalar(
+                manager.validate_price_level, requested[:, env].tolist(), prices[:, env].tolist()
+            )
+            total_t += env_t
+            columns.append(env_levels)
+        levels = np.array(columns).T
+
+    positive = requested > 0
+    return PricingResult(
+        rule=rule,
+        window=window,
+        batch_size=batch_size,
+        num_steps=num_steps,
+        validate_us=total_t / (num_steps * batch_size) * 1e6,
+        allowed_over_pricing=float(np.mean(levels[positive] > 0)),
+        max_window_over_price=float(np.max(
+            _get_window_over_prices(prices, levels, window)[levels[window - 1:] > 0], initial=0.0
+        )),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--windows", type=int, nargs="+", default=[24, 168])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 256])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--output", default=os.path.join("benchmark_results", "pricing_rules"))
+    args = parser.parse_args()
+
+    # Base prices of the households per kWh, as validated by HouseholdsManager
+    base_prices = np.asarray(Dataset.from_directory(args.data_path).load().base_prices) / 100
+    cases = [("cumulative", 24, 1)]
+    for window in args.windows:
+        cases += [("resumming", window, 1), ("rolling", window, 1)]
+        cases += [("batch_rolling", window, batch_size) for batch_size in args.batch_sizes]
+
+    results = []
+    for rule, window, batch_size in cases:
+        result = run_case(rule, window, batch_size, base_prices, args.steps, args.seed)
+        print(
+            f"{rule:>14}  window: {window:>4}  batch: {batch_size:>5}  validate: {result.validate_us:7.3f} us  "
+            f"allowed over-pricing: {result.allowed_over_pricing * 100:6.2f} %  "
+            f"max window over-price: {result.max_window_over_price * 100:6.2f} %"
+        )
+        results.append(result)
+    write_results(results, args.output)
+    print(f"Results written to {args.output}.csv and {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Throughput benchmark of microgrid_sim.scenarios against the simulation that consumes the scenarios.
+
+For each scenario length, measures the time to generate a scenario (cache miss), to get a cached one (hit), and
+to create and simulate an environment over the whole scenario, and writes the results as CSV and JSON.
+
+Example:
+    python -m benchmarks.scenario_generation --lengths 240 2400 --scenarios 200
+"""
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from benchmarks.utils import write_results
+from microgrid_sim.data import Dataset
+from microgrid_sim.environment import NUM_ACTIONS, get_microgrid_env
+from microgrid_sim.scenarios import ScenarioGenerator
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+@dataclass(slots=True)
+class ScenarioResult:
+    length: int
+    num_scenarios: int
+    block_length: int
+    generate_ms: float
+    cached_us: float
+    simulate_ms: float
+    generate_share: float  # of generating and simulating a scenario
+
+
+def run_case(
+    dataset: Dataset, length: int, num_scenarios: int, block_length: int, simulated: int, seed: int
+) -> ScenarioResult:
+    generator = ScenarioGenerator.from_dataset(
+        dataset, length, num_scenarios, block_length=block_length, seed=seed, maxsize=num_scenarios
+    )
+    start_t = time.perf_counter()
+    for idx in range(num_scenarios):
+        generator.get_scenario(idx)
+    generate_t = (time.perf_counter() - start_t) / num_scenarios
+
+    start_t = time.perf_counter()
+    for idx in range(num_scenarios):
+        generator.get_scenario(idx)
+    cached_t = (time.perf_counter() - start_t) / num_scenarios
+
+    actions = np.random.default_rng(seed).integers(0, NUM_ACTIONS, length).tolist()
+    start_t = time.perf_counter()
+    for idx in range(simulated):
+        env = get_microgrid_env(dataset, 0, seed=seed, data=generator.get_scenario(idx))
+        for action_idx in actions:
+            env.step_idx(action_idx)
+    simulate_t = (time.perf_counter() - start_t) / simulated
+
+    return ScenarioResult(
+        length=length,
+        num_scenarios=num_scenarios,
+        block_length=block_length,
+        generate_ms=generate_t * 1e3,
+        cached_us=cached_t * 1e6,
+        simulate_ms=simulate_t * 1e3,
+        generate_share=generate_t / (generate_t + simulate_t),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[24, 240, 2400])
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--block-length", type=int, default=24)
+    parser.add_argument("--simulated", type=int, default=2, help="Number of scenarios to simulate for timing.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--output", default=os.path.join("benchmark_results", "scenario_generation"))
+    args = parser.parse_args()
+
+    dataset = Dataset.from_directory(args.data_path)
+    results = []
+    for length in args.lengths:
+        result = run_case(dataset, length, args.scenarios, args.block_length, args.simulated, args.seed)
+        print(
+            f"length: {length:>6}  generate: {result.generate_ms:8.3f} ms  cached: {result.cached_us:6.2f} us  "
+            f"simulate: {result.simulate_ms:10.2f} ms  generation share: {result.generate_share * 100:6.3f} %"
+        )
+        results.append(result)
+    write_results(results, args.output)
+    print(f"Results written to {args.output}.csv and {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Validation of the aggregate TCL model against the per-device TCLAggregator.
+
+Drives both models with the same random sequence of TCL actions (the energies of Environment) and outdoor
+temperatures of the data, and reports the error of the aggregate state of charge and consumed energy,
+and the step times of both models, for several numbers of TCLs.
+
+Example:
+    python -m benchmarks.tcl_aggregate_validation --tcl-counts 100 1000 10000 --steps 336
+"""
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from benchmarks.utils import write_results
+from microgrid_sim.components.tcl_aggregate import AggregateTCLAggregator
+from microgrid_sim.components.tcl_aggregator import TCLAggregator, TCLParams
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+@dataclass(slots=True)
+class ValidationResult:
+    num_tcls: int
+    start_idx: int
+    num_steps: int
+    soc_mean_abs_error: float
+    soc_max_abs_error: float
+    device_energy: float
+    aggregate_energy: float
+    energy_relative_error: float
+    step_energy_mean_abs_error: float
+    device_step_ms: float
+    aggregate_step_ms: float
+
+
+def run_case(num_tcls: int, out_temps: np.ndarray, start_idx: int, num_steps: int, seed: int) -> ValidationResult:
+    device = TCLAggregator.from_params(TCLParams(num_tcls, out_temps), np.random.default_rng(seed))
+    aggregate = AggregateTCLAggregator.from_params(TCLParams(num_tcls, out_temps, model="aggregate"))
+    # Same energies as Environment._get_tcl_energy
+    tcl_actions = np.random.default_rng(seed + 1).integers(0, 4, num_steps)
+    energies = num_tcls * 1.5 * tcl_actions / 3
+
+    soc_errors = []
+    device_energies = []
+    aggregate_energies = []
+    device_t = aggregate_t = 0.0
+    for step, energy in enumerate(energies.tolist()):
+        start_t = time.perf_counter()
+        device_energies.append(device.allocate_energy(energy, start_idx + step))
+        device_t += time.perf_counter() - start_t
+        start_t = time.perf_counter()
+        aggregate_energies.append(aggregate.allocate_energy(energy, start_idx + step))
+        aggregate_t += time.perf_counter() - start_t
+        soc_errors.append(abs(aggregate.get_state_of_charge() - device.get_state_of_charge()))
+
+    device_energy = sum(device_energies)
+    aggregate_energy = sum(aggregate_energies)
+    return ValidationResult(
+        num_tcls=num_tcls,
+        start_idx=start_idx,
+        num_steps=num_steps,
+        soc_mean_abs_error=float(np.mean(soc_errors)),
+        soc_max_abs_error=float(np.max(soc_errors)),
+        device_energy=device_energy,
+        aggregate_energy=aggregate_energy,
+        energy_relative_error=(aggregate_energy - device_energy) / device_energy,
+        step_energy_mean_abs_error=float(np.mean(np.abs(np.subtract(aggregate_energies, device_energies)))),
+        device_step_ms=device_t / num_steps * 1e3,
+        aggregate_step_ms=aggregate_t / num_steps * 1e3,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tcl-counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--start-indices", type=int, nargs="+", default=[25, 2000, 6000])
+    parser.add_argument("--steps", type=int, default=24 * 7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--output", default=os.path.join("benchmark_results", "tcl_aggregate_validation"))
+    args = parser.parse_args()
+
+    out_temps = np.load(os.path.join(args.data_path, "default_price_and_temperatures.npy"))[:, 1]
+    results = []
+    for num_tcls in args.tcl_counts:
+        for start_idx in args.start_indices:
+            result = run_case(num_tcls, out_temps, start_idx, args.steps, args.seed)
+            print(
+                f"TCLs: {num_tcls:>7}  start: {start_idx:>6}  "
+                f"SoC error: {result.soc_mean_abs_error:7.4f} mean {result.soc_max_abs_error:7.4f} max  "
+                f"energy error: {result.energy_relative_error * 100:6.2f} %  "
+                f"step: {result.device_step_ms:8.3f} ms device {result.aggregate_step_ms:8.3f} ms aggregate"
+            )
+            results.append(result)
+    write_results(results, args.output)
+    print(f"Results written to {args.output}.csv and {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Throughput benchmark of the microgrid simulation over the timestep resolution (timesteps per hour).
+
+For each resolution, measures the time to interpolate the hourly data to the timestep (once per dataset), to create
+an environment on the interpolated data and to simulate the same hours with the same hourly actions, and writes the
+results as CSV and JSON. The cost of a timestep should stay about the same, so that simulating an hour costs about
+steps_per_hour times the hourly timestep, and the reward of the simulated hours should stay about the same.
+
+Example:
+    python -m benchmarks.timestep_resolution --steps-per-hour 1 4 12 --hours 168
+"""
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from benchmarks.utils import write_results
+from microgrid_sim.data import Dataset, SimulationData
+from microgrid_sim.environment import NUM_ACTIONS, get_microgrid_env
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+START_HOUR = 25
+
+
+@dataclass(slots=True)
+class ResolutionResult:
+    steps_per_hour: int
+    num_steps: int
+    resample_ms: float
+    construct_ms: float
+    step_us: float
+    step_cost_ratio: float  # per timestep, relative to the first resolution
+    simulated_hours_per_s: float
+    reward_per_hour: float
+
+
+def _measure_resample(data: SimulationData, steps_per_hour: int, repeats: int) -> tuple[float, SimulationData]:
+    start_t = time.perf_counter()
+    for _ in range(repeats):
+        resampled = data.resample(steps_per_hour)
+    return (time.perf_counter() - start_t) / repeats, resampled
+
+
+def run_case(
+    dataset: Dataset, steps_per_hour: int, hours: int, num_tcls: int, num_households: int, repeats: int, seed: int
+) -> ResolutionResult:
+    resample_t, data = _measure_resample(dataset.load(), steps_per_hour, repeats)
+    start_t = time.perf_counter()
+    for _ in range(repeats):
+        get_microgrid_env(
+            dataset, START_HOUR * steps_per_hour, num_tcls, num_households, seed, data, steps_per_hour=steps_per_hour
+        )
+    construct_t = (time.perf_counter() - start_t) / repeats
+
+    env = get_microgrid_env(
+        dataset, START_HOUR * steps_per_hour, num_tcls, num_households, seed, data, steps_per_hour=steps_per_hour
+    )
+    # The same action for all the timesteps of an hour, the same hourly actions for all the resolutions
+    actions = np.repeat(np.random.default_rng(seed).integers(0, NUM_ACTIONS, hours), steps_per_hour).tolist()
+    reward = 0.0
+    start_t = time.perf_counter()
+    for action_idx in actions:
+        reward += env.step_idx(action_idx)[1]
+    simulate_t = time.perf_counter() - start_t
+
+    return ResolutionResult(
+        steps_per_hour=steps_per_hour,
+        num_steps=len(actions),
+        resample_ms=resample_t * 1e3,
+        construct_ms=construct_t * 1e3,
+        step_us=simulate_t / len(actions) * 1e6,
+        step_cost_ratio=1.0,
+        simulated_hours_per_s=hours / simulate_t,
+        reward_per_hour=reward / hours,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps-per-hour", type=int, nargs="+", default=[1, 4, 12])
+    parser.add_argument("--hours", type=int, default=24 * 7, help="Number of simulated hours per resolution.")
+    parser.add_argument("--tcls", type=int, default=100)
+    parser.add_argument("--households", type=int, default=150)
+    parser.add_argument("--repeats", type=int, default=3, help="Number of interpolations and constructions timed.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--output", default=os.path.join("benchmark_results", "timestep_resolution"))
+    args = parser.parse_args()
+
+    dataset = Dataset.from_directory(args.data_path)
+    results = []
+    for steps_per_hour in args.steps_per_hour:
+        result = run_case(dataset, steps_per_hour, args.hours, args.tcls, args.households, args.repeats, args.seed)
+        result.step_cost_ratio = result.step_us / results[0].step_us if results else 1.0
+        print(
+            f"steps per hour: {steps_per_hour:>3}  resample: {result.resample_ms:7.2f} ms  "
+            f"construct: {result.construct_ms:7.2f} ms  step: {result.step_us:9.1f} us "
+            f"(x{result.step_cost_ratio:5.2f})  simulated hours: {result.simulated_hours_per_s:8.1f} /s  "
+            f"reward per hour: {result.reward_per_hour:8.3f}"
+        )
+        results.append(result)
+    write_results(results, args.output)
+    print(f"Results written to {args.output}.csv and {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Shared helpers for the benchmarks."""
+
+import csv
+import json
+import os
+from dataclasses import asdict, fields
+from typing import Any
+
+
+def write_results(results: list[Any], output_prefix: str) -> None:
+    """Write a list of result dataclasses to <output_prefix>.csv and <output_prefix>.json."""
+    directory = os.path.dirname(output_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    rows = [asdict(result) for result in results]
+    with open(f"{output_prefix}.csv", "w", newline="") as csv_file:
+        if results:
+            writer = csv.DictWriter(csv_file, fieldnames=[f.name for f in fields(results[0])])
+            writer.writeheader()
+            writer.writerows(rows)
+    with open(f"{output_prefix}.json", "w") as json_file:
+        json.dump(rows, json_file, indent=2)
@@ -4,8 +4,7 @@ V 0.1
 """
 import os
 import math
-from random import randint
-from typing import Optional, Union
+from typing import Optional, Sequence, Union
 
 import numpy as np
 
@@ -15,7 +14,11 @@ from gym.envs.registration import EnvSpec
 from gym.envs.classic_control import utils
 from gym.error import DependencyNotInstalled
 
-from microgrid_sim.environment import get_default_microgrid_env
+from microgrid_sim.data import Dataset
+from microgrid_sim.environment import get_microgrid_env, NUM_ACTIONS, NUM_STATE_VALUES
+from microgrid_sim.forecasts import ForecastParams
+from microgrid_sim.profiling import ComponentProfiler
+from microgrid_sim.scenarios import ScenarioGenerator
 
 
 class GridV0Env(gym.Env[np.ndarray, Union[int, np.ndarray]]):
@@ -30,13 +33,56 @@ class GridV0Env(gym.Env[np.ndarray, Union[int, np.ndarray]]):
         max_episode_steps=24,
     )
 
-    def __init__(self, max_total_steps: int):
+    def __init__(
+        self,
+        max_total_steps: int,
+        profiler: Optional[ComponentProfiler] = None,
+        datasets: Optional[Sequence[Dataset]] = None,
+        scenarios: Optional[ScenarioGenerator] = None,
+        forecast: Optional[ForecastParams] = None,
+        normalize: bool = False,
+        steps_per_hour: int = 1,
+    ):
+        """
+        :param max_total_steps: Number of timesteps of data reserved for each environment.
+        :param profiler: If given, the simulation calls are profiled into this profiler across resets.
+        :param datasets: Datasets to draw the episodes from (e.g. from a microgrid_sim.data.DatasetRegistry),
+            the one in the data folder of the project by default.
+        :param scenarios: If given, the episodes are drawn from its synthetic scenarios instead of the datasets.
+        :param forecast: If given, the forecasts of the next timesteps (see microgrid_sim.forecasts) are appended to
+            the float values of the observation.
+        :param normalize: If True, the observation is one float64 array of all the state values (and forecasts)
+            normalized by the statistics of the data, see Environment.get_normalized_observation.
+        :param steps_per_hour: Number of timesteps per hour, see Environment. The datasets are interpolated to the
+            timestep once here, and the scenarios when they are drawn.
+        """
         self._max_total_steps = max_total_steps
-
-        project_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-        self._data_path = os.path.join(project_dir, "data")
-        start_idx = randint(0, 14600 - self._max_total_steps)
-        self._env = get_default_microgrid_env(self._data_path, start_idx)
+        self._profiler = profiler
+        self._scenarios = scenarios
+        self._forecast = forecast
+        self._steps_per_hour = steps_per_hour
+        # The forecasts of the last timesteps need data after them.
+        self._reserved_steps = max_total_steps + (forecast.horizon if forecast is not None else 0)
+        assert scenarios is None or scenarios.length * steps_per_hour >= self._reserved_steps, "Too short scenarios"
+
+        if datasets is None:
+            project_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+            datasets = [Dataset.from_directory(os.path.join(project_dir, "data"))]
+        self._datasets = list(datasets)
+        self._data = None
+        if steps_per_hour != 1 and scenarios is None:
+            self._data = [dataset.load().resample(steps_per_hour) for dataset in self._datasets]
+            self._data_lengths = [len(data) for data in self._data]
+        else:
+            self._data_lengths = [dataset.get_length() * steps_per_hour for dataset in self._datasets]
+        self._series_stats = None
+        if normalize:
+            if scenarios is not None:
+                self._series_stats = [scenarios.get_source_stats()]
+            else:
+                self._series_stats = [dataset.get_series_stats() for dataset in self._datasets]
+        assert all(length >= self._reserved_steps for length in self._data_lengths), "Too short dataset"
+        self._env = self._get_microgrid_env()
         self.state = None
         self._step = 0
 
@@ -63,15 +109,24 @@ class GridV0Env(gym.Env[np.ndarray, Union[int, np.ndarray]]):
             ,
             dtype=np.float32,
         )
+        if forecast is not None:
+            # Forecasts of the up price, generated energy and out temperature, see Forecaster.
+            low = np.concatenate((low, np.repeat(low[[4, 3, 2]], forecast.horizon)))
+            high = np.concatenate((high, np.repeat(high[[4, 3, 2]], forecast.horizon)))
 
         max_steps = self.spec.max_episode_steps
-        self.observation_space = spaces.Tuple(
-            [
-                spaces.Box(low, high, dtype=np.float32),                   # float values (listed above)
-                spaces.Discrete(2 * max_steps + 5, start=-2 * max_steps),  # pricing counter
-                spaces.Discrete(24),                                       # hour of day
-            ]
-        )
+        if normalize:
+            # The state values (also the pricing counter and hour of day) followed by the forecasts
+            size = NUM_STATE_VALUES + (forecast.size if forecast is not None else 0)
+            self.observation_space = spaces.Box(-np.inf, np.inf, (size,), dtype=np.float64)
+        else:
+            self.observation_space = spaces.Tuple(
+                [
+                    spaces.Box(low, high, dtype=np.float32),                   # float values (listed above)
+                    spaces.Discrete(2 * max_steps + 5, start=-2 * max_steps),  # pricing counter
+                    spaces.Discrete(24),                                       # hour of day
+                ]
+            )
         self.action_space = spaces.MultiDiscrete([4, 5, 2, 2])
 
     def step(self, action: spaces.MultiDiscrete):
@@ -89,13 +144,34 @@ class GridV0Env(gym.Env[np.ndarray, Union[int, np.ndarray]]):
 
         action_tuple = (action[0], action[1] - 2, action[2], action[3])
         self.state, reward = self._env.step(action_tuple)
+        return self._get_step_return(reward)
 
+    def step_idx(self, action_idx: int):
+        """
+        Takes the action as a flat index (0..79) instead of sub actions, returns new state and reward.
+        The index is ordered as TCL action * 20 + price action * 4 + deficiency action * 2 + excess action.
+        """
+        assert 0 <= action_idx < NUM_ACTIONS, f"{action_idx!r} invalid"
+        assert self.state is not None, "Call reset before using step method."
+
+        self.state, reward = self._env.step_idx(action_idx)
+        return self._get_step_return(reward)
+
+    def _get_step_return(self, reward: float):
         self._step += 1
         terminated = self._step >= self.spec.max_episode_steps
         if self._step > self.spec.max_episode_steps:
             logger.warn("Called 'step()' on terminated environment!")
 
-        return (np.array(self.state[:6], dtype=np.float32), self.state[6], self.state[7]), reward, terminated, False, {}
+        return self._get_observation(), reward, terminated, False, {}
+
+    def _get_observation(self):
+        if self._series_stats is not None:
+            return self._env.get_normalized_observation(self.state)
+        values = np.array(self.state[:6], dtype=np.float32)
+        if self._forecast is not None:
+            values = np.concatenate((values, self._env.get_forecast().astype(np.float32)))
+        return values, self.state[6], self.state[7]
 
     def reset(
         self,
@@ -104,18 +180,46 @@ class GridV0Env(gym.Env[np.ndarray, Union[int, np.ndarray]]):
         options: Optional[dict] = None,
     ):
         """
-        Resets the environment to a starting state.
+        Resets the environment to a starting state. The start index and the microgrid are drawn from
+        self.np_random, so resetting with the same seed gives the same episode.
         """
         super().reset(seed=seed)
 
-        start_idx = randint(0, 14600 - self._max_total_steps)
-        self._env = get_default_microgrid_env(self._data_path, start_idx)
+        self._env = self._get_microgrid_env()
         self.state = None
         self._step = 0
 
         self.state = self._env.get_state()
 
-        return (np.array(self.state[:6], dtype=np.float32), self.state[6], self.state[7]), {}
+        return self._get_observation(), {}
+
+    def _get_microgrid_env(self):
+        """
+        New microgrid of a random scenario or dataset at a random start index, with all its randomness drawn from
+        self.np_random.
+        """
+        if self._scenarios is not None:
+            data = self._scenarios.get_scenario(int(self.np_random.integers(len(self._scenarios))))
+            data = data.resample(self._steps_per_hour)
+            start_idx = int(self.np_random.integers(0, len(data) - self._reserved_steps + 1))
+            env = get_microgrid_env(
+                self._datasets[0], start_idx, seed=int(self.np_random.integers(2 ** 63)), data=data,
+                forecast=self._forecast, normalization=self._series_stats[0] if self._series_stats else None,
+                steps_per_hour=self._steps_per_hour,
+            )
+        else:
+            dataset_idx = int(self.np_random.integers(len(self._datasets))) if len(self._datasets) > 1 else 0
+            start_idx = int(self.np_random.integers(0, self._data_lengths[dataset_idx] - self._reserved_steps + 1))
+            env = get_microgrid_env(
+                self._datasets[dataset_idx], start_idx, seed=int(self.np_random.integers(2 ** 63)),
+                data=self._data[dataset_idx] if self._data is not None else None,
+                forecast=self._forecast,
+                normalization=self._series_stats[dataset_idx] if self._series_stats else None,
+                steps_per_hour=self._steps_per_hour,
+            )
+        if self._profiler is not None:
+            env.attach_profiler(self._profiler)
+        return env
 
     def render(self):
         """
@@ -1,107 +1,130 @@
-from math import inf
+import argparse
 from multiprocessing import Pool
 import time
+from typing import Optional
 
 import gym
 import numpy as np
-from numpy.typing import ArrayLike
 
 import custom_envs.grid_v0
 
 from visuals import draw_species_graph
+from neat.checkpoint import Checkpointer, get_checkpoint_names, resume
 from neat.config import NeatParams
 from neat.evolution import Evolution
 from neat.genetics.genome import Genome
 from neat.nn.recurrent import RecurrentNetwork
+from neat.phenotype_cache import PhenotypeCache, CacheEntry, get_genome_hash
 
 
 def species_fitness_function(species_fitnesses: list[float]) -> float:
     return sum(species_fitnesses) / len(species_fitnesses)
 
 
-def evaluate_network(network: RecurrentNetwork) -> float:
-    num_days = 365
-    env = gym.make("Grid-v0", max_total_steps=24 * num_days)
+NUM_DAYS = 365
+NUM_EPISODES = 2
+EPISODE_LENGTH = 24
+MAX_EPISODES_PER_GENOME = 10  # unchanged genomes are re-evaluated (topped up) until this many episodes
 
-    num_episodes = 2
-    total_reward = 0.0
-
-    for episode in range(num_episodes):
-        step_count = 0
-        ep_reward = 0
-        terminated = False
-        state, _info = env.reset()
+PHENOTYPE_CACHE = PhenotypeCache(maxsize=1000)
 
-        while not terminated:
-            state_list = _state_to_network_input(state)
-            nn_output = network.activate(state_list)
-            action = _network_output_to_action(nn_output)
+NUM_GENERATIONS = 20
+SEED = 0  # master seed of the evolution and of the evaluation episodes
+CHECKPOINT_DIR = "checkpoints"  # an interrupted run is resumed from here with --resume, delete it to start a new run
 
-            next_state, reward, terminated, _, _info = env.step(action)
-            env.render()
-            step_count += 1
-            ep_reward += reward
-            state = next_state
-
-        total_reward += ep_reward / num_days
-    return total_reward / num_episodes
 
+def get_episode_seeds(genome_idx: int, first_episode: int, num_episodes: int) -> list[int]:
+    """
+    Seeds of the given episodes of a genome, derived from SEED. They do not depend on which worker evaluates the
+    episodes or when, so the fitnesses are reproducible regardless of the scheduling of the pool.
+    """
+    return [
+        int(np.random.SeedSequence(SEED, spawn_key=(genome_idx, episode)).generate_state(1)[0])
+        for episode in range(first_episode, first_episode + num_episodes)
+    ]
 
-def _state_to_network_input(state: tuple[ArrayLike, int, int]) -> list[float]:
-    floats, price_counter, hour = state
-    state_list = list(floats)
-    state_list.extend([float(price_counter), float(hour)])
 
-    # Normalize to mean = 0.0 and standard deviation = 1.0
-    state_list[0] = (state_list[0] - 0.5) * 3.0  # crude estimate of the correct values
-    state_list[1] = (state_list[1] - 0.5) * 3.0  # crude estimate of the correct values
-    state_list[2] = (state_list[2] - 7.289) / 8.947
-    state_list[3] = (state_list[3] - 498.91) / 385.17
-    state_list[4] = (state_list[4] - 43.48) / 36.96
-    state_list[5] = (state_list[5] - 0.5417) / 0.2971
-    state_list[6] = state_list[6] / 2.0  # crude estimate of the correct values
-    state_list[7] = (state_list[7] - 11.5) / 30.0  # should be enough that this scales close to linearly in sigmoid
+def evaluate_network(
+    network: RecurrentNetwork, num_episodes: int = NUM_EPISODES, seeds: Optional[list[int]] = None
+) -> float:
+    """
+    Runs the episodes in parallel (in lockstep), with one network state per episode, see activate_batch.
+    All the episodes have the same length.
 
-    return state_list
+    :param seeds: Seeds of the episodes' environments. Unseeded if None.
+    """
+    if seeds is None:
+        seeds = [None] * num_episodes
+    assert len(seeds) == num_episodes
+    envs = [
+        gym.make("Grid-v0", max_total_steps=EPISODE_LENGTH * NUM_DAYS, normalize=True) for _ in range(num_episodes)
+    ]
+    states = [env.reset(seed=seed)[0] for env, seed in zip(envs, seeds)]
+    network.reset()
 
+    total_reward = 0.0
+    terminated = False
+    while not terminated:
+        nn_inputs = np.stack(states)  # normalized observations, see Environment.get_normalized_observation
+        action_indices = network.activate_batch_argmax(nn_inputs)  # flat action indices (0..79), see step_idx
 
-def _network_output_to_action(nn_output: list[float]) -> ArrayLike:
-    max_idx = 0
-    max_val = -inf
-    for i, val in enumerate(nn_output):
-        if val > max_val:
-            max_val = val
-            max_idx = i
-    tcl_action = max_idx // 20
-    price_level = (max_idx - tcl_action * 20) // 4
-    def_action = (max_idx - tcl_action * 20 - price_level * 4) // 2
-    exc_action = (max_idx - tcl_action * 20 - price_level * 4) % 2
-    action = np.array([tcl_action, price_level, def_action, exc_action], dtype=np.int64)
-    return action
+        for i, env in enumerate(envs):
+            states[i], reward, terminated, _, _info = env.unwrapped.step_idx(int(action_indices[i]))
+            env.render()
+            total_reward += reward / NUM_DAYS
+    return total_reward / num_episodes
 
 
 def evaluate_genome(idx_genome: tuple[int, Genome]) -> tuple[int, float]:
     idx, genome = idx_genome
     nn = RecurrentNetwork.create(genome)
-    reward = evaluate_network(nn)
+    reward = evaluate_network(nn, NUM_EPISODES, get_episode_seeds(idx, 0, NUM_EPISODES))
     genome.fitness = reward
     return idx, reward
 
 
-def neat_fitness_function(genomes: list[tuple[int, Genome]]) -> None:
+def evaluate_phenotype(job: tuple[int, RecurrentNetwork, list[int]]) -> tuple[int, float]:
+    idx, network, seeds = job
+    return idx, evaluate_network(network, len(seeds), seeds)
+
+
+def neat_fitness_function(genomes: list[tuple[int, Genome]]) -> int:
+    """
+    Evaluate the genomes in parallel. Returns the number of environment steps simulated.
+
+    Phenotypes are cached by genome content, so genomes carried over unchanged are not rebuilt. Their fitness is
+    the mean over all their evaluated episodes, and they are only evaluated until MAX_EPISODES_PER_GENOME.
+    """
+    entries = {}
+    jobs = []
+    for idx, genome in genomes:
+        key = get_genome_hash(genome)
+        entry = PHENOTYPE_CACHE.get(key)
+        if entry is None:
+            entry = CacheEntry(RecurrentNetwork.create(genome))
+            PHENOTYPE_CACHE.put(key, entry)
+        entries[idx] = entry
+        if entry.num_episodes < MAX_EPISODES_PER_GENOME:
+            jobs.append((idx, entry.phenotype, get_episode_seeds(idx, entry.num_episodes, NUM_EPISODES)))
+
     with Pool() as pool:
-        results = pool.map(evaluate_genome, genomes)
+        results = pool.map(evaluate_phenotype, jobs)
 
-        for (idx_1, genome), (idx_2, fitness) in zip(genomes, results):
-            assert idx_1 == idx_2, "Genomes or their order changed!"
-            genome.fitness = fitness
-        best_idx, fitness = max(results, key=lambda x: x[1])
-        print(f"    Generation's best genome: {best_idx}, fitness: {fitness:.2f}")
+    for idx, fitness in results:
+        entries[idx].add_episodes(fitness * NUM_EPISODES, NUM_EPISODES)
+    for idx, genome in genomes:
+        genome.fitness = entries[idx].fitness
+    best_idx, best_genome = max(genomes, key=lambda x: x[1].fitness)
+    print(
+        f"    Generation's best genome: {best_idx}, fitness: {best_genome.fitness:.2f}, "
+        f"evaluated genomes: {len(jobs)}, phenotype cache hit rate: {PHENOTYPE_CACHE.get_hit_rate():.2f}"
+    )
+    return len(jobs) * NUM_EPISODES * EPISODE_LENGTH
 
 
-def main():
-    neat_config = NeatParams(
-        population_size=50,
+def get_neat_params(population_size: int = 50) -> NeatParams:
+    return NeatParams(
+        population_size=population_size,
 
         repro_survival_rate=0.1,    # What percentage of species' top members are used for reproduction
         min_species_size=2,
@@ -132,10 +155,48 @@ def main():
         bias_min_val=-10.0,
         bias_max_val=10.0,
     )
-    evolution = Evolution(8, 80, neat_config, species_fitness_function)
+
+
+def main(resume_run: bool = False):
+    """
+    :param resume_run: Continue the run of the latest checkpoint in CHECKPOINT_DIR, which must have been written
+        with the same NEAT parameters. The PHENOTYPE_CACHE entries of its genomes are restored, so their fitnesses
+        are topped up with the same episodes as without the interruption. Otherwise a new run is started, which
+        requires CHECKPOINT_DIR to have no checkpoints.
+    """
+    neat_config = get_neat_params()
+    if resume_run:
+        evolution = resume(
+            CHECKPOINT_DIR,
+            species_fitness_function,
+            neat_params=neat_config,
+            phenotype_cache=PHENOTYPE_CACHE,
+            create_phenotype=RecurrentNetwork.create,
+        )
+        if evolution.generation >= NUM_GENERATIONS:
+            raise ValueError(
+                f"The run in {CHECKPOINT_DIR} already finished its {NUM_GENERATIONS} generations, "
+                f"delete the directory to start a new run"
+            )
+        print(f"Resuming from the checkpoint of generation {evolution.generation} in {CHECKPOINT_DIR}")
+    else:
+        if get_checkpoint_names(CHECKPOINT_DIR):
+            raise FileExistsError(
+                f"{CHECKPOINT_DIR} has checkpoints of another run, resume it with --resume or delete the directory"
+            )
+        evolution = Evolution(8, 80, neat_config, species_fitness_function, seed=SEED)
 
     start_t = time.perf_counter()
-    winning_genome = evolution.run(neat_fitness_function, fitness_goal=10.0, n=20)
+    checkpointer = Checkpointer(CHECKPOINT_DIR, phenotype_cache=PHENOTYPE_CACHE)
+    try:
+        winning_genome = evolution.run(
+            neat_fitness_function,
+            fitness_goal=10.0,
+            n=NUM_GENERATIONS - evolution.generation,
+            checkpointer=checkpointer,
+        )
+    finally:
+        checkpointer.close()
 
     end_t = time.perf_counter()
     print(
@@ -146,4 +207,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--resume", action="store_true", help=f"Continue the interrupted run of the checkpoints in {CHECKPOINT_DIR}."
+    )
+    main(parser.parse_args().resume)
@@ -1,9 +1,13 @@
 from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
 
 from microgrid_sim.components.der import DER
 from microgrid_sim.components.ess import ESS
 from microgrid_sim.components.households import HouseholdsManager
 from microgrid_sim.components.main_grid import MainGrid
+from microgrid_sim.components.tcl_aggregate import AggregateTCLAggregator
 from microgrid_sim.components.tcl_aggregator import TCLAggregator
 from microgrid_sim.components.from_dict_factories import (
     get_tcl_aggregator_from_params_dict,
@@ -21,7 +25,7 @@ class Components:
     der: DER
     ess: ESS
     households_manager: HouseholdsManager
-    tcl_aggregator: TCLAggregator
+    tcl_aggregator: Union[TCLAggregator, AggregateTCLAggregator]
 
     def get_hour_of_day(self, idx: int) -> int:
         """Utility wrapper to simplify getting the hour of day."""
@@ -31,17 +35,28 @@ class Components:
         """Utility wrapper."""
         return self.tcl_aggregator.get_outdoor_temperature(idx)
 
+    def get_data_size(self) -> int:
+        """Number of timesteps with both price and generation data."""
+        return min(self.main_grid.get_data_size(), self.der.get_data_size())
+
 
 def get_components_by_param_dicts(
     tcl_params_dict: dict,
     ess_params_dict: dict,
     main_grid_params_dict: dict,
     der_params_dict: dict,
-    residential_load_params_dict: dict
+    residential_load_params_dict: dict,
+    seed: Optional[int] = None,
 ) -> Components:
-    tcl_aggr = get_tcl_aggregator_from_params_dict(tcl_params_dict)
-    ess = get_ess_from_params_dict(ess_params_dict)
+    """
+    Creates the components from their parameters. Each random component gets its own generator spawned from
+    the seed, so e.g. changing the number of TCLs does not change the draws of the households.
+    Unseeded if seed is None.
+    """
+    tcl_rng, ess_rng, households_rng = (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(3))
+    tcl_aggr = get_tcl_aggregator_from_params_dict(tcl_params_dict, tcl_rng)
+    ess = get_ess_from_params_dict(ess_params_dict, ess_rng)
     main_grid = get_main_grid_from_params_dict(main_grid_params_dict)
     der = get_der_from_params_dict(der_params_dict)
-    household_manager = get_household_manager_from_params_dict(residential_load_params_dict)
+    household_manager = get_household_manager_from_params_dict(residential_load_params_dict, households_rng)
     return Components(main_grid, der, ess, household_manager, tcl_aggr)
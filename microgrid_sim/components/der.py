@@ -1,16 +1,19 @@
 from dataclasses import dataclass
-from typing import Union
+from typing import Optional, Union
 
-import pandas as pd
+import numpy as np
+
+from microgrid_sim.data import TimeSeries, load_csv_series
 
 
 @dataclass(slots=True)
 class DERParams:
     hourly_generated_energies_file_path: str
     generation_cost: float = 0.032
+    generated_energies: Optional[TimeSeries] = None  # used instead of the file if given
 
     @classmethod
-    def from_dict(cls, der_params_dict: dict[str, Union[float, str]]) -> "DERParams":
+    def from_dict(cls, der_params_dict: dict[str, Union[float, str, TimeSeries]]) -> "DERParams":
         generated_energies_file_path = der_params_dict.pop("hourly_generated_energies_file_path")
         return DERParams(generated_energies_file_path, **der_params_dict)
 
@@ -18,31 +21,35 @@ class DERParams:
 class DER:
     """
     Simulation for Distributed Energy Resource (DER), e.g. a set of wind turbines.
-    This implementation simply reads data from the provided csv file and return it one value at a time
-    when requested.
+    This implementation simply reads data from the provided csv file (see microgrid_sim.data.load_csv_series)
+    and return it one value at a time when requested.
     """
     __slots__ = ("_data", "generation_cost")
 
-    def __init__(self, energy_generation_data: pd.DataFrame, generation_cost: float):
+    def __init__(self, energy_generation_data: TimeSeries, generation_cost: float):
         self._data = energy_generation_data
         self.generation_cost = generation_cost
 
     @classmethod
     def from_params(cls, params: DERParams) -> "DER":
-        data = pd.read_csv(params.hourly_generated_energies_file_path, delimiter=",")
+        data = params.generated_energies
+        if data is None:
+            data = load_csv_series(params.hourly_generated_energies_file_path)
         return DER(data, params.generation_cost)
 
     def get_generated_energy(self, idx: int) -> float:
-        return float(self._data.iloc[idx][-1])
+        return float(self._data.values[idx])
 
     def get_data_size(self) -> int:
         return len(self._data)
 
+    def get_generation_series(self) -> np.ndarray:
+        """Generated energies by data index, not to be modified."""
+        return self._data.values
+
     def get_hour_of_day(self, idx: int) -> int:
         """
         Get the hour of day for the given row in data.
         We use this data set for this purpose because it is the one with the least amount of entries.
         """
-        date_str: str = self._data.iloc[idx][2]
-        hour_str = date_str.split(" ")[1].split(":")[0]
-        return int(hour_str)
+        return int(self._data.hours[idx])
@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
-from random import gauss
+from typing import Optional
+
+import numpy as np
 
 
 @dataclass(slots=True)
@@ -9,6 +11,7 @@ class ESSParams:
     max_charge: float = 250.0
     max_discharge: float = 250.0
     max_energy: float = 500.0
+    steps_per_hour: int = 1  # timesteps per hour, max_charge and max_discharge are powers (energy per hour)
 
     @classmethod
     def from_dict(cls, ess_params_dict: dict[str, float]) -> "ESSParams":
@@ -34,17 +37,30 @@ class ESS:
         self._update_state_of_charge()
 
     @classmethod
-    def from_params(cls, params: ESSParams) -> "ESS":
-        energy = min(params.max_energy, max(100.0, gauss(250.0, 100.0)))
+    def from_params(cls, params: ESSParams, rng: Optional[np.random.Generator] = None) -> "ESS":
+        """
+        Creates an ESS with a random initial energy, drawn from rng (a new unseeded generator if None). The power
+        limits are converted to the energy that can be charged or discharged in one timestep.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        energy = min(params.max_energy, max(100.0, float(rng.normal(250.0, 100.0))))
         return ESS(
             energy,
             params.max_energy,
-            params.max_charge,
-            params.max_discharge,
+            params.max_charge / params.steps_per_hour,
+            params.max_discharge / params.steps_per_hour,
             params.charge_efficiency,
             params.discharge_efficiency
         )
 
+    def snapshot(self) -> float:
+        """Returns the state of the ESS, its energy."""
+        return self.energy
+
+    def restore(self, energy: float) -> None:
+        self.energy = energy
+        self._update_state_of_charge()
+
     def _update_state_of_charge(self) -> None:
         assert self._max_energy > 0
         self.soc = self.energy / self._max_energy
@@ -1,18 +1,29 @@
+from typing import Optional, Union
+
+import numpy as np
+
 from microgrid_sim.components.main_grid import MainGrid, MainGridParams
 from microgrid_sim.components.der import DER, DERParams
 from microgrid_sim.components.ess import ESS, ESSParams
 from microgrid_sim.components.households import HouseholdsManager, ResidentialLoadParams
+from microgrid_sim.components.tcl_aggregate import AggregateTCLAggregator
 from microgrid_sim.components.tcl_aggregator import TCLAggregator, TCLParams
 
 
-def get_tcl_aggregator_from_params_dict(params_dict: dict) -> TCLAggregator:
+def get_tcl_aggregator_from_params_dict(
+    params_dict: dict, rng: Optional[np.random.Generator] = None
+) -> Union[TCLAggregator, AggregateTCLAggregator]:
     params = TCLParams.from_dict(params_dict)
-    return TCLAggregator.from_params(params)
+    if params.model == "aggregate":
+        return AggregateTCLAggregator.from_params(params)  # deterministic, the expected initial distribution
+    if params.model != "device":
+        raise ValueError(f"Unknown TCL model {params.model!r}, expected 'device' or 'aggregate'")
+    return TCLAggregator.from_params(params, rng)
 
 
-def get_ess_from_params_dict(params_dict: dict) -> ESS:
+def get_ess_from_params_dict(params_dict: dict, rng: Optional[np.random.Generator] = None) -> ESS:
     params = ESSParams.from_dict(params_dict)
-    return ESS.from_params(params)
+    return ESS.from_params(params, rng)
 
 
 def get_main_grid_from_params_dict(params_dict: dict) -> MainGrid:
@@ -25,6 +36,8 @@ def get_der_from_params_dict(params_dict: dict) -> DER:
     return DER.from_params(params)
 
 
-def get_household_manager_from_params_dict(params_dict: dict) -> HouseholdsManager:
+def get_household_manager_from_params_dict(
+    params_dict: dict, rng: Optional[np.random.Generator] = None
+) -> HouseholdsManager:
     params = ResidentialLoadParams.from_dict(params_dict)
-    return HouseholdsManager.from_params(params)
+    return HouseholdsManager.from_params(params, rng)
@@ -1,9 +1,13 @@
 from dataclasses import dataclass, field
-from typing import Union
-from random import gauss
+from itertools import chain
+from random import Random
+from typing import Any, Optional, Union
 
+import numpy as np
 from numpy.typing import ArrayLike
+
 from microgrid_sim.components.price_responsive import PriceResponsiveLoad
+from microgrid_sim.components.pricing import PricingManager, RollingPricingManager, get_pricing_manager
 
 
 def _get_default_base_hourly_loads() -> list[float]:
@@ -25,7 +29,12 @@ class ResidentialLoadParams:
     patience: tuple[int, int] = (10, 6)  # mean, standard deviation
     sensitivity: tuple[float, float] = (0.4, 0.3)  # mean, standard deviation
     price_interval: float = 0.0015
-    over_pricing_threshold: int = 4
+    over_pricing_threshold: int = 4  # of the "cumulative" pricing mode
+    pricing_mode: str = "cumulative"  # "cumulative" (PricingManager) or "rolling" (RollingPricingManager)
+    max_over_price: float = 0.029  # of the "rolling" pricing mode
+    pricing_window: int = 24  # hours, of the "rolling" pricing mode
+    # Timesteps per hour. The base loads are per hour and the patience, the threshold and the window are in hours.
+    steps_per_hour: int = 1
 
     @classmethod
     def from_dict(
@@ -36,34 +45,13 @@ class ResidentialLoadParams:
         return ResidentialLoadParams(num_households, hourly_base_prices, **res_load_params_dict)
 
 
-class PricingManager:
-    """Keeps track of energy prices and validates the agent's price-level decisions."""
-
-    __slots__ = ("_over_pricing_threshold", "price_levels_sum")
-
-    def __init__(self, over_pricing_threshold: int = 4):
-        self._over_pricing_threshold = over_pricing_threshold
-        self.price_levels_sum = 0
-
-    def validate_price_level(self, price_level: int) -> int:
-        """Validates the price level given by the agent. Returns the effective (potentially modified) price level."""
-        # NOTE: This is according to formula (12) in https://doi.org/10.1016/j.segan.2020.100413
-        # That is, this is not exactly the percentage threshold but rather a simplification of it.
-        # With the parameters given in Table 1, this leads to a maximum daily over-price percentage of
-        # about 4.56 %: Threshold = 4, cst = 1.5 and P_market = 5.48, so maximum average price of the
-        # day is P_avg = (4 * 1.5 + 24 * 5.48) / 24 = 5.73. Thus, the percentage over the market price
-        # is (5.73 - 5.48) / 5.48 ~ 0.04562 ~ 4.56 %.
-        #
-        # Implementation of the actual percentage threshold could be done e.g. by
-        # - keeping track of market prices and price levels over the last 24 (or 23) hours in a deque
-        # - for each price level given by the agent, check if using that would make the daily average to be more
-        #   than 2.9 % over the market price.
-        # - if yes, use price level 0 instead, otherwise use the suggested price level.
-        level = price_level
-        if self.price_levels_sum > self._over_pricing_threshold:
-            level = 0
-        self.price_levels_sum += level
-        return level
+@dataclass(frozen=True, slots=True)
+class HouseholdsSnapshot:
+    """State of a HouseholdsManager, see HouseholdsManager.snapshot."""
+    pricing: Any  # state of the pricing manager, see PricingManager.snapshot
+    num_shifted_loads: np.ndarray  # number of pending shifted loads of each household
+    shifted_loads: np.ndarray  # (timestep, load) rows of the pending shifted loads of all the households
+    rng_states: tuple[Any, ...]  # states of the random generators of the households, in order of first use
 
 
 class HouseholdsManager:
@@ -79,7 +67,7 @@ class HouseholdsManager:
         pr_loads: list[PriceResponsiveLoad],
         prices: ArrayLike,
         price_interval: float,
-        pricing_manager: PricingManager,
+        pricing_manager: Union[PricingManager, RollingPricingManager],
         base_hourly_loads: list[float]
      ):
         self._pr_loads = pr_loads
@@ -89,26 +77,44 @@ class HouseholdsManager:
         self._base_loads = base_hourly_loads
 
     @classmethod
-    def from_params(cls, params: ResidentialLoadParams) -> "HouseholdsManager":
-        price_resp_loads = []
-        for _ in range(params.num_households):
-            mean, std_dev = params.patience
-            patience = round(gauss(mean, std_dev))  # not quite exactly correct but shouldn't matter here
-            patience = max(1, patience)
-            mean, std_dev = params.sensitivity
-            sensitivity = gauss(mean, std_dev)
-            price_resp_loads.append(PriceResponsiveLoad(sensitivity, patience))
-        pricing_manager = PricingManager(params.over_pricing_threshold)
+    def from_params(
+        cls, params: ResidentialLoadParams, rng: Optional[np.random.Generator] = None
+    ) -> "HouseholdsManager":
+        """
+        Creates the households with random patiences and sensitivities drawn from rng (a new unseeded generator
+        if None). The loads share one random.Random seeded from rng for their (scalar) load shifting decisions.
+        The hourly parameters are converted to the timestep, see ResidentialLoadParams.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        steps_per_hour = params.steps_per_hour
+        mean, std_dev = params.patience
+        # not quite exactly correct but shouldn't matter here
+        patiences = np.maximum(1, np.rint(rng.normal(mean, std_dev, params.num_households))).astype(int)
+        patiences *= steps_per_hour
+        mean, std_dev = params.sensitivity
+        sensitivities = rng.normal(mean, std_dev, params.num_households)
+        load_rng = Random(int(rng.integers(2 ** 63)))
+        price_resp_loads = [
+            PriceResponsiveLoad(float(sensitivity), int(patience), load_rng, steps_per_hour)
+            for sensitivity, patience in zip(sensitivities, patiences)
+        ]
+        pricing_manager = get_pricing_manager(
+            params.pricing_mode,
+            params.over_pricing_threshold * steps_per_hour,
+            params.price_interval,
+            params.max_over_price,
+            params.pricing_window * steps_per_hour,
+        )
         return HouseholdsManager(
             price_resp_loads,
             params.hourly_base_prices,
             params.price_interval,
             pricing_manager,
-            params.base_hourly_loads,
+            [load / steps_per_hour for load in params.base_hourly_loads],
         )
 
     def get_pricing_counter(self) -> int:
-        return self._pricing_manager.price_levels_sum
+        return self._pricing_manager.get_pricing_counter()
 
     def get_base_residential_load(self, hour_of_day: int) -> float:
         return self._base_loads[hour_of_day]
@@ -122,14 +128,40 @@ class HouseholdsManager:
         :param price_idx: Data index.
         :return: (consumed_energy, profit)
         """
-        price_level = self._pricing_manager.validate_price_level(price_level)
-        consumption = self._get_residential_consumption(hour_of_day, price_level)
-        price = self._prices[price_idx] / 100 + price_level * self._price_interval
+        base_price = self._prices[price_idx] / 100
+        price_level = self._pricing_manager.validate_price_level(price_level, base_price)
+        consumption = self._get_residential_consumption(hour_of_day, price_level, price_idx)
+        price = base_price + price_level * self._price_interval
         return consumption, price * consumption
 
-    def _get_residential_consumption(self, hour_of_day: int, price_level: int) -> float:
+    def snapshot(self) -> HouseholdsSnapshot:
+        """Returns the state of the households, which can be restored to this manager."""
+        shifted_loads = [pr_load.snapshot() for pr_load in self._pr_loads]
+        return HouseholdsSnapshot(
+            self._pricing_manager.snapshot(),
+            np.fromiter(map(len, shifted_loads), dtype=np.int64, count=len(shifted_loads)),
+            np.array(list(chain.from_iterable(shifted_loads)), dtype=float).reshape(-1, 2),
+            tuple(rng.getstate() for rng in self._get_rngs()),
+        )
+
+    def restore(self, snapshot: HouseholdsSnapshot) -> None:
+        self._pricing_manager.restore(snapshot.pricing)
+        start = 0
+        rows = snapshot.shifted_loads.tolist()
+        for pr_load, num in zip(self._pr_loads, snapshot.num_shifted_loads.tolist()):
+            pr_load.restore((int(timestep), load) for timestep, load in rows[start:start + num])
+            start += num
+        for rng, state in zip(self._get_rngs(), snapshot.rng_states):
+            rng.setstate(state)
+
+    def _get_rngs(self) -> list[Random]:
+        """The distinct random generators of the households (usually one shared generator)."""
+        return list(dict((id(pr_load.rng), pr_load.rng) for pr_load in self._pr_loads).values())
+
+    def _get_residential_consumption(self, hour_of_day: int, price_level: int, timestep: int) -> float:
         """Get accumulated energy consumption of all households in the microgrid."""
         consumption = 0.0
+        base_load = self._base_loads[hour_of_day]
         for pr_load in self._pr_loads:
-            consumption += pr_load.get_load(self._base_loads[hour_of_day], price_level)
+            consumption += pr_load.get_load(base_load, price_level, timestep)
         return consumption
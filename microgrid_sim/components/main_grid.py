@@ -1,8 +1,9 @@
 from dataclasses import dataclass
-from typing import Union
+from typing import Optional, Union
 
-import pandas as pd
-from pandas import DataFrame
+import numpy as np
+
+from microgrid_sim.data import load_csv_series
 
 
 @dataclass(slots=True)
@@ -11,9 +12,11 @@ class MainGridParams:
     down_prices_file_path: str
     import_transmission_price: float = 0.0097
     export_transmission_price: float = 0.0009
+    up_prices: Optional[np.ndarray] = None  # used instead of the files if given
+    down_prices: Optional[np.ndarray] = None
 
     @classmethod
-    def from_dict(cls, main_grid_params_dict: dict[str, Union[float, str]]) -> "MainGridParams":
+    def from_dict(cls, main_grid_params_dict: dict[str, Union[float, str, np.ndarray]]) -> "MainGridParams":
         up_prices_file_path = main_grid_params_dict.pop("up_prices_file_path")
         down_prices_file_path = main_grid_params_dict.pop("down_prices_file_path")
         return MainGridParams(up_prices_file_path, down_prices_file_path, **main_grid_params_dict)
@@ -24,7 +27,11 @@ class MainGrid:
 
     __slots__ = ("_up_prices", "_down_prices", "imp_transmission_cost", "exp_transmission_cost")
 
-    def __init__(self, up_prices: DataFrame, down_prices: DataFrame, imp_trans_cost: float, exp_trans_cost: float):
+    def __init__(self, up_prices: np.ndarray, down_prices: np.ndarray, imp_trans_cost: float, exp_trans_cost: float):
+        """
+        :param up_prices: Up-regulation prices (per MWh) by data index.
+        :param down_prices: Down-regulation prices (per MWh) by data index.
+        """
         self._up_prices = up_prices
         self._down_prices = down_prices
         self.imp_transmission_cost = imp_trans_cost
@@ -32,8 +39,12 @@ class MainGrid:
 
     @classmethod
     def from_params(cls, params: MainGridParams) -> "MainGrid":
-        up_prices = pd.read_csv(params.up_prices_file_path, delimiter=",")
-        down_prices = pd.read_csv(params.down_prices_file_path, delimiter=",")
+        up_prices = params.up_prices
+        if up_prices is None:
+            up_prices = load_csv_series(params.up_prices_file_path).values
+        down_prices = params.down_prices
+        if down_prices is None:
+            down_prices = load_csv_series(params.down_prices_file_path).values
         return MainGrid(up_prices, down_prices, params.import_transmission_price, params.export_transmission_price)
 
     def get_prices(self, idx: int) -> tuple[float, float]:
@@ -46,10 +57,17 @@ class MainGrid:
         return self.get_up_price(idx), self.get_down_price(idx)
 
     def get_up_price(self, idx: int) -> float:
-        return float(self._up_prices.iloc[idx][-1]) / 1000
+        return float(self._up_prices[idx]) / 1000
 
     def get_down_price(self, idx: int) -> float:
-        return float(self._down_prices.iloc[idx][-1]) / 1000
+        return float(self._down_prices[idx]) / 1000
+
+    def get_data_size(self) -> int:
+        return min(len(self._up_prices), len(self._down_prices))
+
+    def get_up_price_series(self) -> np.ndarray:
+        """Up prices per MWh by data index, not to be modified."""
+        return self._up_prices
 
     def get_bought_cost(self, bought_energy: float, price_idx: int) -> float:
         """
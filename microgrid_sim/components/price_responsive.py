@@ -1,45 +1,89 @@
+from collections import deque
 from dataclasses import dataclass, field
-from itertools import count
-from random import random
+from random import Random
+from typing import Iterable
 from math import copysign
 
 
 @dataclass(slots=True)
 class PriceResponsiveLoad:
-    """Model for a price responsive load."""
+    """
+    Model for a price responsive load.
+
+    The pending shifted loads are kept as (timestep, load) pairs in the order they were shifted. A load is executed
+    at the latest when it is 2 * patience timesteps old (the execution probability is then 1 for any price level),
+    so at most 2 * patience loads are pending.
+
+    With several timesteps per hour, the execution probability is an hourly probability, converted to the
+    probability of a timestep, and the loads shifted in the same direction in the same hour are pending as one load.
+    So the number of pending loads, and the cost of a timestep, does not grow with the number of timesteps per hour.
+    """
     sensitivity: float
-    patience: int
-    _shifted_loads: dict[int, float] = field(init=False, default_factory=lambda: {})
-    _timestep_counter: count = field(init=False, default=count(0))
+    patience: int  # in timesteps
+    rng: Random = field(default_factory=Random)  # decides when the shifted loads are executed
+    steps_per_hour: int = 1
+    _shifted_loads: deque[tuple[int, float]] = field(init=False)
+
+    def __post_init__(self):
+        assert self.patience > 0 and self.steps_per_hour > 0
+        self._shifted_loads = deque(maxlen=2 * self.patience)
 
-    def get_load(self, base_load: float, price_level: int) -> float:
+    def get_load(self, base_load: float, price_level: int, timestep: int) -> float:
         """
         Update the model and get the load to execute on this timestep.
 
         :param base_load: Base load.
         :param price_level: Current price level in {-2, -1, 0, 1, 2}.
+        :param timestep: Current timestep (data index) of the environment, increasing by one each step.
         :return: Final load.
         """
-        timestep = next(self._timestep_counter)
         shifted_load_to_execute = self._get_shifted_load_to_execute(price_level, timestep)
         load_to_shift = base_load * self.sensitivity * price_level
-        self._add_new_shifted_load(load_to_shift, timestep)
+        if load_to_shift != 0.0:
+            self._add_new_shifted_load(load_to_shift, timestep)
         return base_load - load_to_shift + shifted_load_to_execute
 
+    def snapshot(self) -> list[tuple[int, float]]:
+        """Returns the pending shifted loads as (timestep, load) pairs."""
+        return list(self._shifted_loads)
+
+    def restore(self, shifted_loads: Iterable[tuple[int, float]]) -> None:
+        self._shifted_loads.clear()
+        self._shifted_loads.extend(shifted_loads)
+
     def _get_shifted_load_to_execute(self, current_price_level: int, current_timestep: int) -> float:
         """Returns the shifted load to be executed in this time step."""
         load = 0.0
-        for timestep, shifted_load in list(self._shifted_loads.items()):
+        shifted_loads = self._shifted_loads
+        # Due loads are at the front.
+        due_timestep = current_timestep - 2 * self.patience
+        while shifted_loads and shifted_loads[0][0] <= due_timestep:
+            load += shifted_loads.popleft()[1]
+        # Rotate through the rest once, keeping the loads which are not executed in order.
+        for _ in range(len(shifted_loads)):
+            timestep, shifted_load = shifted_loads.popleft()
             if self._execute_load(shifted_load, timestep, current_timestep, current_price_level):
-                load += self._shifted_loads.pop(timestep)
+                load += shifted_load
+            else:
+                shifted_loads.append((timestep, shifted_load))
         return load
 
     def _execute_load(self, load: float, load_timestep: int, current_timestep: int, current_price_level: int) -> bool:
         price_term = - current_price_level * copysign(1.0, load) / 2
         time_term = (current_timestep - load_timestep) / self.patience
         exec_prob = min(1.0, max(0.0, price_term + time_term))
-        return random() < exec_prob
+        if self.steps_per_hour > 1 and 0.0 < exec_prob < 1.0:
+            # Probability of a timestep for executing the load within the hour with probability exec_prob.
+            exec_prob = 1.0 - (1.0 - exec_prob) ** (1.0 / self.steps_per_hour)
+        return self.rng.random() < exec_prob
 
     def _add_new_shifted_load(self, load: float, timestep: int) -> None:
-        """Adds a new load to be executed later."""
-        self._shifted_loads[timestep] = load
+        """Adds a new load to be executed later, merged to the latest pending load if shifted in the same hour."""
+        shifted_loads = self._shifted_loads
+        if self.steps_per_hour > 1 and shifted_loads:
+            last_timestep, last_load = shifted_loads[-1]
+            same_hour = last_timestep // self.steps_per_hour == timestep // self.steps_per_hour
+            if same_hour and (last_load > 0) == (load > 0):
+                shifted_loads[-1] = (last_timestep, last_load + load)
+                return
+        shifted_loads.append((timestep, load))
@@ -0,0 +1,173 @@
+"""
+Validation of the agent's price levels, which limits how much the households can be over-priced.
+
+- PricingManager ("cumulative" mode) is the simplified rule of formula (12) in
+  https://doi.org/10.1016/j.segan.2020.100413: no over-pricing once the sum of all the price levels so far
+  exceeds a threshold.
+- RollingPricingManager ("rolling" mode) is the actual percentage rule: a positive price level is replaced by 0
+  if it would make the average price of the last `window` hours more than max_over_price over the average base
+  (market) price. The base prices and the price levels of the window are kept in a ring buffer with their running
+  sums, so each step is O(1) regardless of the window.
+- BatchRollingPricing is the rolling rule for a batch of environments stepped in lockstep, on numpy arrays.
+"""
+
+from typing import Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+class PricingManager:
+    """Keeps track of energy prices and validates the agent's price-level decisions."""
+
+    __slots__ = ("_over_pricing_threshold", "price_levels_sum")
+
+    def __init__(self, over_pricing_threshold: int = 4):
+        self._over_pricing_threshold = over_pricing_threshold
+        self.price_levels_sum = 0
+
+    def validate_price_level(self, price_level: int, base_price: float) -> int:
+        """
+        Validates the price level given by the agent. Returns the effective (potentially modified) price level.
+
+        :param price_level: Price level given by the agent.
+        :param base_price: Base price of the hour (not used by this rule).
+        """
+        # NOTE: This is according to formula (12) in https://doi.org/10.1016/j.segan.2020.100413
+        # That is, this is not exactly the percentage threshold but rather a simplification of it.
+        # With the parameters given in Table 1, this leads to a maximum daily over-price percentage of
+        # about 4.56 %: Threshold = 4, cst = 1.5 and P_market = 5.48, so maximum average price of the
+        # day is P_avg = (4 * 1.5 + 24 * 5.48) / 24 = 5.73. Thus, the percentage over the market price
+        # is (5.73 - 5.48) / 5.48 ~ 0.04562 ~ 4.56 %.
+        # The actual percentage threshold is implemented by RollingPricingManager.
+        level = price_level
+        if self.price_levels_sum > self._over_pricing_threshold:
+            level = 0
+        self.price_levels_sum += level
+        return level
+
+    def get_pricing_counter(self) -> int:
+        """Sum of the effective price levels so far."""
+        return self.price_levels_sum
+
+    def snapshot(self) -> int:
+        return self.price_levels_sum
+
+    def restore(self, state: int) -> None:
+        self.price_levels_sum = state
+
+
+class RollingPricingManager:
+    """Validates the agent's price levels by the average over-price of the last `window` hours."""
+
+    __slots__ = ("_price_interval", "_max_over_price", "_prices", "_levels", "_pos", "_prices_sum", "price_levels_sum")
+
+    def __init__(self, price_interval: float, max_over_price: float = 0.029, window: int = 24):
+        """
+        :param price_interval: Price difference between consecutive price levels.
+        :param max_over_price: Maximum relative over-price of the average price of the window, e.g. 0.029 for 2.9 %.
+        :param window: Number of hours in the window.
+        """
+        assert window > 0
+        self._price_interval = price_interval
+        self._max_over_price = max_over_price
+        # Ring buffer of the base prices and the effective levels. Before the window is full, the zeros of the
+        # empty slots do not change the sums.
+        self._prices = [0.0] * window
+        self._levels = [0] * window
+        self._pos = 0
+        self._prices_sum = 0.0
+        self.price_levels_sum = 0
+
+    def validate_price_level(self, price_level: int, base_price: float) -> int:
+        """
+        Validates the price level given by the agent. Returns the effective (potentially modified) price level.
+
+        :param price_level: Price level given by the agent.
+        :param base_price: Base price of the hour, in the units of price_interval.
+        """
+        pos = self._pos
+        prices_sum = self._prices_sum - self._prices[pos] + base_price
+        levels_sum = self.price_levels_sum - self._levels[pos] + price_level
+        # The average price is over-priced by (levels_sum * price_interval) / prices_sum.
+        if price_level > 0 and levels_sum * self._price_interval > self._max_over_price * prices_sum:
+            levels_sum -= price_level
+            price_level = 0
+        self._prices[pos] = base_price
+        self._levels[pos] = price_level
+        self._pos = pos + 1 if pos + 1 < len(self._prices) else 0
+        self._prices_sum = prices_sum
+        self.price_levels_sum = levels_sum
+        return price_level
+
+    def get_pricing_counter(self) -> int:
+        """Sum of the effective price levels in the window."""
+        return self.price_levels_sum
+
+    def snapshot(self) -> tuple[tuple[float, ...], tuple[int, ...], int, float, int]:
+        return tuple(self._prices), tuple(self._levels), self._pos, self._prices_sum, self.price_levels_sum
+
+    def restore(self, state: tuple[tuple[float, ...], tuple[int, ...], int, float, int]) -> None:
+        prices, levels, self._pos, self._prices_sum, self.price_levels_sum = state
+        self._prices = list(prices)
+        self._levels = list(levels)
+
+
+class BatchRollingPricing:
+    """
+    The rule of RollingPricingManager for batch_size environments stepped in lockstep, so that they share the
+    position in the ring buffer. Gives the same levels as a RollingPricingManager for each environment.
+    """
+
+    __slots__ = ("_price_interval", "_max_over_price", "_prices", "_levels", "_pos", "_prices_sum", "price_levels_sum")
+
+    def __init__(self, batch_size: int, price_interval: float, max_over_price: float = 0.029, window: int = 24):
+        assert window > 0
+        self._price_interval = price_interval
+        self._max_over_price = max_over_price
+        # Rows are timesteps, so each step reads and writes one contiguous row.
+        self._prices = np.zeros((window, batch_size))
+        self._levels = np.zeros((window, batch_size), dtype=np.int64)
+        self._pos = 0
+        self._prices_sum = np.zeros(batch_size)
+        self.price_levels_sum = np.zeros(batch_size, dtype=np.int64)
+
+    def validate_price_levels(self, price_levels: ArrayLike, base_prices: Union[ArrayLike, float]) -> np.ndarray:
+        """
+        Validates the price levels given for each environment. Returns the effective price levels.
+
+        :param price_levels: Price levels of the environments.
+        :param base_prices: Base prices of the hour of the environments (or one price for all of them).
+        """
+        pos = self._pos
+        requested = np.asarray(price_levels, dtype=np.int64)
+        prices_sum = self._prices_sum - self._prices[pos] + base_prices
+        levels_sum = self.price_levels_sum - self._levels[pos] + requested
+        over_priced = (requested > 0) & (levels_sum * self._price_interval > self._max_over_price * prices_sum)
+        levels = np.where(over_priced, 0, requested)
+        levels_sum = np.where(over_priced, levels_sum - requested, levels_sum)
+        self._prices[pos] = base_prices
+        self._levels[pos] = levels
+        self._pos = pos + 1 if pos + 1 < len(self._prices) else 0
+        self._prices_sum = prices_sum
+        self.price_levels_sum = levels_sum
+        return levels
+
+    def snapshot(self) -> tuple[np.ndarray, np.ndarray, int, np.ndarray, np.ndarray]:
+        return self._prices.copy(), self._levels.copy(), self._pos, self._prices_sum, self.price_levels_sum
+
+    def restore(self, state: tuple[np.ndarray, np.ndarray, int, np.ndarray, np.ndarray]) -> None:
+        prices, levels, self._pos, self._prices_sum, self.price_levels_sum = state
+        self._prices = prices.copy()
+        self._levels = levels.copy()
+
+
+def get_pricing_manager(
+    mode: str, over_pricing_threshold: int, price_interval: float, max_over_price: float, window: int
+) -> Union[PricingManager, RollingPricingManager]:
+    """Pricing manager of the given mode, "cumulative" (PricingManager) or "rolling" (RollingPricingManager)."""
+    if mode == "cumulative":
+        return PricingManager(over_pricing_threshold)
+    if mode == "rolling":
+        return RollingPricingManager(price_interval, max_over_price, window)
+    raise ValueError(f"Unknown pricing mode {mode!r}, expected 'cumulative' or 'rolling'")
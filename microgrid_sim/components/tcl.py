@@ -58,6 +58,15 @@ class TCLTemperatureModel:
         self._building_temp = new_building_temp
         return new_in_temp
 
+    def get_state(self) -> tuple[float, float, float]:
+        """Returns the indoor, outdoor and building temperatures."""
+        return self.in_temp, self._out_temp, self._building_temp
+
+    def set_state(self, in_temp: float, out_temp: float, building_temp: float) -> None:
+        self.in_temp = in_temp
+        self._out_temp = out_temp
+        self._building_temp = building_temp
+
     def _get_new_in_temp(self, tcl_heating: float) -> float:
         assert self._therm_mass_air > 0
         air_comp = (self._out_temp - self.in_temp) * self._therm_mass_air
@@ -96,3 +105,11 @@ class TCL:
         in_temp = self._temp_model.update(out_temp, tcl_heating)
         self.soc = self._backup_controller.get_state_of_charge(in_temp)
         return tcl_heating
+
+    def get_state(self) -> tuple[float, float, float]:
+        """Returns the indoor, outdoor and building temperatures of the temperature model."""
+        return self._temp_model.get_state()
+
+    def set_state(self, in_temp: float, out_temp: float, building_temp: float) -> None:
+        self._temp_model.set_state(in_temp, out_temp, building_temp)
+        self.soc = self._backup_controller.get_state_of_charge(in_temp)
@@ -0,0 +1,229 @@
+"""
+Reduced-order aggregate model of a TCL cluster, an alternative to the per-device TCLAggregator.
+
+The population is tracked as a histogram (numbers of TCLs) over a grid of (indoor temperature, building
+temperature) nodes. Each step, the TCLs of a node are switched on or off like TCLAggregator does (coldest
+first, with the backup controller limits), and the mass of each node moves to the node grid by the mean
+dynamics of TCLTemperatureModel, split between the four nodes around its target (bilinear interpolation).
+These sparse transitions are precomputed per outdoor temperature, so the cost of a step depends on the grid
+size but not on the number of TCLs.
+
+The mean parameters of the TCLParams distributions are used for all the TCLs. Their spread (a few hundredths
+of a degree per step) is below the grid resolution, and the interpolation spreads the population similarly.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from math import ceil, erf, sqrt
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from microgrid_sim.components.tcl_aggregator import TCLParams
+
+_erf = np.frompyfunc(erf, 1, 1)
+
+
+def _get_normal_cdf(x: np.ndarray, mean: float, std_dev: float) -> np.ndarray:
+    return 0.5 * (1.0 + _erf((x - mean) / (std_dev * sqrt(2.0))).astype(float))
+
+
+@dataclass(frozen=True, slots=True)
+class TemperatureGrid:
+    """Evenly spaced temperature nodes start, start + step, ..., with num nodes."""
+    start: float
+    step: float
+    num: int
+
+    @classmethod
+    def from_range(cls, min_temp: float, max_temp: float, step: float, margin_below: float, margin_above: float):
+        """Grid of at least [min_temp - margin_below, max_temp + margin_above] with min_temp as a node."""
+        num_below = ceil(margin_below / step)
+        num_above = ceil((max_temp - min_temp + margin_above) / step)
+        return TemperatureGrid(min_temp - num_below * step, step, num_below + num_above + 1)
+
+    def get_nodes(self) -> np.ndarray:
+        return self.start + self.step * np.arange(self.num)
+
+    def get_clipped_normal_masses(self, mean: float, std_dev: float, low: float, high: float) -> np.ndarray:
+        """Probabilities of min(high, max(low, gauss(mean, std_dev))) rounded to the nodes (low and high are nodes)."""
+        nodes = self.get_nodes()
+        lower = np.where(nodes <= low + 0.5 * self.step, -np.inf, nodes - 0.5 * self.step)
+        upper = np.where(nodes >= high - 0.5 * self.step, np.inf, nodes + 0.5 * self.step)
+        masses = _get_normal_cdf(upper, mean, std_dev) - _get_normal_cdf(lower, mean, std_dev)
+        masses[(nodes < low - 0.5 * self.step) | (nodes > high + 0.5 * self.step)] = 0.0
+        return masses / masses.sum()
+
+    def get_interpolation(self, temps: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the indices of the lower nodes and the weights of the upper nodes, clipped to the grid."""
+        position = np.clip((temps - self.start) / self.step, 0.0, self.num - 1)
+        lower = np.minimum(np.floor(position).astype(np.int64), self.num - 2)
+        return lower, position - lower
+
+
+@dataclass(frozen=True, slots=True)
+class AggregateTCLDynamics:
+    """Mean TCL dynamics of the aggregate model on its grids, hashable for caching the transitions."""
+    in_temps: TemperatureGrid
+    building_temps: TemperatureGrid
+    thermal_mass_air: float
+    thermal_mass_building: float
+    internal_heating: float
+    nominal_power: float
+
+
+@lru_cache(maxsize=1024)
+def get_transitions(dynamics: AggregateTCLDynamics, out_temp: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the sparse transitions of the nodes (flattened as in_temp_idx * num_building_temps + building_temp_idx)
+    for TCL action off and on as the target node indices and weights, both of shape (2, 4, num_nodes).
+    """
+    in_temps = dynamics.in_temps.get_nodes()[:, None]
+    building_temps = dynamics.building_temps.get_nodes()[None, :]
+    num_building_temps = dynamics.building_temps.num
+
+    # Same update as TCLTemperatureModel.update.
+    building_change = (in_temps - building_temps) * dynamics.thermal_mass_building
+    new_building_temps = (building_temps + building_change).ravel()
+    j, t_j = dynamics.building_temps.get_interpolation(new_building_temps)
+
+    indices = []
+    weights = []
+    for action in (0, 1):
+        air_change = (out_temp - in_temps) * dynamics.thermal_mass_air
+        heating = dynamics.nominal_power * action + dynamics.internal_heating
+        new_in_temps = (in_temps + air_change - building_change + heating).ravel()
+        i, t_i = dynamics.in_temps.get_interpolation(new_in_temps)
+        indices.append([
+            i * num_building_temps + j,
+            (i + 1) * num_building_temps + j,
+            i * num_building_temps + j + 1,
+            (i + 1) * num_building_temps + j + 1,
+        ])
+        weights.append([(1 - t_i) * (1 - t_j), t_i * (1 - t_j), (1 - t_i) * t_j, t_i * t_j])
+    return np.array(indices), np.array(weights)
+
+
+class AggregateTCLAggregator:
+    """Drop-in replacement of TCLAggregator which simulates the TCL cluster as a population histogram."""
+
+    __slots__ = ("_dynamics", "_masses", "_num_tcls", "_out_temps", "_min_temp", "_max_temp", "_in_temps")
+
+    def __init__(
+        self,
+        dynamics: AggregateTCLDynamics,
+        masses: np.ndarray,
+        out_temps: ArrayLike,
+        min_temp: float,
+        max_temp: float,
+    ):
+        """
+        :param dynamics: Grids and mean dynamics of the TCLs.
+        :param masses: Numbers of TCLs at the nodes, of shape (in_temps.num, building_temps.num).
+        :param out_temps: Outdoor temperatures by data index.
+        :param min_temp: Minimum indoor temperature of the backup controllers.
+        :param max_temp: Maximum indoor temperature of the backup controllers.
+        """
+        assert masses.shape == (dynamics.in_temps.num, dynamics.building_temps.num)
+        self._dynamics = dynamics
+        self._masses = masses.ravel().astype(float)
+        self._num_tcls = int(round(masses.sum()))
+        self._out_temps = out_temps
+        self._min_temp = min_temp
+        self._max_temp = max_temp
+        self._in_temps = dynamics.in_temps.get_nodes()
+
+    @classmethod
+    def from_params(
+        cls, params: TCLParams, in_temp_step: float = 0.05, building_temp_step: float = 0.1
+    ) -> "AggregateTCLAggregator":
+        """
+        Creates the aggregate model with the expected initial distribution of TCLAggregator.from_params. The
+        dynamics are scaled to the timestep like TCLAggregator.from_params does.
+
+        :param in_temp_step: Resolution of the indoor temperature grid.
+        :param building_temp_step: Resolution of the building temperature grid.
+        """
+        nominal_power = params.nominal_power[0] / params.steps_per_hour
+        # The backup controller only reacts after min_temp has been crossed. Switching on just below max_temp
+        # overshoots by about the nominal power, and the TCLs drift towards outdoor temperatures above max_temp.
+        margin_above = max(nominal_power, float(np.max(params.out_temperatures)) - params.max_temp) + 2.0
+        in_temps = TemperatureGrid.from_range(params.min_temp, params.max_temp, in_temp_step, 2.0, margin_above)
+        building_temps = TemperatureGrid.from_range(
+            params.min_temp, params.max_temp, building_temp_step, 2.0, margin_above
+        )
+        dynamics = AggregateTCLDynamics(
+            in_temps,
+            building_temps,
+            params.thermal_mass_air[0] / params.steps_per_hour,
+            params.thermal_mass_building[0] / params.steps_per_hour,
+            params.internal_heating[0] / params.steps_per_hour,
+            nominal_power,
+        )
+        mid_temp = (params.max_temp + params.min_temp) / 2
+        in_masses = in_temps.get_clipped_normal_masses(mid_temp, 1.5, params.min_temp, params.max_temp)
+        building_masses = building_temps.get_clipped_normal_masses(mid_temp, 3.5, params.min_temp, params.max_temp)
+        masses = params.num_tcls * np.outer(in_masses, building_masses)
+        return AggregateTCLAggregator(dynamics, masses, params.out_temperatures, params.min_temp, params.max_temp)
+
+    def get_outdoor_temperature(self, idx: int) -> float:
+        return self._out_temps[idx]
+
+    def get_state_of_charge(self) -> float:
+        """Returns the average state of charge (SoC) of the TCL cluster."""
+        in_temp_masses = self._get_in_temp_masses()
+        mean_in_temp = float(in_temp_masses @ self._in_temps) / in_temp_masses.sum()
+        return (mean_in_temp - self._min_temp) / (self._max_temp - self._min_temp)
+
+    def allocate_energy(self, energy: float, idx: int) -> float:
+        """Allocate energy to be used by the TCL cluster. Returns the amount of energy actually spent."""
+        on_fractions = self._get_on_fractions(energy)
+        in_temp_masses = self._get_in_temp_masses()
+        consumed_energy = float(on_fractions @ in_temp_masses) * self._dynamics.nominal_power
+
+        indices, weights = get_transitions(self._dynamics, round(float(self._out_temps[idx]), 1))
+        # Only the occupied nodes (typically a small part of the grid) are moved.
+        occupied = np.flatnonzero(self._masses)
+        on_masses = self._masses[occupied] * np.repeat(on_fractions, self._dynamics.building_temps.num)[occupied]
+        masses = np.stack((self._masses[occupied] - on_masses, on_masses))
+        self._masses = np.bincount(
+            indices[:, :, occupied].ravel(),
+            weights=(weights[:, :, occupied] * masses[:, None, :]).ravel(),
+            minlength=self._masses.size,
+        )
+        return consumed_energy
+
+    def get_number_of_tcls(self) -> int:
+        return self._num_tcls
+
+    def snapshot(self) -> np.ndarray:
+        """Returns the numbers of TCLs at the nodes, which can be restored to this aggregator."""
+        return self._masses.copy()
+
+    def restore(self, snapshot: np.ndarray) -> None:
+        self._masses = snapshot.copy()
+
+    def _get_in_temp_masses(self) -> np.ndarray:
+        return self._masses.reshape(self._dynamics.in_temps.num, -1).sum(axis=1)
+
+    def _get_on_fractions(self, energy: float) -> np.ndarray:
+        """
+        Fractions of the TCLs switched on at each indoor temperature node, like TCLAggregator: going from the
+        coldest, a TCL is switched on if its nominal power is less than the energy left, and the backup controller
+        switches on the ones below min_temp and off the ones above max_temp regardless.
+        """
+        in_temp_masses = self._get_in_temp_masses()
+        tolerance = 1e-6 * self._dynamics.in_temps.step  # min_temp and max_temp are nodes
+        forced_on = self._in_temps < self._min_temp - tolerance
+        middle = ~forced_on & (self._in_temps <= self._max_temp + tolerance)
+        num_forced_on = in_temp_masses[forced_on].sum()
+        # The k-th switched on TCL (from 0) has energy - k * nominal_power left.
+        num_middle_on = max(0.0, energy / self._dynamics.nominal_power - 1.0 - num_forced_on)
+
+        on_fractions = forced_on.astype(float)
+        middle_masses = in_temp_masses[middle]
+        masses_before = np.cumsum(middle_masses) - middle_masses
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fractions = np.clip((num_middle_on - masses_before) / middle_masses, 0.0, 1.0)
+        on_fractions[middle] = np.where(middle_masses > 0.0, fractions, 0.0)
+        return on_fractions
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
-from typing import Union
-from random import gauss
+from typing import Optional, Union
 
+import numpy as np
 from numpy.typing import ArrayLike
 
 from microgrid_sim.components.tcl import TCL, TCLTemperatureModel, BackupController
@@ -17,6 +17,8 @@ class TCLParams:
     nominal_power: tuple[float, float] = (1.5, 0.01)  # mean, standard deviation
     min_temp: float = 19.0
     max_temp: float = 25.0
+    model: str = "device"  # "device" (TCLAggregator) or "aggregate" (AggregateTCLAggregator)
+    steps_per_hour: int = 1  # timesteps per hour, the thermal masses, heatings and powers above are per hour
 
     @classmethod
     def from_dict(cls, tcl_params_dict: dict[str, Union[int, float, ArrayLike, tuple[float, float]]]) -> "TCLParams":
@@ -25,6 +27,13 @@ class TCLParams:
         return TCLParams(num_tcls, out_temps, **tcl_params_dict)
 
 
+@dataclass(frozen=True, slots=True)
+class TCLAggregatorSnapshot:
+    """State of a TCLAggregator, see TCLAggregator.snapshot."""
+    tcls: tuple[TCL, ...]  # in the order of the aggregator, which sorts them when allocating energy
+    temperatures: np.ndarray  # indoor, outdoor and building temperatures of the TCLs, of shape (num_tcls, 3)
+
+
 @dataclass(slots=True)
 class TCLAggregator:
     """TCL-aggregator agent that controls division of power amongst a cluster of TCLs."""
@@ -32,35 +41,41 @@ class TCLAggregator:
     _out_temps: ArrayLike
 
     @classmethod
-    def from_params(cls, params: TCLParams) -> "TCLAggregator":
+    def from_params(cls, params: TCLParams, rng: Optional[np.random.Generator] = None) -> "TCLAggregator":
+        """
+        Creates the TCLs with random parameters, drawn from rng (a new unseeded generator if None). The hourly
+        parameters are scaled to the timestep after drawing them, so the TCLs are the same for any timestep.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        temp_models = cls._get_temp_models_from_params(params, rng)
+        mean, std_dev = params.nominal_power
+        powers = rng.normal(mean, std_dev, params.num_tcls) / params.steps_per_hour
         tcls = []
-        for _ in range(params.num_tcls):
+        for power, temp_model in zip(powers.tolist(), temp_models):
             backup_controller = BackupController(params.min_temp, params.max_temp)
-            temp_model = cls._get_temp_model_from_params(params)
-
-            mean, std_dev = params.nominal_power
-            power = gauss(mean, std_dev)
             tcls.append(TCL(power, backup_controller, temp_model))
         return TCLAggregator(tcls, params.out_temperatures)
 
     @classmethod
-    def _get_temp_model_from_params(cls, params: TCLParams) -> TCLTemperatureModel:
-        in_temp = min(params.max_temp, max(params.min_temp, gauss((params.max_temp + params.min_temp) / 2, 1.5)))
+    def _get_temp_models_from_params(cls, params: TCLParams, rng: np.random.Generator) -> list[TCLTemperatureModel]:
+        """Draws the temperature model parameters of all the TCLs at once."""
+        n = params.num_tcls
+        mid_temp = (params.max_temp + params.min_temp) / 2
+        in_temps = np.clip(rng.normal(mid_temp, 1.5, n), params.min_temp, params.max_temp)
+        # The temperature model is updated once per timestep, so the rates are per timestep.
         mean, std_dev = params.thermal_mass_air
-        tm_air = max(0.001, gauss(mean, std_dev))
+        tms_air = np.maximum(0.001, rng.normal(mean, std_dev, n)) / params.steps_per_hour
         mean, std_dev = params.thermal_mass_building
-        tm_building = max(0.01, gauss(mean, std_dev))
+        tms_building = np.maximum(0.01, rng.normal(mean, std_dev, n)) / params.steps_per_hour
         mean, std_dev = params.internal_heating
-        heating = gauss(mean, std_dev)
-        temp_model = TCLTemperatureModel(
-            in_temp,
-            params.out_temperatures[0],
-            min(params.max_temp, max(params.min_temp, gauss((params.max_temp + params.min_temp) / 2, 3.5))),
-            tm_air,
-            tm_building,
-            heating
-        )
-        return temp_model
+        heatings = rng.normal(mean, std_dev, n) / params.steps_per_hour
+        building_temps = np.clip(rng.normal(mid_temp, 3.5, n), params.min_temp, params.max_temp)
+        return [
+            TCLTemperatureModel(in_temp, params.out_temperatures[0], building_temp, tm_air, tm_building, heating)
+            for in_temp, building_temp, tm_air, tm_building, heating in zip(
+                in_temps.tolist(), building_temps.tolist(), tms_air.tolist(), tms_building.tolist(), heatings.tolist()
+            )
+        ]
 
     def get_outdoor_temperature(self, idx: int) -> float:
         return self._out_temps[idx]
@@ -83,6 +98,15 @@ class TCLAggregator:
     def get_number_of_tcls(self) -> int:
         return len(self._tcls)
 
+    def snapshot(self) -> TCLAggregatorSnapshot:
+        """Returns the state of the TCLs, which can be restored to this aggregator."""
+        return TCLAggregatorSnapshot(tuple(self._tcls), np.array([tcl.get_state() for tcl in self._tcls]))
+
+    def restore(self, snapshot: TCLAggregatorSnapshot) -> None:
+        self._tcls = list(snapshot.tcls)
+        for tcl, state in zip(self._tcls, snapshot.temperatures.tolist()):
+            tcl.set_state(*state)
+
     @staticmethod
     def _get_desired_tcl_action(tcl: TCL, energy_left: float) -> int:
         if tcl.nominal_power < energy_left:
@@ -0,0 +1,274 @@
+"""
+Time-series data sources of the simulation.
+
+The hourly CSV files (prices and wind generation) are converted once, in chunks, into .npy caches in a
+CACHE_DIR_NAME folder next to them, and the caches and the .npy data files are memory-mapped. So creating an
+environment does not read whole multi-year datasets into memory: only the pages of the windows that the episodes
+touch are read (and kept in the page cache of the OS, shared between processes).
+
+A Dataset is one set of the data files, by default the files of one data folder (see Dataset.from_directory).
+The DatasetRegistry holds several datasets per site, e.g. one per year, for training on all of them.
+SimulationData holds the arrays of all the time series instead of the files, e.g. of a generated scenario
+(see microgrid_sim.scenarios), and can be given to Environment directly. The data is hourly, SimulationData.resample
+interpolates it to shorter timesteps.
+
+SeriesStats are the means and standard deviations of the time series features of the state, for normalizing the
+observations (see Environment.get_normalized_observation). Those of a Dataset are cached with the .npy caches.
+"""
+
+import hashlib
+import os
+from dataclasses import astuple, dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR_NAME = ".npy_cache"
+UP_PRICES_FILE_NAME = "up_regulation.csv"
+DOWN_PRICES_FILE_NAME = "down_regulation.csv"
+GENERATED_ENERGIES_FILE_NAME = "wind_generation.csv"
+PRICES_AND_TEMPS_FILE_NAME = "default_price_and_temperatures.npy"
+
+
+@dataclass(frozen=True, slots=True)
+class TimeSeries:
+    """Hourly values of a CSV data file and the hour of day (by local starting time) of each row."""
+    values: np.ndarray
+    hours: np.ndarray  # as floats, they are stored in the same array as the values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _get_cache_path(csv_path: str) -> str:
+    directory, file_name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(directory, CACHE_DIR_NAME, file_name + ".npy")
+
+
+def _read_csv(csv_path: str, chunk_size: int) -> np.ndarray:
+    """
+    Reads the rows of a CSV file as (value, hour of day) in chunks of chunk_size rows. The value is in the last
+    column and the local starting time, as "YYYY-MM-DD HH:MM:SS", in the third column.
+    """
+    num_columns = len(pd.read_csv(csv_path, delimiter=",", nrows=0).columns)
+    chunks = []
+    for chunk in pd.read_csv(csv_path, delimiter=",", usecols=[2, num_columns - 1], chunksize=chunk_size):
+        hours = chunk.iloc[:, 0].str.split(" ").str[1].str.split(":").str[0].astype(np.int64)
+        chunks.append(np.column_stack((chunk.iloc[:, 1].to_numpy(dtype=np.float64), hours.to_numpy())))
+    if not chunks:
+        return np.empty((0, 2))
+    return np.concatenate(chunks)
+
+
+def _save_atomically(path: str, array: np.ndarray) -> None:
+    """Saves the array, writing to a temporary file first so that concurrent processes never load a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        np.save(file, array)
+    os.replace(tmp_path, path)
+
+
+def _is_fresh(cache_path: str, source_paths: list[str]) -> bool:
+    """Whether the cache exists and is not older than any of its source files."""
+    if not os.path.exists(cache_path):
+        return False
+    return all(os.path.getmtime(cache_path) >= os.path.getmtime(path) for path in source_paths)
+
+
+def load_csv_series(csv_path: str, chunk_size: int = 1 << 16) -> TimeSeries:
+    """
+    Memory-mapped TimeSeries of a CSV data file. The file is converted to its .npy cache if the cache is missing
+    or older than the file. If the cache cannot be written, the data is kept in memory instead.
+
+    :param csv_path: Path to the CSV file.
+    :param chunk_size: Number of rows read at a time when converting the file.
+    """
+    cache_path = _get_cache_path(csv_path)
+    if not _is_fresh(cache_path, [csv_path]):
+        data = _read_csv(csv_path, chunk_size)
+        try:
+            _save_atomically(cache_path, data)
+        except OSError:
+            return TimeSeries(data[:, 0], data[:, 1])
+    data = np.load(cache_path, mmap_mode="r")
+    return TimeSeries(data[:, 0], data[:, 1])
+
+
+def load_array(npy_path: str) -> np.ndarray:
+    """Memory-mapped array of a .npy data file."""
+    return np.load(npy_path, mmap_mode="r")
+
+
+@dataclass(frozen=True, slots=True)
+class SimulationData:
+    """All the time series of a simulation by data index, each truncated to the common length."""
+    up_prices: np.ndarray  # per MWh
+    down_prices: np.ndarray  # per MWh
+    generated_energies: np.ndarray  # per timestep
+    hours: np.ndarray  # hour of day
+    base_prices: np.ndarray  # base prices of the households, cents per kWh
+    out_temps: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.up_prices)
+
+    def resample(self, steps_per_hour: int) -> "SimulationData":
+        """
+        The data of this hourly data at steps_per_hour timesteps per hour, so data index idx of the result is at
+        hour idx / steps_per_hour. The whole series are interpolated at once, so that the simulation only indexes
+        the arrays. The prices and the hour of day are held for the hour. The outdoor temperatures and the generated
+        energies, as averages over their hours, are interpolated linearly between the midpoints of the hours (held
+        before the first and after the last midpoint), and the generated energies are divided between the timesteps.
+
+        :param steps_per_hour: Number of timesteps per hour, e.g. 4 for 15 minute timesteps.
+        """
+        assert steps_per_hour > 0
+        if steps_per_hour == 1:
+            return self
+        length = len(self)
+        midpoints = np.arange(length) + 0.5
+        step_midpoints = (np.arange(length * steps_per_hour) + 0.5) / steps_per_hour
+
+        def hold(values: np.ndarray) -> np.ndarray:
+            return np.repeat(np.asarray(values[:length]), steps_per_hour)
+
+        def interpolate(values: np.ndarray) -> np.ndarray:
+            return np.interp(step_midpoints, midpoints, np.asarray(values[:length], dtype=np.float64))
+
+        return SimulationData(
+            hold(self.up_prices),
+            hold(self.down_prices),
+            interpolate(self.generated_energies) / steps_per_hour,
+            hold(self.hours),
+            hold(self.base_prices),
+            interpolate(self.out_temps),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SeriesStats:
+    """
+    Means and standard deviations of the time series features of Environment.get_state: the outdoor temperature,
+    the generated energy, the up price (per kWh, as in the state) and the hour of day, in this order.
+    """
+    means: np.ndarray
+    stds: np.ndarray  # 1.0 for constant series
+
+    @classmethod
+    def from_data(cls, data: SimulationData) -> "SeriesStats":
+        series = (data.out_temps, data.generated_energies, np.divide(data.up_prices, 1000), data.hours)
+        means = np.array([np.mean(values) for values in series])
+        stds = np.array([np.std(values) for values in series])
+        return SeriesStats(means, np.where(stds > 0.0, stds, 1.0))
+
+
+@dataclass(frozen=True, slots=True)
+class Dataset:
+    """Paths to the data files of one simulation dataset. The files are indexed by the same hourly data index."""
+    up_prices_file_path: str
+    down_prices_file_path: str
+    hourly_generated_energies_file_path: str
+    prices_and_temps_path: str  # .npy file with the base prices of the households and the outdoor temperatures
+
+    @classmethod
+    def from_directory(cls, path_to_data: str) -> "Dataset":
+        """The dataset of the data files with the default file names in the given folder."""
+        return Dataset(
+            os.path.join(path_to_data, UP_PRICES_FILE_NAME),
+            os.path.join(path_to_data, DOWN_PRICES_FILE_NAME),
+            os.path.join(path_to_data, GENERATED_ENERGIES_FILE_NAME),
+            os.path.join(path_to_data, PRICES_AND_TEMPS_FILE_NAME),
+        )
+
+    def get_length(self) -> int:
+        """Number of timesteps for which all the data files have data."""
+        lengths = [
+            len(load_csv_series(self.up_prices_file_path)),
+            len(load_csv_series(self.down_prices_file_path)),
+            len(load_csv_series(self.hourly_generated_energies_file_path)),
+            len(load_array(self.prices_and_temps_path)),
+        ]
+        return min(lengths)
+
+    def get_series_stats(self) -> SeriesStats:
+        """
+        SeriesStats of the data, computed once and cached in the cache folder next to the prices and temperatures
+        file until any of the data files changes.
+        """
+        paths = list(astuple(self))
+        key = hashlib.blake2b("\n".join(map(os.path.abspath, paths)).encode(), digest_size=8).hexdigest()
+        cache_path = os.path.join(
+            os.path.dirname(os.path.abspath(self.prices_and_temps_path)), CACHE_DIR_NAME, f"series_stats_{key}.npy"
+        )
+        if _is_fresh(cache_path, paths):
+            means, stds = np.load(cache_path)
+            return SeriesStats(means, stds)
+        stats = SeriesStats.from_data(self.load())
+        try:
+            _save_atomically(cache_path, np.stack((stats.means, stats.stds)))
+        except OSError:
+            pass
+        return stats
+
+    def load(self) -> SimulationData:
+        """Memory-mapped arrays of the data files."""
+        generation = load_csv_series(self.hourly_generated_energies_file_path)
+        prices_and_temps = load_array(self.prices_and_temps_path)
+        length = self.get_length()
+        return SimulationData(
+            load_csv_series(self.up_prices_file_path).values[:length],
+            load_csv_series(self.down_prices_file_path).values[:length],
+            generation.values[:length],
+            generation.hours[:length],
+            prices_and_temps[:length, 0],
+            prices_and_temps[:length, 1],
+        )
+
+
+class DatasetRegistry:
+    """Named datasets of several sites, e.g. a dataset for each year of data of each site."""
+
+    __slots__ = ("_datasets",)
+
+    def __init__(self):
+        self._datasets: dict[str, dict[str, Dataset]] = {}
+
+    @classmethod
+    def from_directory(cls, root: str) -> "DatasetRegistry":
+        """
+        Registers each folder root/<site>/<name> which contains the default data files (see Dataset.from_directory)
+        as the dataset name of the site.
+        """
+        registry = DatasetRegistry()
+        for site in sorted(os.listdir(root)):
+            site_path = os.path.join(root, site)
+            if not os.path.isdir(site_path):
+                continue
+            for name in sorted(os.listdir(site_path)):
+                dataset = Dataset.from_directory(os.path.join(site_path, name))
+                if all(os.path.isfile(path) for path in astuple(dataset)):
+                    registry.register(site, name, dataset)
+        return registry
+
+    def register(self, site: str, name: str, dataset: Dataset) -> None:
+        site_datasets = self._datasets.setdefault(site, {})
+        if name in site_datasets:
+            raise ValueError(f"Dataset {name!r} of site {site!r} is already registered")
+        site_datasets[name] = dataset
+
+    def get(self, site: str, name: str) -> Dataset:
+        try:
+            return self._datasets[site][name]
+        except KeyError:
+            raise KeyError(f"No dataset {name!r} registered for site {site!r}") from None
+
+    def get_sites(self) -> list[str]:
+        return list(self._datasets)
+
+    def get_datasets(self, site: Optional[str] = None) -> list[Dataset]:
+        """Datasets of the given site, or of all the sites if None, in the order of registration."""
+        if site is not None:
+            return list(self._datasets.get(site, {}).values())
+        return [dataset for site_datasets in self._datasets.values() for dataset in site_datasets.values()]
@@ -1,21 +1,72 @@
-import os
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
 from itertools import count
-from typing import Any
+from typing import Any, Iterator, Optional
 
 import numpy as np
+from numpy.typing import ArrayLike
 
 from microgrid_sim.components.components import get_components_by_param_dicts
+from microgrid_sim.components.households import HouseholdsSnapshot
+from microgrid_sim.data import Dataset, SeriesStats, SimulationData, TimeSeries, load_array
+from microgrid_sim.forecasts import Forecaster, ForecastParams
+from microgrid_sim.profiling import ComponentProfiler, ProfiledComponent
 
 
-def get_default_microgrid_params(path_to_data: str) -> dict[str, dict[str, Any]]:
+NUM_ACTIONS = 80
+NUM_STATE_VALUES = 8
+# Standard deviation for normalizing the pricing counter, which is a running sum of the price levels in {-2..2}.
+PRICING_COUNTER_STD = 2.0
+
+
+def _get_action_table() -> np.ndarray:
+    """
+    Build the lookup table from a flat action index (0..79) to the sub-actions.
+
+    Each row is (tcl_action, price_level, deficiency_ess, excess_ess), where the price level is in {-2, ..., 2}
+    and the last two are 1 if the ESS is to be used first for covering deficiency / storing excess energy.
+    The flat index is ordered as tcl_action * 20 + (price_level + 2) * 4 + deficiency_ess * 2 + excess_ess.
+    """
+    table = np.empty((NUM_ACTIONS, 4), dtype=np.int64)
+    for idx in range(NUM_ACTIONS):
+        tcl_action = idx // 20
+        price_level = (idx % 20) // 4 - 2
+        table[idx] = (tcl_action, price_level, (idx % 4) // 2, idx % 2)
+    return table
+
+
+ACTION_TABLE = _get_action_table()
+_ACTION_TUPLES: tuple[tuple[int, int, int, int], ...] = tuple(tuple(row) for row in ACTION_TABLE.tolist())
+
+
+def get_actions_from_indices(action_indices: ArrayLike) -> np.ndarray:
+    """Decode a vector of flat action indices into an array of (tcl_action, price_level, def_ess, exc_ess) rows."""
+    return ACTION_TABLE[np.asarray(action_indices, dtype=np.int64)]
+
+
+def get_default_microgrid_params(
+    path_to_data: str, num_tcls: int = 100, num_households: int = 150
+) -> dict[str, dict[str, Any]]:
+    """
+    Get default parameters for the microgrid, with the data files of the given folder (see Dataset.from_directory).
+    """
+    return get_microgrid_params(Dataset.from_directory(path_to_data), num_tcls, num_households)
+
+
+def get_microgrid_params(
+    dataset: Dataset, num_tcls: int = 100, num_households: int = 150
+) -> dict[str, dict[str, Any]]:
     """
-    Get default parameters for the microgrid.
+    Get default parameters for the microgrid with the given data. The prices and temperatures file of the dataset
+    is given to Environment separately.
 
-    :param path_to_data: Path to the folder containing the simulation data.
+    :param dataset: The data files of the simulation.
+    :param num_tcls: Number of TCLs in the microgrid.
+    :param num_households: Number of households (price responsive loads) in the microgrid.
     :return: Parameters as a dictionary
     """
     tcl_params = {
-        "num_tcls": 100,  # REQUIRED
+        "num_tcls": num_tcls,  # REQUIRED
         "thermal_mass_air": (0.004, 0.0008),
         "thermal_mass_building": (0.3, 0.004),
         "internal_heating": (0.0, 0.01),
@@ -31,21 +82,24 @@ def get_default_microgrid_params(path_to_data: str) -> dict[str, dict[str, Any]]
         "max_energy": 500.0,
     }
     main_grid_params = {
-        "up_prices_file_path": os.path.join(path_to_data, "up_regulation.csv"),  # REQUIRED
-        "down_prices_file_path": os.path.join(path_to_data, "down_regulation.csv"),  # REQUIRED
+        "up_prices_file_path": dataset.up_prices_file_path,  # REQUIRED
+        "down_prices_file_path": dataset.down_prices_file_path,  # REQUIRED
         "import_transmission_price": 0.0097,
         "export_transmission_price": 0.0009,
     }
     der_params = {
-        "hourly_generated_energies_file_path": os.path.join(path_to_data, "wind_generation.csv"),  # REQUIRED
+        "hourly_generated_energies_file_path": dataset.hourly_generated_energies_file_path,  # REQUIRED
         "generation_cost": 0.032,
     }
     residential_params = {
-        "num_households": 150,  # REQUIRED
+        "num_households": num_households,  # REQUIRED
         "patience": (10, 6),
         "sensitivity": (0.4, 0.3),
         "price_interval": 0.0015,
         "over_pricing_threshold": 4,
+        "pricing_mode": "cumulative",  # or "rolling"
+        "max_over_price": 0.029,
+        "pricing_window": 24,
     }
 
     params = {
@@ -58,27 +112,166 @@ def get_default_microgrid_params(path_to_data: str) -> dict[str, dict[str, Any]]
     return params
 
 
+@dataclass(frozen=True, slots=True)
+class EnvironmentSnapshot:
+    """All the mutable state of an Environment, see Environment.snapshot."""
+    idx: int
+    next_idx: int
+    tcl_aggregator: Any  # TCLAggregatorSnapshot, or the histogram of the aggregate TCL model
+    ess_energy: float
+    households: HouseholdsSnapshot
+    forecaster: Optional[tuple[dict[str, Any], Optional[int], Optional[np.ndarray]]] = None  # see Forecaster
+
+
 class Environment:
     """Environment that the EMS agent interacts with, combining the components together."""
 
-    __slots__ = ("components", "_timestep_counter", "_idx")
+    __slots__ = (
+        "components", "_timestep_counter", "_idx", "_tcl_energies", "_profiler", "_data_size", "forecaster",
+        "_observation_means", "_observation_scales", "_steps_per_hour",
+    )
 
-    def __init__(self, params_dict: dict[str, dict[str, Any]], prices_and_temps_path: str, start_time_idx: int):
+    def __init__(
+        self,
+        params_dict: dict[str, dict[str, Any]],
+        prices_and_temps_path: Optional[str],
+        start_time_idx: int,
+        seed: Optional[int] = None,
+        data: Optional[SimulationData] = None,
+        forecast: Optional[ForecastParams] = None,
+        normalization: Optional[SeriesStats] = None,
+        steps_per_hour: int = 1,
+    ):
+        """
+        :param prices_and_temps_path: .npy file of the base prices of the households and the outdoor temperatures.
+            It is memory-mapped, as are the CSV data files (see microgrid_sim.data).
+        :param seed: Seed of the random initial states and of the households, see get_components_by_param_dicts.
+        :param data: If given, the time series are taken from it instead of the data files, whose paths are then
+            ignored. E.g. a scenario of microgrid_sim.scenarios.ScenarioGenerator. With steps_per_hour, it must be
+            at that resolution already (see SimulationData.resample), so it can be resampled once for many
+            environments.
+        :param forecast: If given, forecasts of the next timesteps are available from get_forecast. The data size is
+            reduced by the horizon of the forecasts.
+        :param normalization: Statistics of the hourly data (e.g. Dataset.get_series_stats), which enable
+            get_normalized_observation.
+        :param steps_per_hour: Number of timesteps per hour, e.g. 4 for 15 minute timesteps. The time indices are
+            then in timesteps, the hourly data files are interpolated to the timestep and the hourly parameters of
+            the components are scaled to it (see the steps_per_hour of their params).
+        """
         tcl_params = params_dict["tcl_params"]
         ess_params = params_dict["ess_params"]
         main_grid_params = params_dict["main_grid_params"]
         der_params = params_dict["der_params"]
         residential_params = params_dict["residential_params"]
 
-        prices_and_temps = np.load(prices_and_temps_path)
-        residential_params["hourly_base_prices"] = prices_and_temps[:, 0]
-        tcl_params["out_temps"] = prices_and_temps[:, 1]
+        if data is None and steps_per_hour != 1:
+            data = Dataset(
+                main_grid_params["up_prices_file_path"],
+                main_grid_params["down_prices_file_path"],
+                der_params["hourly_generated_energies_file_path"],
+                prices_and_temps_path,
+            ).load().resample(steps_per_hour)
+        tcl_params["steps_per_hour"] = steps_per_hour
+        ess_params["steps_per_hour"] = steps_per_hour
+        residential_params["steps_per_hour"] = steps_per_hour
+
+        if data is None:
+            prices_and_temps = load_array(prices_and_temps_path)
+            residential_params["hourly_base_prices"] = prices_and_temps[:, 0]
+            out_temps = prices_and_temps[:, 1]
+        else:
+            main_grid_params["up_prices"] = data.up_prices
+            main_grid_params["down_prices"] = data.down_prices
+            der_params["generated_energies"] = TimeSeries(data.generated_energies, data.hours)
+            residential_params["hourly_base_prices"] = data.base_prices
+            out_temps = data.out_temps
+        tcl_params["out_temps"] = out_temps
 
         self.components = get_components_by_param_dicts(
-            tcl_params, ess_params, main_grid_params, der_params, residential_params
+            tcl_params, ess_params, main_grid_params, der_params, residential_params, seed
         )
         self._timestep_counter = count(start_time_idx)
         self._idx = start_time_idx
+        self._steps_per_hour = steps_per_hour
+        self._tcl_energies = tuple(self._get_tcl_energy(tcl_action) for tcl_action in range(4))
+        self._profiler: Optional[ComponentProfiler] = None
+        self._data_size = min(self.components.get_data_size(), len(out_temps))
+        self.forecaster: Optional[Forecaster] = None
+        if forecast is not None:
+            # Spawn key 3 follows the generators of the components, see get_components_by_param_dicts.
+            rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(3,)))
+            self.forecaster = Forecaster(
+                self.components.main_grid.get_up_price_series(),
+                self.components.der.get_generation_series(),
+                out_temps,
+                forecast,
+                rng,
+            )
+            self._data_size = min(self._data_size, self.forecaster.get_data_size())
+        self._observation_means: Optional[np.ndarray] = None
+        self._observation_scales: Optional[np.ndarray] = None
+        if normalization is not None:
+            means, stds = self.get_observation_stats(normalization)
+            self._observation_means = means
+            self._observation_scales = 1.0 / stds
+
+    def get_data_size(self) -> int:
+        """Number of timesteps of data, so the time index must stay below this."""
+        return self._data_size
+
+    def get_observation_stats(self, series_stats: SeriesStats) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Means and standard deviations of the values of the state followed by the forecasts, if any. The time series
+        values are from the given statistics of the hourly data, with the generated energy scaled to the timestep.
+        The SoCs are taken as uniform on [0, 1] and the base residential load as uniform over the hours of day.
+        """
+        out_temp, energy, up_price, hour = range(4)
+        base_loads = [self.components.households_manager.get_base_residential_load(h) for h in range(24)]
+        soc_std = 1 / np.sqrt(12)
+        series_means = series_stats.means.copy()
+        series_stds = series_stats.stds.copy()
+        series_means[energy] /= self._steps_per_hour
+        series_stds[energy] /= self._steps_per_hour
+        means = [
+            0.5, 0.5, series_means[out_temp], series_means[energy], series_means[up_price],
+            np.mean(base_loads), 0.0, series_means[hour],
+        ]
+        stds = [
+            soc_std, soc_std, series_stds[out_temp], series_stds[energy], series_stds[up_price],
+            np.std(base_loads) or 1.0, PRICING_COUNTER_STD, series_stds[hour],
+        ]
+        if self.forecaster is not None:
+            # Same order as in Forecaster.get_forecast
+            horizon = self.forecaster.params.horizon
+            series = [up_price, energy, out_temp]
+            means.extend(np.repeat(series_means[series], horizon))
+            stds.extend(np.repeat(series_stds[series], horizon))
+        return np.array(means, dtype=np.float64), np.array(stds, dtype=np.float64)
+
+    def get_normalized_observation(
+        self, state: tuple[float, float, float, float, float, float, int, int]
+    ) -> np.ndarray:
+        """
+        The state (as returned by step or get_state) followed by the forecasts, if any, normalized to zero mean and
+        unit standard deviation, see get_observation_stats. Requires normalization in the constructor.
+        """
+        assert self._observation_means is not None, "No normalization, give series stats to the constructor."
+        observation = np.array(state, dtype=np.float64)
+        if self.forecaster is not None:
+            observation = np.concatenate((observation, self.get_forecast()))
+        observation -= self._observation_means
+        observation *= self._observation_scales
+        return observation
+
+    def get_forecast(self) -> np.ndarray:
+        """
+        Forecasts of the up price, the generated energy and the outdoor temperature of the next steps, as a vector
+        of the horizon values of each in turn, see Forecaster. Requires forecast params in the constructor.
+        """
+        assert self.forecaster is not None, "No forecasts, give forecast params to the constructor."
+        next_idx = next(self._timestep_counter)
+        self._timestep_counter = count(next_idx)
+        return self.forecaster.get_forecast(next_idx)
 
     def step(
         self, action: tuple[int, int, int, int]
@@ -89,44 +282,147 @@ class Environment:
         Returns state of the environment and reward (generated profit).
         """
         self._idx = next(self._timestep_counter)
-        tcl_action, price_level = action[0], action[1]
-        def_prio = "ESS" if action[2] == 1 else "BUY"
-        excess_prio = "ESS" if action[3] == 1 else "SELL"
-        reward = self._apply_action(tcl_action, price_level, def_prio, excess_prio)
-        state = self.get_state()
-        return state, reward
+        reward = self._apply_action(action[0], action[1], action[2] == 1, action[3] == 1)
+        return self._get_profiled_state(), reward
+
+    def step_idx(self, action_idx: int) -> tuple[tuple[float, float, float, float, float, float, int, int], float]:
+        """
+        Simulate one timestep with the control actions given as a flat action index (0..79), see ACTION_TABLE.
+
+        Returns state of the environment and reward (generated profit).
+        """
+        tcl_action, price_level, deficiency_ess, excess_ess = _ACTION_TUPLES[action_idx]
+        self._idx = next(self._timestep_counter)
+        reward = self._apply_action(tcl_action, price_level, deficiency_ess, excess_ess)
+        return self._get_profiled_state(), reward
+
+    def step_local_idx(
+        self, action_idx: int
+    ) -> tuple[tuple[float, float, float, float, float, float, int, int], float, float]:
+        """
+        Like step_idx, but without trading with the main grid, which is left to the caller (see
+        microgrid_sim.federation). Returns the state, the reward before trading and the net energy to trade,
+        positive for excess energy to sell and negative for deficiency to buy.
+        """
+        tcl_action, price_level, deficiency_ess, excess_ess = _ACTION_TUPLES[action_idx]
+        self._idx = next(self._timestep_counter)
+        local_reward, net_energy = self._apply_local_action(tcl_action, price_level, deficiency_ess, excess_ess)
+        return self._get_profiled_state(), local_reward, net_energy
+
+    def snapshot(self) -> EnvironmentSnapshot:
+        """
+        Returns the state of the environment: the time index, the TCL temperatures, the ESS energy, the pending
+        shifted loads, the pricing counter, the states of the random generators of the households and of the
+        forecast errors. Restoring it continues the simulation identically, e.g. for branching rollouts of a
+        lookahead controller.
+
+        The snapshot refers to the component objects, so it can only be restored to this environment.
+        """
+        next_idx = next(self._timestep_counter)
+        self._timestep_counter = count(next_idx)
+        return EnvironmentSnapshot(
+            self._idx,
+            next_idx,
+            self.components.tcl_aggregator.snapshot(),
+            self.components.ess.snapshot(),
+            self.components.households_manager.snapshot(),
+            self.forecaster.get_state() if self.forecaster is not None else None,
+        )
+
+    def restore(self, snapshot: EnvironmentSnapshot) -> None:
+        """Restore a snapshot of this environment, see snapshot. The snapshot can be restored any number of times."""
+        self._idx = snapshot.idx
+        self._timestep_counter = count(snapshot.next_idx)
+        self.components.tcl_aggregator.restore(snapshot.tcl_aggregator)
+        self.components.ess.restore(snapshot.ess_energy)
+        self.components.households_manager.restore(snapshot.households)
+        if self.forecaster is not None:
+            self.forecaster.set_state(snapshot.forecaster)
+
+    def attach_profiler(self, profiler: ComponentProfiler) -> None:
+        """Start recording the time spent in each component call and in get_state to the given profiler."""
+        self.detach_profiler()
+        for field in fields(self.components):
+            component = getattr(self.components, field.name)
+            setattr(self.components, field.name, ProfiledComponent(component, field.name, profiler))
+        self._profiler = profiler
+
+    def detach_profiler(self) -> None:
+        """Stop profiling. Does nothing if no profiler is attached."""
+        if self._profiler is None:
+            return
+        for field in fields(self.components):
+            proxy = getattr(self.components, field.name)
+            setattr(self.components, field.name, proxy.component)
+        self._profiler = None
+
+    @contextmanager
+    def profiling(self, profiler: Optional[ComponentProfiler] = None) -> Iterator[ComponentProfiler]:
+        """
+        Context manager for profiling the simulation, e.g.
+
+            with env.profiling() as profiler:
+                env.step_idx(0)
+            print(profiler.report())
+        """
+        if profiler is None:
+            profiler = ComponentProfiler()
+        self.attach_profiler(profiler)
+        try:
+            yield profiler
+        finally:
+            self.detach_profiler()
+
+    def _get_profiled_state(self) -> tuple[float, float, float, float, float, float, int, int]:
+        if self._profiler is None:
+            return self.get_state()
+        return self._profiler.call("get_state", self.get_state)
 
     def _get_tcl_energy(self, tcl_action: int) -> float:
-        """Returns energy amount from options {0%, 33%, 67%, 100%} of the max consumption."""
-        max_cons = self.components.tcl_aggregator.get_number_of_tcls() * 1.5
+        """Returns energy amount from options {0%, 33%, 67%, 100%} of the max consumption of a timestep."""
+        max_cons = self.components.tcl_aggregator.get_number_of_tcls() * 1.5 / self._steps_per_hour
         return max_cons * tcl_action / 3
 
-    def _apply_action(self, tcl_action: int, price_level: int, deficiency_prio: str, excess_prio: str) -> float:
+    def _apply_action(self, tcl_action: int, price_level: int, deficiency_ess: int, excess_ess: int) -> float:
         """Apply the choices of the agent and return reward."""
-        tcl_cons = self.components.tcl_aggregator.allocate_energy(self._get_tcl_energy(tcl_action), self._idx)
+        local_reward, net_energy = self._apply_local_action(tcl_action, price_level, deficiency_ess, excess_ess)
+        if net_energy > 0:
+            main_grid_returns = self.components.main_grid.get_sold_profit(net_energy, self._idx)
+        else:
+            main_grid_returns = - self.components.main_grid.get_bought_cost(-net_energy, self._idx)
+        return local_reward + main_grid_returns
+
+    def _apply_local_action(
+        self, tcl_action: int, price_level: int, deficiency_ess: int, excess_ess: int
+    ) -> tuple[float, float]:
+        """
+        Apply the choices of the agent within the microgrid.
+        Returns the reward without the main grid returns and the net energy to sell (or buy, if negative).
+        """
+        tcl_cons = self.components.tcl_aggregator.allocate_energy(self._tcl_energies[tcl_action], self._idx)
         res_cons, res_profit = self.components.households_manager.get_consumption_and_profit(
             self.components.get_hour_of_day(self._idx), price_level, self._idx)
         generated_energy = self.components.der.get_generated_energy(self._idx)
         excess = generated_energy - tcl_cons - res_cons
         if excess > 0:
-            main_grid_returns = self._handle_excess_energy(excess, excess_prio)
+            net_energy = self._handle_excess_energy(excess, excess_ess)
         else:
-            main_grid_returns = - self._cover_energy_deficiency(-excess, deficiency_prio)
-        return self._compute_reward(tcl_cons, res_profit, main_grid_returns)
+            net_energy = - self._cover_energy_deficiency(-excess, deficiency_ess)
+        return self._compute_reward(tcl_cons, res_profit, 0.0), net_energy
 
-    def _cover_energy_deficiency(self, energy: float, priority: str) -> float:
-        """Cover energy deficiency from ESS and/or MainGrid. Returns cost."""
-        if priority == "BUY":
-            return self.components.main_grid.get_bought_cost(energy, self._idx)
+    def _cover_energy_deficiency(self, energy: float, use_ess: int) -> float:
+        """Cover energy deficiency from ESS (if use_ess). Returns the energy to buy from the MainGrid."""
+        if not use_ess:
+            return energy
         ess_energy = self.components.ess.discharge(energy)
-        return self.components.main_grid.get_bought_cost(energy - ess_energy, self._idx)
+        return energy - ess_energy
 
-    def _handle_excess_energy(self, energy: float, priority: str) -> float:
-        """Store excess energy to the ESS or sell it to the MainGrid. Returns profit."""
-        if priority == "SELL":
-            return self.components.main_grid.get_sold_profit(energy, self._idx)
+    def _handle_excess_energy(self, energy: float, use_ess: int) -> float:
+        """Store excess energy to the ESS (if use_ess). Returns the energy to sell to the MainGrid."""
+        if not use_ess:
+            return energy
         ess_excess = self.components.ess.charge(energy)
-        return self.components.main_grid.get_sold_profit(energy - ess_excess, self._idx)
+        return energy - ess_excess
 
     def _compute_reward(self, tcl_consumption: float, residential_profit: float, main_grid_profit: float) -> float:
         gen_cost = self.components.der.generation_cost
@@ -156,7 +452,32 @@ class Environment:
         return state_vector
 
 
-def get_default_microgrid_env(path_to_data: str, start_idx: int) -> Environment:
-    params = get_default_microgrid_params(path_to_data)
-    prices_and_temps_path = os.path.join(path_to_data, "default_price_and_temperatures.npy")
-    return Environment(params, prices_and_temps_path, start_idx)
+def get_default_microgrid_env(
+    path_to_data: str,
+    start_idx: int,
+    num_tcls: int = 100,
+    num_households: int = 150,
+    seed: Optional[int] = None,
+    forecast: Optional[ForecastParams] = None,
+) -> Environment:
+    return get_microgrid_env(
+        Dataset.from_directory(path_to_data), start_idx, num_tcls, num_households, seed, forecast=forecast
+    )
+
+
+def get_microgrid_env(
+    dataset: Dataset,
+    start_idx: int,
+    num_tcls: int = 100,
+    num_households: int = 150,
+    seed: Optional[int] = None,
+    data: Optional[SimulationData] = None,
+    forecast: Optional[ForecastParams] = None,
+    normalization: Optional[SeriesStats] = None,
+    steps_per_hour: int = 1,
+) -> Environment:
+    """Default microgrid with the data of the dataset, or with the given data instead, see Environment."""
+    params = get_microgrid_params(dataset, num_tcls, num_households)
+    return Environment(
+        params, dataset.prices_and_temps_path, start_idx, seed, data, forecast, normalization, steps_per_hour
+    )
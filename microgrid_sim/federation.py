@@ -0,0 +1,274 @@
+"""
+Federation of microgrids sharing one main grid connection, with optional peer-to-peer (P2P) energy exchange.
+
+Each timestep has two phases:
+- Local phase: every microgrid applies its action (TCLs, households, DER and ESS), see
+  Environment.step_local_idx. This is the expensive part and the grids are independent, so it is run
+  either in this process (LocalGrids) or in persistent worker processes which each hold a share of the
+  grids (WorkerGrids).
+- Settlement: one vectorized pass over the net energies of all the grids, see settle. With P2P exchange,
+  the total excess and the total deficiency are matched pro rata at the mid price of the main grid.
+  The rest is sold to or bought from the main grid at its prices.
+"""
+
+import multiprocessing
+from dataclasses import dataclass
+from itertools import count
+from multiprocessing.connection import Connection
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from microgrid_sim.components.from_dict_factories import get_main_grid_from_params_dict
+from microgrid_sim.components.main_grid import MainGrid
+from microgrid_sim.data import Dataset
+from microgrid_sim.environment import Environment, get_microgrid_params
+
+State = tuple[float, float, float, float, float, float, int, int]
+
+
+@dataclass(slots=True)
+class Settlement:
+    """Energy trades and their returns in one timestep, each an array over the grids."""
+    p2p_energies: np.ndarray  # energy sold to (positive) or bought from (negative) the other grids
+    main_grid_energies: np.ndarray  # energy sold to (positive) or bought from (negative) the main grid
+    returns: np.ndarray  # profit of the trades
+
+
+def settle(net_energies: np.ndarray, buy_price: float, sell_price: float, peer_to_peer: bool = True) -> Settlement:
+    """
+    Settle the net energies of the grids (positive for excess, negative for deficiency).
+
+    :param net_energies: Net energies of the grids after their local phase.
+    :param buy_price: Price of energy bought from the main grid, including transmission.
+    :param sell_price: Price of energy sold to the main grid, including transmission.
+    :param peer_to_peer: Match excess and deficiency between the grids first, at (buy_price + sell_price) / 2.
+    :return: Trades and returns of the grids.
+    """
+    excess = np.maximum(net_energies, 0.0)
+    deficiency = np.maximum(-net_energies, 0.0)
+    total_excess = excess.sum()
+    total_deficiency = deficiency.sum()
+    if peer_to_peer and total_excess > 0.0 and total_deficiency > 0.0:
+        traded = min(total_excess, total_deficiency)
+        p2p_energies = excess * (traded / total_excess) - deficiency * (traded / total_deficiency)
+    else:
+        p2p_energies = np.zeros_like(net_energies)
+    main_grid_energies = net_energies - p2p_energies
+
+    p2p_price = (buy_price + sell_price) / 2
+    returns = (
+        p2p_energies * p2p_price
+        + np.maximum(main_grid_energies, 0.0) * sell_price
+        - np.maximum(-main_grid_energies, 0.0) * buy_price
+    )
+    return Settlement(p2p_energies, main_grid_energies, returns)
+
+
+@dataclass(slots=True)
+class GridArgs:
+    """Arguments of the Environment of one grid, for constructing it in a worker process."""
+    params_dict: dict[str, dict[str, Any]]
+    prices_and_temps_path: str
+    start_time_idx: int
+    seed: Optional[int] = None
+
+    def create(self) -> Environment:
+        return Environment(self.params_dict, self.prices_and_temps_path, self.start_time_idx, self.seed)
+
+
+def _step_local(
+    environments: list[Environment], action_indices: Sequence[int]
+) -> tuple[list[State], np.ndarray, np.ndarray]:
+    """Returns the states, the local rewards and the net energies of the environments."""
+    states = []
+    local_rewards = np.empty(len(environments))
+    net_energies = np.empty(len(environments))
+    for i, (env, action_idx) in enumerate(zip(environments, action_indices)):
+        state, local_rewards[i], net_energies[i] = env.step_local_idx(int(action_idx))
+        states.append(state)
+    return states, local_rewards, net_energies
+
+
+class LocalGrids:
+    """Runs the local phase of the grids in this process."""
+
+    __slots__ = ("environments",)
+
+    def __init__(self, environments: list[Environment]):
+        self.environments = environments
+
+    def __len__(self) -> int:
+        return len(self.environments)
+
+    def step_local(self, action_indices: Sequence[int]) -> tuple[list[State], np.ndarray, np.ndarray]:
+        """Returns the states, the local rewards and the net energies of the grids."""
+        return _step_local(self.environments, action_indices)
+
+    def get_states(self) -> list[State]:
+        return [env.get_state() for env in self.environments]
+
+    def close(self) -> None:
+        pass
+
+
+def _worker(connection: Connection, grid_args: list[GridArgs]) -> None:
+    """Holds the environments of a share of the grids and runs commands on them until "close"."""
+    environments = [args.create() for args in grid_args]
+    while True:
+        command, data = connection.recv()
+        try:
+            if command == "step_local":
+                result = _step_local(environments, data)
+            elif command == "get_states":
+                result = [env.get_state() for env in environments]
+            elif command == "close":
+                connection.send((True, None))
+                break
+            else:
+                raise ValueError(f"Unknown command {command!r}")
+        except Exception as error:  # sent to the main process, which raises it
+            connection.send((False, error))
+        else:
+            connection.send((True, result))
+    connection.close()
+
+
+class WorkerGrids:
+    """Runs the local phase of the grids in persistent worker processes, each holding a contiguous share."""
+
+    __slots__ = ("_connections", "_processes", "_bounds")
+
+    def __init__(self, grid_args: list[GridArgs], num_workers: int):
+        num_workers = max(1, min(num_workers, len(grid_args)))
+        self._bounds = np.linspace(0, len(grid_args), num_workers + 1).round().astype(int).tolist()
+        context = multiprocessing.get_context()
+        self._connections: list[Connection] = []
+        self._processes = []
+        for start, end in zip(self._bounds[:-1], self._bounds[1:]):
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(target=_worker, args=(child_connection, grid_args[start:end]), daemon=True)
+            process.start()
+            child_connection.close()
+            self._connections.append(parent_connection)
+            self._processes.append(process)
+
+    def __len__(self) -> int:
+        return self._bounds[-1]
+
+    def _run(self, command: str, data_by_worker: Sequence[Any]) -> list[Any]:
+        for connection, data in zip(self._connections, data_by_worker):
+            connection.send((command, data))
+        results = []
+        for connection in self._connections:
+            success, result = connection.recv()
+            if not success:
+                raise result
+            results.append(result)
+        return results
+
+    def step_local(self, action_indices: Sequence[int]) -> tuple[list[State], np.ndarray, np.ndarray]:
+        """Returns the states, the local rewards and the net energies of the grids."""
+        action_indices = list(action_indices)
+        shares = [action_indices[start:end] for start, end in zip(self._bounds[:-1], self._bounds[1:])]
+        results = self._run("step_local", shares)
+        states = [state for share_states, _, _ in results for state in share_states]
+        return states, np.concatenate([r[1] for r in results]), np.concatenate([r[2] for r in results])
+
+    def get_states(self) -> list[State]:
+        results = self._run("get_states", [None] * len(self._connections))
+        return [state for share_states in results for state in share_states]
+
+    def close(self) -> None:
+        if not self._processes:
+            return
+        self._run("close", [None] * len(self._connections))
+        for process in self._processes:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+        self._processes = []
+
+
+class Federation:
+    """Microgrids behind one main grid connection, stepped in lockstep with a shared settlement."""
+
+    __slots__ = ("grids", "_main_grid", "peer_to_peer", "_timestep_counter", "_idx", "settlement")
+
+    def __init__(
+        self,
+        grids: Union[LocalGrids, WorkerGrids],
+        main_grid: MainGrid,
+        start_time_idx: int,
+        peer_to_peer: bool = True,
+    ):
+        """
+        :param grids: The grids, which must all start at start_time_idx.
+        :param main_grid: The shared main grid.
+        :param start_time_idx: Data index of the first timestep.
+        :param peer_to_peer: Whether the grids exchange energy with each other before the main grid.
+        """
+        self.grids = grids
+        self._main_grid = main_grid
+        self.peer_to_peer = peer_to_peer
+        # Same time indexing as Environment.
+        self._timestep_counter = count(start_time_idx)
+        self._idx = start_time_idx
+        self.settlement: Optional[Settlement] = None  # of the latest step
+
+    def step_idx(self, action_indices: ArrayLike) -> tuple[list[State], np.ndarray]:
+        """
+        Simulate one timestep of all the grids with their flat action indices (0..79), see Environment.step_idx.
+
+        Returns the states and the rewards of the grids. The trades are in self.settlement.
+        """
+        action_indices = np.asarray(action_indices, dtype=np.int64)
+        assert action_indices.shape == (len(self.grids),)
+        self._idx = next(self._timestep_counter)
+        states, local_rewards, net_energies = self.grids.step_local(action_indices.tolist())
+
+        buy_price = self._main_grid.get_up_price(self._idx) + self._main_grid.imp_transmission_cost
+        sell_price = self._main_grid.get_down_price(self._idx) - self._main_grid.exp_transmission_cost
+        self.settlement = settle(net_energies, buy_price, sell_price, self.peer_to_peer)
+        return states, local_rewards + self.settlement.returns
+
+    def get_states(self) -> list[State]:
+        return self.grids.get_states()
+
+    def close(self) -> None:
+        """Stop the worker processes, if any."""
+        self.grids.close()
+
+
+def get_default_federation(
+    path_to_data: str,
+    start_idx: int,
+    num_grids: int,
+    num_tcls: int = 100,
+    num_households: int = 150,
+    seed: Optional[int] = None,
+    num_workers: int = 0,
+    peer_to_peer: bool = True,
+) -> Federation:
+    """
+    Federation of num_grids default microgrids (see get_default_microgrid_env) with independently seeded
+    components. The grids are stepped in this process if num_workers is 0, otherwise in num_workers processes.
+    """
+    dataset = Dataset.from_directory(path_to_data)
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(num_grids)]
+    grid_args = [
+        GridArgs(
+            get_microgrid_params(dataset, num_tcls, num_households),
+            dataset.prices_and_temps_path,
+            start_idx,
+            grid_seed if seed is not None else None,
+        )
+        for grid_seed in seeds
+    ]
+    main_grid = get_main_grid_from_params_dict(get_microgrid_params(dataset)["main_grid_params"])
+    if num_workers > 0:
+        grids = WorkerGrids(grid_args, num_workers)
+    else:
+        grids = LocalGrids([args.create() for args in grid_args])
+    return Federation(grids, main_grid, start_idx, peer_to_peer)
@@ -0,0 +1,90 @@
+"""
+Forecasts of the next timesteps of the up price, the wind generation and the outdoor temperature.
+
+The forecasts are rows of sliding-window views over the data arrays (numpy.lib.stride_tricks.sliding_window_view),
+so getting one is a few indexing operations without copying or looping over the data. Noisy forecasts add
+Gaussian errors whose standard deviation grows with the square root of the lead time.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.typing import ArrayLike
+
+NUM_FORECAST_SERIES = 3
+
+
+@dataclass(frozen=True, slots=True)
+class ForecastParams:
+    horizon: int = 24  # number of timesteps forecast
+    noise_stds: tuple[float, float, float] = (0.0, 0.0, 0.0)  # of the up price, wind and temperature one timestep ahead
+
+    @property
+    def size(self) -> int:
+        """Length of a forecast vector."""
+        return NUM_FORECAST_SERIES * self.horizon
+
+
+class Forecaster:
+    """
+    Forecasts of the horizon timesteps from a given timestep on, as one vector of the up prices (in the units of
+    Environment.get_state), the generated energies and the outdoor temperatures.
+    """
+
+    __slots__ = ("_prices", "_energies", "_temps", "params", "_noise_scales", "_rng", "_idx", "_forecast")
+
+    def __init__(
+        self,
+        up_prices: ArrayLike,
+        generated_energies: ArrayLike,
+        out_temps: ArrayLike,
+        params: ForecastParams,
+        rng: Optional[np.random.Generator] = None,
+    ):
+        """
+        :param up_prices: Up prices per MWh by data index, as MainGrid.
+        :param generated_energies: Generated energies by data index.
+        :param out_temps: Outdoor temperatures by data index.
+        :param params: Horizon and noise of the forecasts.
+        :param rng: Generator of the forecast errors, a new unseeded one if None.
+        """
+        assert params.horizon > 0
+        length = min(len(up_prices), len(generated_energies), len(out_temps))
+        self._prices = sliding_window_view(np.asarray(up_prices)[:length], params.horizon)
+        self._energies = sliding_window_view(np.asarray(generated_energies)[:length], params.horizon)
+        self._temps = sliding_window_view(np.asarray(out_temps)[:length], params.horizon)
+        self.params = params
+        if any(params.noise_stds):
+            lead_scales = np.sqrt(np.arange(1, params.horizon + 1))
+            self._noise_scales = np.outer(params.noise_stds, lead_scales).ravel()
+        else:
+            self._noise_scales = None
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._idx: Optional[int] = None
+        self._forecast: Optional[np.ndarray] = None
+
+    def get_data_size(self) -> int:
+        """Number of timesteps before which a full forecast of the following timesteps can be made."""
+        return len(self._prices) - 1
+
+    def get_forecast(self, idx: int) -> np.ndarray:
+        """
+        Returns the forecast of timesteps idx, ..., idx + horizon - 1. Repeated calls for the same timestep return
+        the same forecast, so the errors of noisy forecasts are drawn once per timestep.
+        """
+        if idx != self._idx:
+            forecast = np.concatenate((self._prices[idx] / 1000, self._energies[idx], self._temps[idx]))
+            if self._noise_scales is not None:
+                forecast += self._rng.normal(0.0, 1.0, len(forecast)) * self._noise_scales
+            self._idx = idx
+            self._forecast = forecast
+        return self._forecast
+
+    def get_state(self) -> tuple[dict[str, Any], Optional[int], Optional[np.ndarray]]:
+        """State of the forecast errors: the state of the generator and the latest forecast and its timestep."""
+        return self._rng.bit_generator.state, self._idx, self._forecast
+
+    def set_state(self, state: tuple[dict[str, Any], Optional[int], Optional[np.ndarray]]) -> None:
+        self._rng.bit_generator.state, self._idx, self._forecast = state
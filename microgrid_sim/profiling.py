@@ -0,0 +1,87 @@
+"""Opt-in profiling of the simulation hot path."""
+
+from time import perf_counter
+from typing import Any, Callable
+
+
+class ComponentProfiler:
+    """
+    Accumulates wall time and call counts per component call, keyed e.g. 'tcl_aggregator.allocate_energy'.
+
+    Times are inclusive, e.g. 'get_state' includes the component calls made while collecting the state.
+    """
+    __slots__ = ("times", "counts")
+
+    def __init__(self):
+        self.times: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def call(self, key: str, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call the function and record the time spent under the given key."""
+        start_t = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start_t
+            self.times[key] = self.times.get(key, 0.0) + elapsed
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def get_breakdown(self) -> dict[str, tuple[float, int]]:
+        """Returns {key: (total time in seconds, number of calls)}, sorted by total time in descending order."""
+        keys = sorted(self.times, key=lambda k: self.times[k], reverse=True)
+        return dict((key, (self.times[key], self.counts[key])) for key in keys)
+
+    def merge(self, other: "ComponentProfiler") -> None:
+        """Add the statistics of another profiler (e.g. from a worker process) to this one."""
+        for key, elapsed in other.times.items():
+            self.times[key] = self.times.get(key, 0.0) + elapsed
+            self.counts[key] = self.counts.get(key, 0) + other.counts[key]
+
+    def reset(self) -> None:
+        self.times = {}
+        self.counts = {}
+
+    def report(self) -> str:
+        """Returns the breakdown as a human-readable table."""
+        lines = [f"{'call':<50} {'total (s)':>10} {'calls':>8} {'per call (us)':>14}"]
+        for key, (elapsed, calls) in self.get_breakdown().items():
+            lines.append(f"{key:<50} {elapsed:>10.4f} {calls:>8} {elapsed / calls * 1e6:>14.2f}")
+        return "\n".join(lines)
+
+
+class ProfiledComponent:
+    """
+    Proxy that forwards attribute access to a component and records the time of its method calls.
+
+    The timing wrapper of each method is created once and cached, so that the timed loop does not allocate it.
+    """
+    __slots__ = ("_component", "_name", "_profiler", "_wrappers")
+
+    def __init__(self, component: Any, name: str, profiler: ComponentProfiler):
+        object.__setattr__(self, "_component", component)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_profiler", profiler)
+        object.__setattr__(self, "_wrappers", {})
+
+    @property
+    def component(self) -> Any:
+        return self._component
+
+    def __getattr__(self, attr: str) -> Any:
+        wrapper = self._wrappers.get(attr)
+        if wrapper is not None:
+            return wrapper
+        value = getattr(self._component, attr)
+        if not callable(value):
+            return value
+        key = f"{self._name}.{attr}"
+        profiler = self._profiler
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            return profiler.call(key, value, *args, **kwargs)
+        self._wrappers[attr] = timed
+        return timed
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        self._wrappers.pop(attr, None)
+        setattr(self._component, attr, value)
@@ -0,0 +1,116 @@
+"""
+Synthetic scenarios of the time series (prices, wind generation and temperatures) by seasonal block bootstrap.
+
+A scenario is a SimulationData of the given length, which can be given to Environment instead of the data files.
+It is built from blocks of block_length consecutive hours of the source data, with all the series of a block taken
+from the same source hours, so that their correlations (e.g. of the wind and the prices) are kept. The blocks
+follow a random anchor in the source, each shifted by a random number of whole days within the season window, so
+the scenario keeps the season and the hour of day of the anchor but mixes the days around it.
+
+Generating a scenario is one fancy-indexing pass over the source arrays. The scenarios are generated lazily when
+first requested and kept in an LRU cache.
+"""
+
+from collections import OrderedDict
+from dataclasses import fields
+from typing import Optional
+
+import numpy as np
+
+from microgrid_sim.data import Dataset, SeriesStats, SimulationData
+
+
+class ScenarioGenerator:
+    """
+    A fixed number of scenarios, generated lazily. Scenario idx is always the same for a given seed, whether it is
+    generated first or again after being evicted from the cache.
+    """
+
+    __slots__ = (
+        "_source", "length", "num_scenarios", "block_length", "season_window_days", "_seed_sequence", "_cache",
+        "maxsize", "hits", "misses",
+    )
+
+    def __init__(
+        self,
+        source: SimulationData,
+        length: int,
+        num_scenarios: int,
+        block_length: int = 24,
+        season_window_days: int = 15,
+        seed: Optional[int] = None,
+        maxsize: int = 64,
+    ):
+        """
+        :param source: The data to resample.
+        :param length: Number of timesteps in each scenario.
+        :param num_scenarios: Number of distinct scenarios.
+        :param block_length: Number of consecutive source hours in each block.
+        :param season_window_days: Maximum shift of a block from its place after the anchor, in days.
+        :param seed: Seed of the scenarios, random if None.
+        :param maxsize: Maximum number of scenarios kept in the cache.
+        """
+        assert length > 0 and num_scenarios > 0 and block_length > 0 and maxsize > 0
+        if len(source) < length + 2 * 24 * season_window_days:
+            raise ValueError(
+                f"Source data of length {len(source)} is too short for scenarios of length {length} "
+                f"with a season window of {season_window_days} days"
+            )
+        self._source = source
+        self.length = length
+        self.num_scenarios = num_scenarios
+        self.block_length = block_length
+        self.season_window_days = season_window_days
+        self._seed_sequence = np.random.SeedSequence(seed)
+        self._cache: OrderedDict[int, SimulationData] = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_dataset(cls, dataset: Dataset, length: int, num_scenarios: int, **kwargs) -> "ScenarioGenerator":
+        """Generator resampling the given dataset, see __init__ for the keyword arguments."""
+        return ScenarioGenerator(dataset.load(), length, num_scenarios, **kwargs)
+
+    def __len__(self) -> int:
+        return self.num_scenarios
+
+    def get_scenario(self, idx: int) -> SimulationData:
+        """Returns scenario idx (0..num_scenarios - 1), generating it if it is not in the cache."""
+        if not 0 <= idx < self.num_scenarios:
+            raise IndexError(f"Scenario index {idx} out of range for {self.num_scenarios} scenarios")
+        scenario = self._cache.get(idx)
+        if scenario is not None:
+            self.hits += 1
+            self._cache.move_to_end(idx)
+            return scenario
+        self.misses += 1
+        scenario = self._generate(idx)
+        self._cache[idx] = scenario
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return scenario
+
+    def get_source_stats(self) -> SeriesStats:
+        """Statistics of the source data, which the scenarios follow."""
+        return SeriesStats.from_data(self._source)
+
+    def get_hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_source_indices(self, idx: int) -> np.ndarray:
+        """Indices of the source data of each timestep of scenario idx."""
+        rng = np.random.default_rng(
+            np.random.SeedSequence(self._seed_sequence.entropy, spawn_key=(*self._seed_sequence.spawn_key, idx))
+        )
+        window = 24 * self.season_window_days
+        anchor = int(rng.integers(window, len(self._source) - self.length - window + 1))
+        num_blocks = -(-self.length // self.block_length)
+        shifts = 24 * rng.integers(-self.season_window_days, self.season_window_days + 1, num_blocks)
+        starts = anchor + np.arange(num_blocks) * self.block_length + shifts
+        return (starts[:, np.newaxis] + np.arange(self.block_length)).ravel()[:self.length]
+
+    def _generate(self, idx: int) -> SimulationData:
+        indices = self.get_source_indices(idx)
+        return SimulationData(*(getattr(self._source, field.name)[indices] for field in fields(SimulationData)))
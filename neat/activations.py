@@ -5,6 +5,10 @@ and code for adding new user-defined ones
 """
 
 import math
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
 
 
 def sigmoid_activation(z):
@@ -92,3 +96,151 @@ def square_activation(z):
 
 def cube_activation(z):
     return z ** 3
+
+
+def _sigmoid_vectorized(z):
+    z = np.clip(5.0 * z, -60.0, 60.0)
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _tanh_vectorized(z):
+    return np.tanh(np.clip(2.5 * z, -60.0, 60.0))
+
+
+def _sin_vectorized(z):
+    return np.sin(np.clip(5.0 * z, -60.0, 60.0))
+
+
+def _gauss_vectorized(z):
+    z = np.clip(z, -3.4, 3.4)
+    return np.exp(-5.0 * z ** 2)
+
+
+def _relu_vectorized(z):
+    return np.where(z > 0.0, z, 0.0)
+
+
+def _elu_vectorized(z):
+    return np.where(z > 0.0, z, np.exp(np.minimum(z, 0.0)) - 1)
+
+
+def _lelu_vectorized(z):
+    leaky = 0.005
+    return np.where(z > 0.0, z, leaky * z)
+
+
+def _selu_vectorized(z):
+    lam = 1.0507009873554804934193349852946
+    alpha = 1.6732632423543772848170429916717
+    return np.where(z > 0.0, lam * z, lam * alpha * (np.exp(np.minimum(z, 0.0)) - 1))
+
+
+def _softplus_vectorized(z):
+    z = np.clip(5.0 * z, -60.0, 60.0)
+    return 0.2 * np.log(1 + np.exp(z))
+
+
+def _identity_vectorized(z):
+    return np.array(z, dtype=np.float64)
+
+
+def _clamped_vectorized(z):
+    return np.clip(z, -1.0, 1.0)
+
+
+def _inv_vectorized(z):
+    z = np.asarray(z, dtype=np.float64)
+    result = np.zeros_like(z)
+    with np.errstate(over="ignore"):
+        np.divide(1.0, z, out=result, where=z != 0.0)
+    return result
+
+
+def _log_vectorized(z):
+    return np.log(np.maximum(z, 1e-7))
+
+
+def _exp_vectorized(z):
+    return np.exp(np.clip(z, -60.0, 60.0))
+
+
+def _abs_vectorized(z):
+    return np.abs(z)
+
+
+def _hat_vectorized(z):
+    return np.maximum(0.0, 1 - np.abs(z))
+
+
+def _square_vectorized(z):
+    return np.asarray(z, dtype=np.float64) ** 2
+
+
+def _cube_vectorized(z):
+    return np.asarray(z, dtype=np.float64) ** 3
+
+
+@dataclass(frozen=True, slots=True)
+class ActivationFunction:
+    """A scalar activation function paired with a NumPy version that has the same clamping semantics."""
+    name: str
+    scalar: Callable[[float], float]
+    vectorized: Callable[[np.ndarray], np.ndarray]
+    # Non-decreasing, so the largest output is the activation of the largest sum, and the argmax of the outputs can be
+    # taken over the sums unless the activation turns the largest sum and the runner-up into a tie.
+    monotonic: bool = False
+
+
+_activations: dict[str, ActivationFunction] = {}
+_activations_by_scalar: dict[Callable[[float], float], ActivationFunction] = {}
+
+
+def add_activation(
+    name: str,
+    scalar: Callable[[float], float],
+    vectorized: Callable[[np.ndarray], np.ndarray],
+    monotonic: bool = False,
+):
+    """Register a (new user-defined) activation function under the given name."""
+    activation = ActivationFunction(name, scalar, vectorized, monotonic)
+    _activations[name] = activation
+    _activations_by_scalar[scalar] = activation
+
+
+def get_activation(name: str) -> ActivationFunction:
+    try:
+        return _activations[name]
+    except KeyError:
+        raise ValueError(f"Unknown activation function: {name!r}")
+
+
+def get_activation_by_scalar(scalar: Callable[[float], float]) -> ActivationFunction:
+    """Returns the registered activation of the given scalar function, e.g. to find its vectorized version."""
+    try:
+        return _activations_by_scalar[scalar]
+    except KeyError:
+        raise ValueError(f"Activation function {scalar!r} is not registered")
+
+
+def get_activation_names() -> list[str]:
+    return list(_activations)
+
+
+add_activation("sigmoid", sigmoid_activation, _sigmoid_vectorized, monotonic=True)
+add_activation("tanh", tanh_activation, _tanh_vectorized, monotonic=True)
+add_activation("sin", sin_activation, _sin_vectorized)
+add_activation("gauss", gauss_activation, _gauss_vectorized)
+add_activation("relu", relu_activation, _relu_vectorized, monotonic=True)
+add_activation("elu", elu_activation, _elu_vectorized, monotonic=True)
+add_activation("lelu", lelu_activation, _lelu_vectorized, monotonic=True)
+add_activation("selu", selu_activation, _selu_vectorized, monotonic=True)
+add_activation("softplus", softplus_activation, _softplus_vectorized, monotonic=True)
+add_activation("identity", identity_activation, _identity_vectorized, monotonic=True)
+add_activation("clamped", clamped_activation, _clamped_vectorized, monotonic=True)
+add_activation("inv", inv_activation, _inv_vectorized)
+add_activation("log", log_activation, _log_vectorized, monotonic=True)
+add_activation("exp", exp_activation, _exp_vectorized, monotonic=True)
+add_activation("abs", abs_activation, _abs_vectorized)
+add_activation("hat", hat_activation, _hat_vectorized)
+add_activation("square", square_activation, _square_vectorized)
+add_activation("cube", cube_activation, _cube_vectorized, monotonic=True)
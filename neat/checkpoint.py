@@ -0,0 +1,339 @@
+"""
+Periodic checkpoints of the evolution, and resuming from them.
+
+A checkpoint is a zlib compressed pickle of the evolution state, written to <directory>/<generation>.ckpt.
+Most checkpoints are incremental: they store only the genomes which are new or changed since the previous
+checkpoint (detected by get_genome_hash), the fitnesses of all the genomes and the appended history.
+Every full_interval-th checkpoint stores the full state, after which the older checkpoints are removed.
+
+The state is captured in the calling thread, but compressing and writing it (to a temporary file, which is
+then atomically renamed) is done in a background thread, so that evaluation of the next generation is not
+stalled. A crash leaves the directory with the latest complete checkpoint, which resume loads.
+
+If a PhenotypeCache is given, the checkpoints also store the accumulated fitness and number of evaluated episodes
+of the cached genomes, and resume restores their entries. So a resumed run tops up their fitnesses with the same
+episodes as an uninterrupted run, instead of evaluating them again from the first episode.
+"""
+
+import os
+import pickle
+import random
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from itertools import count, islice
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from neat.config import NeatParams
+from neat.evolution import Evolution
+from neat.genetics.genome import Genome
+from neat.genetics.species import Species, SpeciesSet
+from neat.metrics import MetricsRecorder
+from neat.phenotype_cache import CacheEntry, PhenotypeCache, get_genome_hash
+from neat.reproduction import Reproduction
+
+MAGIC = b"NEATCKPT1\n"
+SUFFIX = ".ckpt"
+
+
+@dataclass(slots=True)
+class SpeciesState:
+    """Species with its genomes replaced by their keys."""
+    key: int
+    created: int
+    last_improved: int
+    representative: Optional[int]
+    members: list[int]
+    fitness: Optional[float]
+    adjusted_fitness: Optional[float]
+    fitness_history: list[float]
+
+
+def _take_counter(obj: Any, attr: str) -> int:
+    """Returns the next value of an itertools.count attribute, which is replaced by a count from that value."""
+    value = next(getattr(obj, attr))
+    setattr(obj, attr, count(value))
+    return value
+
+
+def _get_genomes(evolution: Evolution) -> dict[int, Genome]:
+    """Returns the genomes of the population and the species (including representatives) by key."""
+    genomes = dict(evolution.population)
+    for species in evolution.species_set.species.values():
+        genomes.update(species.members)
+        if species.representative is not None:
+            genomes[species.representative.key] = species.representative
+    return genomes
+
+
+class Checkpointer:
+    """Writes a checkpoint of the evolution every interval generations, see Evolution.run."""
+    __slots__ = (
+        "directory",
+        "interval",
+        "full_interval",
+        "_executor",
+        "_pending",
+        "_num_written",
+        "_previous_name",
+        "_genome_hashes",
+        "_history_length",
+        "_ancestors_length",
+        "_metrics_length",
+        "_phenotype_cache",
+    )
+
+    def __init__(
+        self,
+        directory: str,
+        interval: int = 1,
+        full_interval: int = 10,
+        phenotype_cache: Optional[PhenotypeCache] = None,
+    ):
+        """
+        :param directory: Directory of the checkpoint files, created if needed.
+        :param interval: Write a checkpoint every interval generations.
+        :param full_interval: Every full_interval-th checkpoint is a full one, the others are incremental.
+        :param phenotype_cache: Cache of the fitness function, whose entries of the genomes are checkpointed too.
+        """
+        assert interval > 0 and full_interval > 0
+        self.directory = directory
+        self.interval = interval
+        self.full_interval = full_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpointer")
+        self._pending: list[Future] = []
+        self._num_written = 0
+        self._previous_name: Optional[str] = None
+        self._genome_hashes: dict[int, str] = {}
+        self._history_length = 0
+        self._ancestors_length = 0
+        self._metrics_length = 0
+        self._phenotype_cache = phenotype_cache
+        os.makedirs(directory, exist_ok=True)
+
+    def maybe_save(self, evolution: Evolution, metrics: Optional[MetricsRecorder] = None) -> None:
+        """Save a checkpoint if the generation is a multiple of the interval."""
+        if evolution.generation % self.interval == 0:
+            self.save(evolution, metrics)
+
+    def save(self, evolution: Evolution, metrics: Optional[MetricsRecorder] = None) -> None:
+        """Capture the state of the evolution (and metrics records) and write it in the background."""
+        full = self._num_written % self.full_interval == 0
+        state = self._get_state(evolution, metrics, full)
+        # Pickling in this thread takes a consistent snapshot, as the evolution continues to modify the objects.
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        name = f"{evolution.generation:06d}{SUFFIX}"
+        self._previous_name = name
+        self._num_written += 1
+        self._pending = [future for future in self._pending if not future.done() or future.exception()]
+        self._pending.append(self._executor.submit(self._write, name, data, full))
+
+    def wait(self) -> None:
+        """Wait until the pending checkpoints are written. Raises the exceptions of failed writes."""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self) -> None:
+        self.wait()
+        self._executor.shutdown()
+
+    def _get_state(self, evolution: Evolution, metrics: Optional[MetricsRecorder], full: bool) -> dict[str, Any]:
+        reproduction = evolution.reproduction
+        species_set = evolution.species_set
+
+        genomes = _get_genomes(evolution)
+        hashes = dict((key, get_genome_hash(genome)) for key, genome in genomes.items())
+        if full:
+            changed = genomes
+            self._history_length = self._ancestors_length = self._metrics_length = 0
+        else:
+            changed = dict((k, g) for k, g in genomes.items() if self._genome_hashes.get(k) != hashes[k])
+        self._genome_hashes = hashes
+
+        species = []
+        for s in species_set.species.values():
+            representative = s.representative.key if s.representative is not None else None
+            species.append(SpeciesState(
+                s.key, s.created, s.last_improved, representative, list(s.members),
+                s.fitness, s.adjusted_fitness, list(s.fitness_history),
+            ))
+
+        history = evolution.species_history[self._history_length:]
+        ancestors = dict(islice(reproduction.ancestors.items(), self._ancestors_length, None))
+        records = metrics.records[self._metrics_length:] if metrics is not None else []
+        self._history_length = len(evolution.species_history)
+        self._ancestors_length = len(reproduction.ancestors)
+        self._metrics_length = len(metrics.records) if metrics is not None else 0
+
+        episodes = {}
+        if self._phenotype_cache is not None:
+            for genome_hash in hashes.values():
+                entry = self._phenotype_cache.peek(genome_hash)
+                if entry is not None:
+                    episodes[genome_hash] = (entry.fitness_sum, entry.num_episodes)
+
+        return {
+            "full": full,
+            "base": None if full else self._previous_name,
+            "generation": evolution.generation,
+            "neat_params": evolution._neat_params,
+            "num_inputs": reproduction.num_inputs,
+            "num_outputs": reproduction.num_outputs,
+            "genomes": changed,
+            "fitnesses": dict((key, genome.fitness) for key, genome in genomes.items()),
+            "population": list(evolution.population),
+            "species": species,
+            "genome_to_species": dict(species_set._genome_to_species),
+            "species_indexer": _take_counter(species_set, "_indexer"),
+            "genome_indexer": _take_counter(reproduction, "genome_indexer"),
+            "node_counter": _take_counter(reproduction, "node_counter"),
+            "conn_counter": _take_counter(reproduction, "conn_counter"),
+            "ancestors": ancestors,
+            "species_history": history,
+            "best_genome": evolution.best_genome,
+            "metrics": records,
+            "episodes": episodes,
+            "reproduction_random_state": reproduction.rng.getstate(),
+            "random_state": random.getstate(),
+            "numpy_random_state": np.random.get_state(),
+        }
+
+    def _write(self, name: str, data: bytes, full: bool) -> None:
+        path = os.path.join(self.directory, name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(MAGIC)
+            file.write(zlib.compress(data, 1))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+        if full:
+            for old_name in get_checkpoint_names(self.directory):
+                if old_name < name:
+                    os.remove(os.path.join(self.directory, old_name))
+
+
+def get_checkpoint_names(directory: str) -> list[str]:
+    """Returns the names of the checkpoint files in the directory, from the oldest to the latest."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if name.endswith(SUFFIX))
+
+
+def _read(path: str) -> dict[str, Any]:
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint file")
+        return pickle.loads(zlib.decompress(file.read()))
+
+
+def load_states(directory: str) -> list[dict[str, Any]]:
+    """Returns the states of the latest checkpoint and its incremental predecessors, starting from a full one."""
+    names = get_checkpoint_names(directory)
+    if not names:
+        raise FileNotFoundError(f"No checkpoints in {directory}")
+    states = [_read(os.path.join(directory, names[-1]))]
+    while not states[0]["full"]:
+        states.insert(0, _read(os.path.join(directory, states[0]["base"])))
+    return states
+
+
+def _check_neat_params(checkpointed: NeatParams, current: NeatParams) -> None:
+    differences = [
+        f"{field.name}: {getattr(checkpointed, field.name)!r} != {getattr(current, field.name)!r}"
+        for field in fields(NeatParams)
+        if getattr(checkpointed, field.name) != getattr(current, field.name)
+    ]
+    if differences:
+        raise ValueError("The checkpoint was written with other NEAT parameters: " + ", ".join(differences))
+
+
+def resume(
+    directory: str,
+    species_fitness_function: Callable[[list[float]], float],
+    metrics: Optional[MetricsRecorder] = None,
+    neat_params: Optional[NeatParams] = None,
+    phenotype_cache: Optional[PhenotypeCache] = None,
+    create_phenotype: Optional[Callable[[Genome], Any]] = None,
+) -> Evolution:
+    """
+    Returns the Evolution from the latest checkpoint in the directory, ready to continue with Evolution.run.
+    The random states of the reproduction and the global ones are restored too.
+
+    :param metrics: If given, the checkpointed records are added to it.
+    :param neat_params: If given, raises a ValueError if the checkpoint was written with other parameters.
+    :param phenotype_cache: If given, the checkpointed entries of the genomes (see Checkpointer) are put in it,
+        with the phenotypes created by create_phenotype.
+    """
+    assert phenotype_cache is None or create_phenotype is not None
+    states = load_states(directory)
+    if neat_params is not None:
+        _check_neat_params(states[-1]["neat_params"], neat_params)
+    genomes: dict[int, Genome] = {}
+    ancestors: dict[int, tuple[int, int]] = {}
+    species_history = []
+    records = []
+    for state in states:
+        genomes.update(state["genomes"])
+        ancestors.update(state["ancestors"])
+        species_history.extend(state["species_history"])
+        records.extend(state["metrics"])
+    state = states[-1]
+    for key, fitness in state["fitnesses"].items():
+        genomes[key].fitness = fitness
+
+    neat_params = state["neat_params"]
+    reproduction = Reproduction(state["num_inputs"], state["num_outputs"], neat_params, species_fitness_function)
+    reproduction.genome_indexer = count(state["genome_indexer"])
+    reproduction.node_counter = count(state["node_counter"])
+    reproduction.conn_counter = count(state["conn_counter"])
+    reproduction.ancestors = ancestors
+    reproduction.rng.setstate(state["reproduction_random_state"])
+
+    species_set = SpeciesSet(
+        neat_params.compatibility_threshold, neat_params.disjoint_coefficient, neat_params.weight_coefficient
+    )
+    species_set._indexer = count(state["species_indexer"])
+    species_set._genome_to_species = state["genome_to_species"]
+    for s in state["species"]:
+        species = Species(s.key, s.created)
+        species.last_improved = s.last_improved
+        species.representative = genomes[s.representative] if s.representative is not None else None
+        species.members = dict((key, genomes[key]) for key in s.members)
+        species.fitness = s.fitness
+        species.adjusted_fitness = s.adjusted_fitness
+        species.fitness_history = s.fitness_history
+        species_set.species[s.key] = species
+
+    evolution = Evolution.__new__(Evolution)
+    evolution._neat_params = neat_params
+    evolution.generation = state["generation"]
+    evolution.reproduction = reproduction
+    evolution.population = dict((key, genomes[key]) for key in state["population"])
+    evolution.species_set = species_set
+    evolution.species_history = species_history
+    evolution.best_genome = state["best_genome"]
+
+    random.setstate(state["random_state"])
+    np.random.set_state(state["numpy_random_state"])
+    if metrics is not None:
+        metrics.records.extend(records)
+    if phenotype_cache is not None:
+        _restore_episodes(phenotype_cache, create_phenotype, _get_genomes(evolution), state.get("episodes", {}))
+    return evolution
+
+
+def _restore_episodes(
+    phenotype_cache: PhenotypeCache,
+    create_phenotype: Callable[[Genome], Any],
+    genomes: dict[int, Genome],
+    episodes: dict[str, tuple[float, int]],
+) -> None:
+    for genome in genomes.values():
+        genome_hash = get_genome_hash(genome)
+        if genome_hash in episodes and phenotype_cache.peek(genome_hash) is None:
+            fitness_sum, num_episodes = episodes[genome_hash]
+            phenotype_cache.put(genome_hash, CacheEntry(create_phenotype(genome), fitness_sum, num_episodes))
@@ -34,3 +34,10 @@ class NeatParams:
     bias_max_adjust: float
     bias_min_val: float
     bias_max_val: float
+
+    feed_forward: bool = False  # If True, connections creating cycles are not added, see FeedForwardNetwork
+
+    # Activation functions of the nodes by name, see neat.activations
+    activation_default: str = "sigmoid"
+    activation_options: tuple[str, ...] = ("sigmoid",)
+    activation_mutate_prob: float = 0.0
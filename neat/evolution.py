@@ -1,13 +1,19 @@
 """Coordinate and execute NEAT algorithm."""
 
-from typing import Optional, Callable
+from typing import Optional, Callable, TYPE_CHECKING
 from copy import deepcopy
+from random import Random
+from time import perf_counter
 
 from neat.genetics.genome import Genome
-from neat.genetics.species import SpeciesSet
+from neat.genetics.species import SpeciesSet, DistanceCache
 from neat.config import NeatParams
+from neat.metrics import GenerationMetrics, MetricsRecorder, get_genome_size_stats, get_effective_size_stats
 from neat.reproduction import Reproduction
 
+if TYPE_CHECKING:
+    from neat.checkpoint import Checkpointer
+
 
 class Evolution:
     """Tracks the evolution of a population of species and genomes."""
@@ -20,11 +26,18 @@ class Evolution:
         num_inputs: int,
         num_outputs: int,
         neat_params: NeatParams,
-        species_fitness_function: Callable[[list[float]], float]
+        species_fitness_function: Callable[[list[float]], float],
+        seed: Optional[int] = None,
     ):
+        """
+        :param seed: Seed of the random number generator of the reproduction. Runs with the same seed and
+            deterministic fitness function evolve the same genomes. Unseeded if None.
+        """
         self._neat_params = neat_params
         self.generation = 0
-        self.reproduction = Reproduction(num_inputs, num_outputs, neat_params, species_fitness_function)
+        self.reproduction = Reproduction(
+            num_inputs, num_outputs, neat_params, species_fitness_function, Random(seed)
+        )
         self.population = self.reproduction.create_new_population(self._neat_params.population_size)
 
         self.species_set = SpeciesSet(
@@ -35,14 +48,37 @@ class Evolution:
 
         self.best_genome: Optional[Genome] = None
 
-    def run(self, fitness_function: Callable[[list[tuple[int, Genome]]], None], fitness_goal: float, n: int) -> Genome:
+    def run(
+        self,
+        fitness_function: Callable[[list[tuple[int, Genome]]], Optional[int]],
+        fitness_goal: float,
+        n: int,
+        metrics: Optional[MetricsRecorder] = None,
+        checkpointer: Optional["Checkpointer"] = None,
+    ) -> Genome:
+        """
+        Run the evolution for at most n generations or until the fitness goal is exceeded.
+
+        :param fitness_function: Assigns fitness to the given genomes. May return the number of environment
+            steps simulated for the metrics.
+        :param fitness_goal: Stop when the best genome's fitness exceeds this.
+        :param n: Maximum number of generations.
+        :param metrics: Optional recorder for per-generation timings and counters.
+        :param checkpointer: Optional checkpointer, saving the state at the end of the generations.
+            See neat.checkpoint.resume for continuing from a checkpoint.
+        :return: The best genome found.
+        """
         print("Beginning species evolution")
         for _ in range(n):
             print(
                 f"\nGeneration {self.generation}, population size: {len(self.population)}, "
                 f"number of species: {len(self.species_set.species)}"
             )
-            fitness_function(list(self.population.items()))
+            evaluated_population = self.population
+            num_species = len(self.species_set.species)
+            t_0 = perf_counter()
+            env_steps = fitness_function(list(self.population.items()))
+            t_1 = perf_counter()
 
             species_data = {}
             for idx, species in self.species_set.species.items():
@@ -50,25 +86,89 @@ class Evolution:
             self.species_history.append(species_data)
 
             best = self._get_best_genome()
+            best_fitness = best.fitness  # reproduction adjusts the fitnesses in place
             if self.best_genome is None or best.fitness > self.best_genome.fitness:
                 self.best_genome = deepcopy(best)
                 print(
                     f"    New all-time best genome: {best.key}, fitness: {best.fitness:.2f}, "
                     f"num hidden nodes: {len(best.nodes) - len(best.output_keys)}"
                 )
+            t_2 = perf_counter()
 
             if self.best_genome.fitness > fitness_goal:
+                if metrics is not None:
+                    phase_times = (t_1 - t_0, t_2 - t_1, 0.0, 0.0)
+                    metrics.record(
+                        self._get_metrics(
+                            phase_times, env_steps, best_fitness, evaluated_population, num_species, None
+                        )
+                    )
                 break
 
             self.population = self.reproduction.reproduce(
                 self.species_set, self._neat_params.population_size, self.generation
             )
+            t_3 = perf_counter()
             self.species_set.speciate(self.population, self.generation)
+            t_4 = perf_counter()
 
+            if metrics is not None:
+                metrics.record(
+                    self._get_metrics(
+                        (t_1 - t_0, t_2 - t_1, t_3 - t_2, t_4 - t_3),
+                        env_steps,
+                        best_fitness,
+                        evaluated_population,
+                        num_species,
+                        self.species_set.distance_cache,
+                    )
+                )
             self.generation += 1
+            if checkpointer is not None:
+                checkpointer.maybe_save(self, metrics)
+        if checkpointer is not None:
+            checkpointer.wait()
         print("Evolution finished!")
         return self.best_genome
 
+    def _get_metrics(
+        self,
+        phase_times: tuple[float, float, float, float],
+        env_steps: Optional[int],
+        best_fitness: float,
+        evaluated_population: dict[int, Genome],
+        num_species: int,
+        distance_cache: Optional[DistanceCache],
+    ) -> GenerationMetrics:
+        """
+        Collect the metrics of the current generation.
+        Distance counters are from the speciation of the next population (none if evolution stopped).
+        """
+        hits, misses = (distance_cache.hits, distance_cache.misses) if distance_cache is not None else (0, 0)
+        mean_nodes, max_nodes, mean_conns, max_conns = get_genome_size_stats(evaluated_population)
+        mean_evaluated_nodes, mean_evaluated_conns = get_effective_size_stats(evaluated_population)
+        evaluation_time, history_time, reproduction_time, speciation_time = phase_times
+        return GenerationMetrics(
+            generation=self.generation,
+            population_size=len(evaluated_population),
+            num_species=num_species,
+            evaluation_time=evaluation_time,
+            history_time=history_time,
+            reproduction_time=reproduction_time,
+            speciation_time=speciation_time,
+            distance_computations=misses,
+            distance_cache_hits=hits,
+            distance_cache_hit_rate=hits / (hits + misses) if hits + misses else 0.0,
+            mean_nodes=mean_nodes,
+            max_nodes=max_nodes,
+            mean_enabled_connections=mean_conns,
+            max_enabled_connections=max_conns,
+            mean_evaluated_nodes=mean_evaluated_nodes,
+            mean_evaluated_connections=mean_evaluated_conns,
+            env_steps=env_steps,
+            best_fitness=best_fitness,
+        )
+
     def _get_best_genome(self) -> Genome:
         best = None
         for genome in self.population.values():
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
-from random import random
+from random import Random
 
 
 class NodeType(Enum):
@@ -22,6 +22,7 @@ class NodeGene:
     idx: int
     node_type: NodeType
     bias: float
+    activation: str = "sigmoid"  # Name of the activation function, see neat.activations
 
 
 @dataclass(slots=True)
@@ -33,18 +34,18 @@ class ConnectionGene:
     enabled: bool
     innovation_num: int
 
-    def crossover(self, other_conn: "ConnectionGene",  keep_disable_prob: float) -> "ConnectionGene":
+    def crossover(self, other_conn: "ConnectionGene", keep_disable_prob: float, rng: Random) -> "ConnectionGene":
         """Crossover this connection gene with another one"""
         assert self.node_in_idx == other_conn.node_in_idx
         assert self.node_out_idx == other_conn.node_out_idx
         assert self.innovation_num == other_conn.innovation_num
 
         weight = other_conn.weight
-        if random() < 0.5:
+        if rng.random() < 0.5:
             weight = self.weight
 
         enabled = True
-        if (not self.enabled or not other_conn.enabled) and random() < keep_disable_prob:
+        if (not self.enabled or not other_conn.enabled) and rng.random() < keep_disable_prob:
             enabled = False
 
         return ConnectionGene(self.node_in_idx, self.node_out_idx, weight, enabled, self.innovation_num)
@@ -1,11 +1,12 @@
 from copy import deepcopy
 from math import sqrt, log2
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from itertools import count
-from random import choice, random, gauss
+from random import Random
 from typing import Tuple, Optional
 
 from neat.genetics.genes import NodeGene, ConnectionGene, NodeType
+from neat.nn.graphs import creates_cycle
 
 
 @dataclass(slots=True)
@@ -16,11 +17,11 @@ class WeightOptions:
     min_val: float
     max_val: float
 
-    def get_new_val(self) -> float:
-        return gauss(self.init_mean, self.init_stdev)
+    def get_new_val(self, rng: Random) -> float:
+        return rng.gauss(self.init_mean, self.init_stdev)
 
-    def adjust(self, old_val: float) -> float:
-        change = 2 * self.max_adjust * random() - self.max_adjust
+    def adjust(self, old_val: float, rng: Random) -> float:
+        change = 2 * self.max_adjust * rng.random() - self.max_adjust
         new_val = old_val + change
         return min(self.max_val, max(self.min_val, new_val))
 
@@ -35,6 +36,10 @@ class MutationParams:
     replace_bial_prob: float
     weight_options: WeightOptions
     bias_options: WeightOptions
+    feed_forward: bool = False
+    activation_default: str = "sigmoid"
+    activation_options: tuple[str, ...] = ("sigmoid",)
+    activation_mutate_prob: float = 0.0
 
 
 @dataclass(slots=True)
@@ -69,33 +74,38 @@ class Genome:
         weight_options: WeightOptions,
         bias_options: WeightOptions,
         node_start: int = 0,
-        conn_start: int = 1
+        conn_start: int = 1,
+        activation: str = "sigmoid",
+        rng: Optional[Random] = None,
     ) -> "Genome":
         """Create a new Genome with random weights and without hidden nodes."""
+        rng = rng if rng is not None else Random()
         output_keys = [i for i in range(node_start + num_inputs, node_start + num_inputs + num_outputs)]
         inputs = {}
         nodes = {}
         connections = {}
         for i in range(num_inputs):
-            inputs[node_start + i] = NodeGene(i, NodeType.SENSOR, bias_options.get_new_val())
-            for j in output_keys:
+            inputs[node_start + i] = NodeGene(i, NodeType.SENSOR, bias_options.get_new_val(rng))
+            for k, j in enumerate(output_keys):
                 c_key = (i, j)
                 connections[c_key] = ConnectionGene(
-                    i, j, weight_options.get_new_val(), True, conn_start + i * j
+                    i, j, weight_options.get_new_val(rng), True, conn_start + i * num_outputs + k
                 )
         for i in output_keys:
-            nodes[i] = NodeGene(i, NodeType.OUTPUT, bias_options.get_new_val())
+            nodes[i] = NodeGene(i, NodeType.OUTPUT, bias_options.get_new_val(rng), activation)
         return cls(key, inputs, output_keys, nodes, connections)
 
     @classmethod
-    def from_crossover(cls, key: int, genome_1: "Genome", genome_2: "Genome", keep_disable_prob: float) -> "Genome":
+    def from_crossover(
+        cls, key: int, genome_1: "Genome", genome_2: "Genome", keep_disable_prob: float, rng: Random
+    ) -> "Genome":
         """Produces a new Genome (offspring) via crossover from two parent genomes."""
         if genome_1.fitness > genome_2.fitness:
             parent_1, parent_2 = genome_1, genome_2
         else:
             parent_1, parent_2 = genome_2, genome_1
 
-        connections = Genome._get_inherited_connections(parent_1, parent_2, keep_disable_prob)
+        connections = Genome._get_inherited_connections(parent_1, parent_2, keep_disable_prob, rng)
         nodes = {}
         for (in_key, out_key) in connections:
             if in_key in parent_1.nodes and in_key not in nodes:
@@ -106,15 +116,15 @@ class Genome:
 
     @staticmethod
     def _get_inherited_connections(
-        parent_1: "Genome", parent_2: "Genome", keep_disable_prob: float
+        parent_1: "Genome", parent_2: "Genome", keep_disable_prob: float, rng: Random
     ) -> dict[(int, int), ConnectionGene]:
         conns = {}
         for innov_num, conn in parent_1.conns_by_innovation.items():
             key = (conn.node_in_idx, conn.node_out_idx)
             if innov_num in parent_2.conns_by_innovation:
-                conns[key] = conn.crossover(parent_2.conns_by_innovation[innov_num], keep_disable_prob)
+                conns[key] = conn.crossover(parent_2.conns_by_innovation[innov_num], keep_disable_prob, rng)
             else:
-                conns[key] = conn
+                conns[key] = replace(conn)  # copy so that mutating the offspring does not change the parent
         return conns
 
     def mutate(
@@ -122,28 +132,48 @@ class Genome:
         mutation_params: MutationParams,
         node_counter: count,
         conn_counter: count,
-        innovations_in_curr_generation: Innovations
+        innovations_in_curr_generation: Innovations,
+        rng: Random,
     ) -> None:
         """Mutates this genome"""
-        if random() < mutation_params.add_node_prob:
-            self._mutate_add_node(node_counter, conn_counter, innovations_in_curr_generation, mutation_params)
-        if random() < mutation_params.add_connection_prob:
-            self._mutate_add_connection(conn_counter, innovations_in_curr_generation, mutation_params.weight_options)
+        if rng.random() < mutation_params.add_node_prob:
+            self._mutate_add_node(node_counter, conn_counter, innovations_in_curr_generation, mutation_params, rng)
+        if rng.random() < mutation_params.add_connection_prob:
+            self._mutate_add_connection(
+                conn_counter,
+                innovations_in_curr_generation,
+                mutation_params.weight_options,
+                rng,
+                mutation_params.feed_forward,
+            )
         self._mutate_weights(
-            mutation_params.adjust_weight_prob, mutation_params.replace_weight_prob, mutation_params.weight_options
+            mutation_params.adjust_weight_prob, mutation_params.replace_weight_prob, mutation_params.weight_options, rng
         )
         self._mutate_biases(
-            mutation_params.adjust_bias_prob, mutation_params.replace_bial_prob, mutation_params.bias_options
+            mutation_params.adjust_bias_prob, mutation_params.replace_bial_prob, mutation_params.bias_options, rng
         )
+        if mutation_params.activation_mutate_prob > 0.0:
+            self._mutate_activations(mutation_params.activation_mutate_prob, mutation_params.activation_options, rng)
 
     def _mutate_add_node(
-        self, node_counter: count, conn_counter: count, inns_in_curr_gen: Innovations, mutation_params: MutationParams
+        self,
+        node_counter: count,
+        conn_counter: count,
+        inns_in_curr_gen: Innovations,
+        mutation_params: MutationParams,
+        rng: Random,
     ) -> Tuple[ConnectionGene, ConnectionGene]:
         """Mutates this genome by adding a node."""
-        conn_to_split = choice(list(self.connections.values()))
+        conn_to_split = rng.choice(list(self.connections.values()))
         conn_to_split.enabled = False
 
-        new_node_idx = self._add_node(conn_to_split, node_counter, inns_in_curr_gen, mutation_params.bias_options)
+        new_node_idx = self._add_node(
+            conn_to_split,
+            node_counter,
+            inns_in_curr_gen,
+            mutation_params.bias_options.get_new_val(rng),
+            mutation_params.activation_default,
+        )
 
         c1 = self._add_connection(
             conn_to_split.node_in_idx, new_node_idx, 1.0, True, conn_counter, inns_in_curr_gen
@@ -158,7 +188,8 @@ class Genome:
         conn_to_split: ConnectionGene,
         node_counter: count,
         inns_in_curr_gen: Innovations,
-        bias_options: WeightOptions,
+        bias: float,
+        activation: str = "sigmoid",
     ) -> int:
         key = (conn_to_split.node_in_idx, conn_to_split.node_out_idx)
         if key in inns_in_curr_gen.split_connections:
@@ -166,17 +197,22 @@ class Genome:
         else:
             new_node_idx = next(node_counter)
             inns_in_curr_gen.split_connections[key] = new_node_idx
-        self.nodes[new_node_idx] = NodeGene(new_node_idx, NodeType.HIDDEN, bias_options.get_new_val())
+        self.nodes[new_node_idx] = NodeGene(new_node_idx, NodeType.HIDDEN, bias, activation)
         return new_node_idx
 
     def _mutate_add_connection(
-        self, conn_counter: count, inns_in_curr_gen: Innovations, weight_options: WeightOptions
+        self,
+        conn_counter: count,
+        inns_in_curr_gen: Innovations,
+        weight_options: WeightOptions,
+        rng: Random,
+        feed_forward: bool = False,
     ) -> Optional[ConnectionGene]:
-        """Mutates this genome by adding a new connection."""
+        """Mutates this genome by adding a new connection. If feed_forward, connections creating cycles are skipped."""
         possible_inputs = list(self.nodes.keys())
         possible_inputs.extend(list(self.inputs.keys()))
-        in_key = choice(possible_inputs)
-        out_key = choice(list(self.nodes.keys()))
+        in_key = rng.choice(possible_inputs)
+        out_key = rng.choice(list(self.nodes.keys()))
         key = (in_key, out_key)
         if key in self.connections:
             self.connections[key].enabled = True
@@ -184,7 +220,11 @@ class Genome:
         if in_key not in self.inputs:
             if self.nodes[in_key].node_type == NodeType.OUTPUT and self.nodes[out_key].node_type == NodeType.OUTPUT:
                 return
-        return self._add_connection(in_key, out_key, weight_options.get_new_val(), True, conn_counter, inns_in_curr_gen)
+        if feed_forward and creates_cycle(self.connections.keys(), key):
+            return
+        return self._add_connection(
+            in_key, out_key, weight_options.get_new_val(rng), True, conn_counter, inns_in_curr_gen
+        )
 
     def _add_connection(
         self,
@@ -207,21 +247,26 @@ class Genome:
         self.conns_by_innovation[innov_num] = connection
         return connection
 
-    def _mutate_weights(self, adjust_prob: float, replace_prob: float, options: WeightOptions) -> None:
+    def _mutate_weights(self, adjust_prob: float, replace_prob: float, options: WeightOptions, rng: Random) -> None:
         for connection in self.connections.values():
-            rand = random()
+            rand = rng.random()
             if rand < replace_prob:
-                connection.weight = options.get_new_val()
+                connection.weight = options.get_new_val(rng)
             elif rand < adjust_prob + replace_prob:
-                connection.weight = options.adjust(connection.weight)
+                connection.weight = options.adjust(connection.weight, rng)
 
-    def _mutate_biases(self, adjust_prob: float, replace_prob: float, options: WeightOptions) -> None:
+    def _mutate_biases(self, adjust_prob: float, replace_prob: float, options: WeightOptions, rng: Random) -> None:
         for node in self.nodes.values():
-            rand = random()
+            rand = rng.random()
             if rand < replace_prob:
-                node.bias = options.get_new_val()
+                node.bias = options.get_new_val(rng)
             elif rand < adjust_prob + replace_prob:
-                node.bias = options.adjust(node.bias)
+                node.bias = options.adjust(node.bias, rng)
+
+    def _mutate_activations(self, mutate_prob: float, options: tuple[str, ...], rng: Random) -> None:
+        for node in self.nodes.values():
+            if rng.random() < mutate_prob:
+                node.activation = rng.choice(options)
 
     @staticmethod
     def genome_distance(genome_1: "Genome", genome_2: "Genome", disjoint_coeff: float, weight_coeff: float) -> float:
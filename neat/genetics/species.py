@@ -33,12 +33,14 @@ class Species:
 
 class DistanceCache:
     """Caches genome distances for purposes of speciation."""
-    __slots__ = ("disjoint_coeff", "weight_coeff", "distances")
+    __slots__ = ("disjoint_coeff", "weight_coeff", "distances", "hits", "misses")
 
     def __init__(self, disjoint_coefficient: float, weight_coefficient: float):
         self.disjoint_coeff = disjoint_coefficient
         self.weight_coeff = weight_coefficient
         self.distances: dict[tuple[int, int], float] = {}
+        self.hits = 0
+        self.misses = 0
 
     def __call__(self, genome_1: Genome, genome_2: Genome) -> float:
         """Get distance of given genomes."""
@@ -46,16 +48,25 @@ class DistanceCache:
         key_2 = genome_2.key
         d = self.distances.get((key_1, key_2))
         if d is None:
+            self.misses += 1
             d = Genome.genome_distance(genome_1, genome_2, self.disjoint_coeff, self.weight_coeff)
             self.distances[key_1, key_2] = d
             self.distances[key_2, key_1] = d
+        else:
+            self.hits += 1
         return d
 
 
 class SpeciesSet:
     """Handles speciation, i.e. the division of the population into species."""
     __slots__ = (
-        "_indexer", "species", "_genome_to_species", "_compatibility_threshold", "disjoint_coeff", "weight_coeff"
+        "_indexer",
+        "species",
+        "_genome_to_species",
+        "_compatibility_threshold",
+        "disjoint_coeff",
+        "weight_coeff",
+        "distance_cache",
     )
 
     def __init__(self, compatibility_threshold: float, disjoint_coefficient: float, weight_coefficient: float):
@@ -65,6 +76,7 @@ class SpeciesSet:
         self._compatibility_threshold = compatibility_threshold
         self.disjoint_coeff = disjoint_coefficient
         self.weight_coeff = weight_coefficient
+        self.distance_cache: Optional[DistanceCache] = None  # cache of the latest speciation
 
     def get_species_id(self, genome_id: int) -> int:
         """Get id of the species for a given individual."""
@@ -79,6 +91,7 @@ class SpeciesSet:
         """Divide population into species."""
         unspeciated = set(population)
         distances = DistanceCache(self.disjoint_coeff, self.weight_coeff)
+        self.distance_cache = distances
         new_representatives, new_members = self._get_new_representatives(unspeciated, population, distances)
         self._partition_to_species(unspeciated, population, new_representatives, new_members, distances)
         self._update_collections(population, new_representatives, new_members, generation)
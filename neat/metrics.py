@@ -0,0 +1,79 @@
+"""Per-generation instrumentation of the NEAT algorithm."""
+
+import json
+from dataclasses import dataclass, asdict
+from typing import Optional, TextIO
+
+from neat.genetics.genome import Genome
+from neat.nn.pruning import get_effective_topology
+
+
+@dataclass(slots=True)
+class GenerationMetrics:
+    """Timings (in seconds) and counters of a single generation."""
+    generation: int
+    population_size: int
+    num_species: int
+    evaluation_time: float
+    history_time: float
+    reproduction_time: float
+    speciation_time: float
+    distance_computations: int
+    distance_cache_hits: int
+    distance_cache_hit_rate: float
+    mean_nodes: float
+    max_nodes: int
+    mean_enabled_connections: float
+    max_enabled_connections: int
+    mean_evaluated_nodes: float  # size of the effective topology, see neat.nn.pruning
+    mean_evaluated_connections: float
+    env_steps: Optional[int]
+    best_fitness: float
+
+
+class MetricsRecorder:
+    """
+    Collects GenerationMetrics records from Evolution.run and optionally writes them as JSON lines.
+
+    Pass an instance to Evolution.run to enable the instrumentation. Without one, only a few
+    timestamps per generation are taken.
+    """
+    __slots__ = ("records", "_output")
+
+    def __init__(self, output: Optional[TextIO] = None):
+        self.records: list[GenerationMetrics] = []
+        self._output = output
+
+    def record(self, metrics: GenerationMetrics) -> None:
+        self.records.append(metrics)
+        if self._output is not None:
+            self._output.write(json.dumps(asdict(metrics)) + "\n")
+            self._output.flush()
+
+    def get_total_time(self, phase: str) -> float:
+        """Returns the total time spent in the given phase ('evaluation', 'history', 'reproduction', 'speciation')."""
+        return sum(getattr(record, f"{phase}_time") for record in self.records)
+
+    def get_total_env_steps(self) -> int:
+        return sum(record.env_steps for record in self.records if record.env_steps is not None)
+
+
+def get_genome_size_stats(population: dict[int, Genome]) -> tuple[float, int, float, int]:
+    """Returns mean and max number of nodes and mean and max number of enabled connections in the population."""
+    node_counts = [len(genome.nodes) for genome in population.values()]
+    conn_counts = [sum(1 for c in genome.connections.values() if c.enabled) for genome in population.values()]
+    return (
+        sum(node_counts) / len(node_counts),
+        max(node_counts),
+        sum(conn_counts) / len(conn_counts),
+        max(conn_counts),
+    )
+
+
+def get_effective_size_stats(population: dict[int, Genome]) -> tuple[float, float]:
+    """Returns the mean number of evaluated nodes and connections of the phenotypes of the population."""
+    stats = [get_effective_topology(genome).stats for genome in population.values()]
+    return (
+        sum(s.evaluated_nodes for s in stats) / len(stats),
+        sum(s.evaluated_connections for s in stats) / len(stats),
+    )
@@ -0,0 +1,114 @@
+from typing import Optional
+
+import numpy as np
+
+from neat.activations import get_activation
+from neat.genetics.genome import Genome
+from neat.nn.graphs import feed_forward_layers
+from neat.nn.pruning import PruningStats, collapse_identity_nodes, get_effective_topology
+
+
+class FeedForwardNetwork(object):
+    """
+    Phenotype for acyclic genomes. The nodes are evaluated layer by layer, with the incoming weights
+    of each layer packed into a dense matrix, so that a forward pass is one matrix product per layer.
+    Layers with nodes of several activation functions are split into one group per activation function.
+
+    Like in RecurrentNetwork, nodes without enabled incoming connections are not evaluated and output 0.0.
+    """
+
+    def __init__(
+        self,
+        inputs: list[int],
+        outputs: list[int],
+        layers: list[tuple[list[int], list[float], list[int], np.ndarray, str]],
+    ):
+        """
+        :param inputs: Input node keys.
+        :param outputs: Output node keys.
+        :param layers: List of (node keys, biases, source node keys, weight matrix, activation name) for each layer
+            (or group of a layer), where the weight matrix has shape (len(node keys), len(source node keys)).
+        """
+        self.input_nodes = inputs
+        self.output_nodes = outputs
+
+        self.node_positions: dict[int, int] = {}
+        for key in [*inputs, *outputs]:
+            self.node_positions.setdefault(key, len(self.node_positions))
+        for node_keys, _biases, source_keys, _weights, _activation in layers:
+            for key in [*node_keys, *source_keys]:
+                self.node_positions.setdefault(key, len(self.node_positions))
+
+        self.layers = []
+        for node_keys, biases, source_keys, weights, activation in layers:
+            self.layers.append((
+                np.array([self.node_positions[k] for k in node_keys], dtype=np.intp),
+                np.array(biases, dtype=np.float64),
+                np.array([self.node_positions[k] for k in source_keys], dtype=np.intp),
+                np.asarray(weights, dtype=np.float64),
+                get_activation(activation).vectorized,
+            ))
+        self._input_positions = np.array([self.node_positions[k] for k in inputs], dtype=np.intp)
+        self._output_positions = np.array([self.node_positions[k] for k in outputs], dtype=np.intp)
+        self.values = np.zeros(len(self.node_positions), dtype=np.float64)
+        self.pruning_stats: Optional[PruningStats] = None  # set by create
+
+    def reset(self):
+        self.values[:] = 0.0
+
+    def activate(self, inputs: list[float]) -> list[float]:
+        if len(self.input_nodes) != len(inputs):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
+
+        values = self.values
+        values[self._input_positions] = inputs
+        for positions, biases, sources, weights, activation in self.layers:
+            values[positions] = activation(biases + weights @ values[sources])
+        return values[self._output_positions].tolist()
+
+    @staticmethod
+    def create(genome: Genome) -> "FeedForwardNetwork":
+        """
+        Receives an acyclic genome and returns its phenotype (a FeedForwardNetwork).
+        Only the effective topology of the genome is evaluated, with identity nodes collapsed, see neat.nn.pruning.
+        """
+        input_keys = list(genome.inputs.keys())
+        topology = collapse_identity_nodes(genome, get_effective_topology(genome))
+        node_inputs = topology.node_inputs
+        connections = [(in_key, out_key) for out_key, links in node_inputs.items() for in_key, _w in links]
+
+        # Nodes which are not evaluated are constant zero, so they can be treated like inputs, and so can the
+        # evaluated nodes without incoming connections, which are constant activation(bias).
+        constant = set(key for key, links in node_inputs.items() if not links)
+        sourceless = [key for key in genome.nodes if key not in node_inputs]
+        outputs = [key for key in genome.output_keys if key in node_inputs and key not in constant]
+        layer_sets = feed_forward_layers(input_keys + sourceless + list(constant), outputs, connections)
+
+        evaluated = set(k for layer in layer_sets for k in layer)
+        if any(key not in evaluated and key not in constant for key in node_inputs):
+            raise ValueError(f"Genome {genome.key} has cycles, cannot create a feed-forward network.")
+
+        layers = []
+        for layer_set in ([constant] if constant else []) + layer_sets:
+            groups: dict[str, list[int]] = {}
+            for key in sorted(layer_set):
+                groups.setdefault(genome.nodes[key].activation, []).append(key)
+            for activation, node_keys in groups.items():
+                layers.append(FeedForwardNetwork._get_layer(genome, node_inputs, node_keys, activation))
+
+        network = FeedForwardNetwork(input_keys, genome.output_keys, layers)
+        network.pruning_stats = topology.stats
+        return network
+
+    @staticmethod
+    def _get_layer(
+        genome: Genome, node_inputs: dict[int, list[tuple[int, float]]], node_keys: list[int], activation: str
+    ) -> tuple[list[int], list[float], list[int], np.ndarray, str]:
+        source_keys = sorted(set(in_key for key in node_keys for in_key, _w in node_inputs[key]))
+        column = dict((key, i) for i, key in enumerate(source_keys))
+        weights = np.zeros((len(node_keys), len(source_keys)), dtype=np.float64)
+        for row, key in enumerate(node_keys):
+            for in_key, w in node_inputs[key]:
+                weights[row, column[in_key]] = w
+        biases = [genome.nodes[key].bias for key in node_keys]
+        return node_keys, biases, source_keys, weights, activation
@@ -1,4 +1,20 @@
-"""Directed graph algorithm implementations."""
+"""Directed graph algorithm implementations. All functions run in O(V + E) time."""
+
+from typing import Iterable
+
+
+def _get_successors(connections: Iterable[tuple[int, int]]) -> dict[int, list[int]]:
+    successors: dict[int, list[int]] = {}
+    for a, b in connections:
+        successors.setdefault(a, []).append(b)
+    return successors
+
+
+def _get_predecessors(connections: Iterable[tuple[int, int]]) -> dict[int, list[int]]:
+    predecessors: dict[int, list[int]] = {}
+    for a, b in connections:
+        predecessors.setdefault(b, []).append(a)
+    return predecessors
 
 
 def creates_cycle(connections, test):
@@ -10,19 +26,19 @@ def creates_cycle(connections, test):
     if i == o:
         return True
 
+    # The new connection creates a cycle if and only if i is reachable from o.
+    successors = _get_successors(connections)
     visited = {o}
-    while True:
-        num_added = 0
-        for a, b in connections:
-            if a in visited and b not in visited:
-                if b == i:
-                    return True
-
+    stack = [o]
+    while stack:
+        node = stack.pop()
+        for b in successors.get(node, ()):
+            if b == i:
+                return True
+            if b not in visited:
                 visited.add(b)
-                num_added += 1
-
-        if num_added == 0:
-            return False
+                stack.append(b)
+    return False
 
 
 def required_for_output(inputs, outputs, connections):
@@ -38,21 +54,17 @@ def required_for_output(inputs, outputs, connections):
     """
     assert not set(inputs).intersection(outputs)
 
+    # Walk the connections backwards from the outputs, not continuing past the inputs.
+    input_set = set(inputs)
+    predecessors = _get_predecessors(connections)
     required = set(outputs)
-    s = set(outputs)
-    while 1:
-        # Find nodes not in s whose output is consumed by a node in s.
-        t = set(a for (a, b) in connections if b in s and a not in s)
-
-        if not t:
-            break
-
-        layer_nodes = set(x for x in t if x not in inputs)
-        if not layer_nodes:
-            break
-
-        required = required.union(layer_nodes)
-        s = s.union(t)
+    stack = list(required)
+    while stack:
+        node = stack.pop()
+        for a in predecessors.get(node, ()):
+            if a not in required and a not in input_set:
+                required.add(a)
+                stack.append(a)
 
     return required
 
@@ -68,25 +80,32 @@ def feed_forward_layers(inputs, outputs, connections):
     Note that the returned layers do not contain nodes whose output is ultimately
     never used to compute the final network output.
     """
-
+    connections = list(connections)
     required = required_for_output(inputs, outputs, connections)
 
+    # Kahn's algorithm by levels: a required node is ready once all of its incoming connections
+    # come from the inputs or from nodes in the previous layers.
+    successors = _get_successors(connections)
+    num_pending_inputs: dict[int, int] = {}
+    for _a, b in connections:
+        num_pending_inputs[b] = num_pending_inputs.get(b, 0) + 1
+
     layers = []
     s = set(inputs)
+    frontier = s
     while 1:
-        # Find candidate nodes c for the next layer.  These nodes should connect
-        # a node in s to a node not in s.
-        c = set(b for (a, b) in connections if a in s and b not in s)
-        # Keep only the used nodes whose entire input set is contained in s.
         t = set()
-        for n in c:
-            if n in required and all(a in s for (a, b) in connections if b == n):
-                t.add(n)
+        for a in frontier:
+            for b in successors.get(a, ()):
+                num_pending_inputs[b] -= 1
+                if num_pending_inputs[b] == 0 and b in required and b not in s:
+                    t.add(b)
 
         if not t:
             break
 
         layers.append(t)
         s = s.union(t)
+        frontier = t
 
     return layers
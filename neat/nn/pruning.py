@@ -0,0 +1,126 @@
+"""
+Dead node and dead connection elimination for building phenotypes from the effective topology of a genome.
+
+The genome keeps disabled connections, zero weights and nodes which no longer reach an output. None of them
+affect the network outputs, so the phenotypes need not evaluate them.
+"""
+
+from dataclasses import dataclass
+
+from neat.genetics.genome import Genome
+from neat.nn.graphs import required_for_output
+
+
+@dataclass(slots=True)
+class PruningStats:
+    """Size of the genome versus size of the phenotype built from it."""
+    genome_nodes: int
+    genome_connections: int
+    evaluated_nodes: int
+    evaluated_connections: int
+    disabled_connections: int
+    zero_weight_connections: int
+    collapsed_nodes: int = 0  # identity nodes merged into their outgoing connections (feed-forward only)
+
+    @property
+    def pruned_nodes(self) -> int:
+        return self.genome_nodes - self.evaluated_nodes
+
+    @property
+    def pruned_connections(self) -> int:
+        return self.genome_connections - self.evaluated_connections
+
+
+@dataclass(slots=True)
+class EffectiveTopology:
+    """The nodes to evaluate and their incoming (source, weight) links, in the order of the genome."""
+    node_inputs: dict[int, list[tuple[int, float]]]
+    stats: PruningStats
+
+
+def get_effective_topology(genome: Genome) -> EffectiveTopology:
+    """
+    Returns the nodes and connections which affect the outputs of the genome's network.
+
+    A node is evaluated if it is required for an output and has an enabled incoming connection. Like in
+    RecurrentNetwork.create, nodes without enabled incoming connections are not evaluated and output 0.0,
+    and nodes whose incoming connections are all pruned are still evaluated (giving activation(bias)).
+    A connection is kept if it is enabled, its weight is nonzero, its output node is evaluated and its input
+    node is an input or evaluated, as otherwise it only adds zero to the weighted sum.
+    """
+    input_keys = list(genome.inputs.keys())
+    input_set = set(input_keys)
+    enabled = [conn for conn in genome.connections.values() if conn.enabled]
+    nonzero = [conn for conn in enabled if conn.weight != 0.0]
+
+    required = required_for_output(input_keys, genome.output_keys, [(c.node_in_idx, c.node_out_idx) for c in enabled])
+    evaluated = set(conn.node_out_idx for conn in enabled if conn.node_out_idx in required)
+
+    # Pruning connections can make nodes unnecessary for the outputs, and vice versa, so repeat until stable.
+    while True:
+        kept = [
+            conn for conn in nonzero
+            if conn.node_out_idx in evaluated and (conn.node_in_idx in input_set or conn.node_in_idx in evaluated)
+        ]
+        required = required_for_output(input_keys, genome.output_keys, [(c.node_in_idx, c.node_out_idx) for c in kept])
+        still_evaluated = evaluated.intersection(required)
+        if still_evaluated == evaluated:
+            break
+        evaluated = still_evaluated
+
+    node_inputs: dict[int, list[tuple[int, float]]] = {}
+    for conn in enabled:
+        if conn.node_out_idx in evaluated:
+            node_inputs.setdefault(conn.node_out_idx, [])
+    for conn in kept:
+        node_inputs[conn.node_out_idx].append((conn.node_in_idx, conn.weight))
+
+    stats = PruningStats(
+        genome_nodes=len(genome.nodes),
+        genome_connections=len(genome.connections),
+        evaluated_nodes=len(node_inputs),
+        evaluated_connections=len(kept),
+        disabled_connections=len(genome.connections) - len(enabled),
+        zero_weight_connections=len(enabled) - len(nonzero),
+    )
+    return EffectiveTopology(node_inputs, stats)
+
+
+def collapse_identity_nodes(genome: Genome, topology: EffectiveTopology) -> EffectiveTopology:
+    """
+    Merges the hidden nodes computing identity(0.0 + w * x) of a single input x into their outgoing connections,
+    e.g. a -(w1)-> n -(w2)-> b becomes a -(w1 * w2)-> b. This is only valid for feed-forward evaluation, since
+    in a recurrent network each node delays the signal by one step.
+    """
+    output_set = set(genome.output_keys)
+    node_inputs = dict((key, list(links)) for key, links in topology.node_inputs.items())
+    collapsed = 0
+    for key in list(node_inputs):
+        node = genome.nodes[key]
+        links = node_inputs[key]
+        if key in output_set or node.activation != "identity" or node.bias != 0.0 or len(links) != 1:
+            continue
+        source, w_in = links[0]
+        if source == key:
+            continue
+        for out_key, out_links in node_inputs.items():
+            if any(i == key for i, _w in out_links):
+                merged: dict[int, float] = {}
+                for i, w in out_links:
+                    if i == key:
+                        i, w = source, w_in * w
+                    merged[i] = merged.get(i, 0.0) + w
+                node_inputs[out_key] = list(merged.items())
+        del node_inputs[key]
+        collapsed += 1
+
+    stats = PruningStats(
+        genome_nodes=topology.stats.genome_nodes,
+        genome_connections=topology.stats.genome_connections,
+        evaluated_nodes=len(node_inputs),
+        evaluated_connections=sum(len(links) for links in node_inputs.values()),
+        disabled_connections=topology.stats.disabled_connections,
+        zero_weight_connections=topology.stats.zero_weight_connections,
+        collapsed_nodes=topology.stats.collapsed_nodes + collapsed,
+    )
+    return EffectiveTopology(node_inputs, stats)
@@ -1,7 +1,10 @@
-from typing import Any
+from typing import Callable, Optional
 
-from neat.activations import sigmoid_activation
+import numpy as np
+
+from neat.activations import get_activation, get_activation_by_scalar
 from neat.genetics.genome import Genome
+from neat.nn.pruning import PruningStats, get_effective_topology
 
 
 """
@@ -15,65 +18,71 @@ r = RecurrentNetwork([], [0], node_evals)
 """
 
 
-def required_for_output(inputs: list[int], outputs: list[int], connections: dict[tuple[int, int], Any]) -> set[int]:
-    """
-    Collect the nodes whose state is required to compute the final network output(s).
-    :param inputs: list of the input identifiers
-    :param outputs: list of the output node identifiers
-    :param connections: list of (input, output) connections in the network.
-    NOTE: It is assumed that the input identifier set and the node identifier set are disjoint.
-    By convention, the output node ids are always the same as the output index.
-    Returns a set of identifiers of required nodes.
-    """
-    assert not set(inputs).intersection(outputs)
-
-    required = set(outputs)
-    s = set(outputs)
-    while 1:
-        # Find nodes not in s whose output is consumed by a node in s.
-        t = set(a for (a, b) in connections if b in s and a not in s)
-
-        if not t:
-            break
-
-        layer_nodes = set(x for x in t if x not in inputs)
-        if not layer_nodes:
-            break
-
-        required = required.union(layer_nodes)
-        s = s.union(t)
-
-    return required
-
-
 class RecurrentNetwork(object):
     def __init__(
         self,
         inputs: list[int],
         outputs: list[int],
-        node_evals: list[tuple[int, float, list[tuple[int, float]]]]
+        node_evals: list[tuple[int, Callable[[float], float], Callable, float, float, list[tuple[int, float]]]]
     ):
         self.input_nodes = inputs
         self.output_nodes = outputs
         self.node_evals = node_evals
-        self.response = 1.0
 
         self.values = [{}, {}]
         for val_dict in self.values:
             for key in [*inputs, *outputs]:
                 val_dict[key] = 0.0
 
-            for node_key, _bias, links in self.node_evals:
+            for node_key, _activation, _aggregation, _bias, _response, links in self.node_evals:
                 val_dict[node_key] = 0.0
                 for i, _w in links:
                     val_dict[i] = 0.0
         self.active = 0
 
+        self._batch_kernels = {}
+        self._argmax_plan = None
+        self.batch_values: Optional[np.ndarray] = None  # (B, num nodes) states of activate_batch
+        self.pruning_stats: Optional[PruningStats] = None  # set by create
+
     def reset(self):
         self.values = [dict((k, 0.0) for k in v) for v in self.values]
         self.active = 0
+        self.batch_values = None
 
     def activate(self, inputs: list[float]) -> list[float]:
+        ovalues = self._activate_nodes(inputs, self.node_evals)
+        return [ovalues[i] for i in self.output_nodes]
+
+    def activate_argmax(self, inputs: list[float]) -> int:
+        """
+        Activates the network and returns the index of the largest output.
+
+        If all the outputs are evaluated with the same monotonic (non-decreasing) activation function (see
+        neat.activations.ActivationFunction), the argmax is taken over their weighted sums, and only the largest sum
+        and the runner-up are activated. Flat or saturated regions (e.g. of relu or sigmoid) can turn them into a
+        tie, of which activate gives the first one, so then all the outputs are activated from their sums.
+        The outputs which feed back to the network are still activated, so the recurrent state stays correct, but
+        the values of the other outputs are not updated.
+        """
+        node_evals, output_sums = self._get_argmax_plan()
+        if output_sums is None:
+            return int(np.argmax(self.activate(inputs)))
+
+        self._activate_nodes(inputs, node_evals)
+        ivalues = self.values[1 - self.active]
+        source_keys, biases, responses, weights, activation = output_sums
+        x = np.array([ivalues[k] for k in source_keys], dtype=np.float64)
+        output_z = biases + responses * (weights @ x)
+        best = int(np.argmax(output_z))
+        if len(output_z) > 1:
+            runner_up = float(np.max(np.delete(output_z, best)))
+            if activation(float(output_z[best])) == activation(runner_up):
+                return int(np.argmax([activation(z) for z in output_z.tolist()]))
+        return best
+
+    def _activate_nodes(self, inputs: list[float], node_evals: list[tuple]) -> dict[int, float]:
+        """Evaluates the given node_evals from the current values and returns the new values."""
         if len(self.input_nodes) != len(inputs):
             raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
 
@@ -85,36 +94,219 @@ class RecurrentNetwork(object):
             ivalues[i] = v
             ovalues[i] = v
 
-        for node, bias, links in self.node_evals:
+        for node, activation, aggregation, bias, response, links in node_evals:
             node_inputs = [ivalues[i] * w for i, w in links]
-            s = sum(node_inputs)
-            ovalues[node] = sigmoid_activation(bias + self.response * s)
+            s = aggregation(node_inputs)
+            ovalues[node] = activation(bias + response * s)
 
-        return [ovalues[i] for i in self.output_nodes]
+        return ovalues
+
+    def _get_argmax_outputs(self) -> Optional[tuple[list[tuple], set[int]]]:
+        """
+        Returns the node_evals of the outputs (in output order) and the set of the outputs whose activation can
+        be skipped when only the argmax of the outputs is needed, or None if the argmax must be taken over the
+        activated outputs. The activations can be skipped only if all the outputs are evaluated with the same
+        monotonic activation function and sum aggregation, and only for the outputs which do not feed back.
+        """
+        evals = dict((node_eval[0], node_eval) for node_eval in self.node_evals)
+        if not self.output_nodes or any(key not in evals for key in self.output_nodes):
+            return None
+        output_evals = [evals[key] for key in self.output_nodes]
+        if len(set(node_eval[1] for node_eval in output_evals)) != 1:
+            return None
+        if any(node_eval[2] is not sum for node_eval in output_evals):
+            return None
+        try:
+            if not get_activation_by_scalar(output_evals[0][1]).monotonic:
+                return None
+        except ValueError:
+            return None
+
+        sources = set(i for node_eval in self.node_evals for i, _w in node_eval[5])
+        return output_evals, set(key for key in self.output_nodes if key not in sources)
+
+    def _get_argmax_plan(self):
+        """
+        Returns the node_evals to evaluate and (source keys, biases, responses, weights, activation) of the output
+        sums.
+        """
+        if self._argmax_plan is not None:
+            return self._argmax_plan
+
+        argmax_outputs = self._get_argmax_outputs()
+        if argmax_outputs is None:
+            self._argmax_plan = (self.node_evals, None)
+            return self._argmax_plan
+
+        output_evals, skipped = argmax_outputs
+        node_evals = [node_eval for node_eval in self.node_evals if node_eval[0] not in skipped]
+        source_keys = list(dict.fromkeys(i for node_eval in output_evals for i, _w in node_eval[5]))
+        column = dict((key, i) for i, key in enumerate(source_keys))
+        weights = np.zeros((len(output_evals), len(source_keys)), dtype=np.float64)
+        for row, (_node, _activation, _aggregation, _bias, _response, links) in enumerate(output_evals):
+            for i, w in links:
+                weights[row, column[i]] += w
+        output_sums = (
+            source_keys,
+            np.array([node_eval[3] for node_eval in output_evals], dtype=np.float64),
+            np.array([node_eval[4] for node_eval in output_evals], dtype=np.float64),
+            weights,
+            output_evals[0][1],
+        )
+        self._argmax_plan = (node_evals, output_sums)
+        return self._argmax_plan
+
+    def activate_batch(self, inputs: np.ndarray, independent: bool = True) -> np.ndarray:
+        """
+        Activates the network for each row of a 2D input array and returns the outputs as a (rows, outputs) array.
+
+        :param inputs: Array of shape (B, num inputs) or (T, num inputs).
+        :param independent: If True, the B rows are inputs for B independent network states (e.g. parallel
+            episodes), which persist between calls until reset (or until B changes). If False, the T rows are a
+            sequence of inputs for the network state of activate, and the result is equal to calling activate
+            for each row in turn (up to floating point rounding).
+        """
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if inputs.ndim != 2 or inputs.shape[1] != len(self.input_nodes):
+            raise RuntimeError(f"Expected inputs of shape (n, {len(self.input_nodes)}), got {inputs.shape}")
+
+        kernel = self._get_batch_kernel()
+        positions, _input_positions, output_positions, _groups, _output_sums = kernel
+        if independent:
+            if self.batch_values is None or self.batch_values.shape[0] != inputs.shape[0]:
+                self.batch_values = np.zeros((inputs.shape[0], len(positions)), dtype=np.float64)
+            self.batch_values = self._step_batch(kernel, self.batch_values, inputs)
+            return self.batch_values[:, output_positions]
+
+        # Run the sequence on a (1, num nodes) copy of the current state and write the last two states back.
+        previous = np.array([[self.values[1 - self.active][key] for key in positions]], dtype=np.float64)
+        current = np.array([[self.values[self.active][key] for key in positions]], dtype=np.float64)
+        outputs = np.empty((inputs.shape[0], len(output_positions)), dtype=np.float64)
+        for t in range(inputs.shape[0]):
+            previous, current = current, self._step_batch(kernel, current, inputs[t:t + 1])
+            outputs[t] = current[0, output_positions]
+        self.active = (self.active + inputs.shape[0]) % 2
+        for values, state in ((self.values[1 - self.active], previous), (self.values[self.active], current)):
+            values.update(zip(positions, state[0].tolist()))
+        return outputs
+
+    def activate_batch_argmax(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Like activate_batch with independent states, but returns only the index of the largest output of each row.
+        The activation of the outputs is skipped when possible, see activate_argmax. Only the rows with a tie of the
+        activated largest sum and runner-up activate all their outputs.
+        """
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if inputs.ndim != 2 or inputs.shape[1] != len(self.input_nodes):
+            raise RuntimeError(f"Expected inputs of shape (n, {len(self.input_nodes)}), got {inputs.shape}")
+
+        kernel = self._get_batch_kernel(argmax=True)
+        positions, input_positions, output_positions, _groups, output_sums = kernel
+        if self.batch_values is None or self.batch_values.shape[0] != inputs.shape[0]:
+            self.batch_values = np.zeros((inputs.shape[0], len(positions)), dtype=np.float64)
+        if output_sums is None:
+            self.batch_values = self._step_batch(kernel, self.batch_values, inputs)
+            return self.batch_values[:, output_positions].argmax(axis=1)
+
+        # The output sums are computed from the previous state, like the evaluated nodes.
+        state = self.batch_values
+        state[:, input_positions] = inputs
+        biases, responses, weights, activation = output_sums
+        output_z = biases + responses * (state @ weights)
+        self.batch_values = self._step_batch(kernel, state, inputs)
+        best = output_z.argmax(axis=1)
+        if output_z.shape[1] > 1:
+            rows = np.arange(len(best))
+            best_z = output_z[rows, best]
+            output_z[rows, best] = -np.inf
+            ties = activation(best_z) == activation(output_z.max(axis=1))
+            if ties.any():
+                output_z[rows, best] = best_z
+                best[ties] = activation(output_z[ties]).argmax(axis=1)
+        return best
 
     @staticmethod
-    def create(genome: Genome):
-        """ Receives a genome and returns its phenotype (a RecurrentNetwork). """
-        required = required_for_output(list(genome.inputs.keys()), genome.output_keys, genome.connections)
+    def _step_batch(kernel, state: np.ndarray, inputs: np.ndarray) -> np.ndarray:
+        _positions, input_positions, _output_positions, groups, _output_sums = kernel
+        state[:, input_positions] = inputs
+        new_state = state.copy()
+        for node_positions, biases, responses, weights, activation in groups:
+            new_state[:, node_positions] = activation(biases + responses * (state @ weights))
+        return new_state
 
-        # Gather inputs and expressed connections.
-        node_inputs = {}
-        for conn_gene in genome.connections.values():
-            if not conn_gene.enabled:
-                continue
+    def _get_batch_kernel(self, argmax: bool = False):
+        """
+        Packs the node_evals into one dense (num nodes, group size) weight matrix for each activation function.
+        The nodes which are not evaluated (and not inputs) stay 0.0, like in activate.
+
+        With argmax, the outputs whose activation can be skipped are left out of the groups, and the weighted
+        sums of all the outputs are packed into a (num nodes, num outputs) matrix with their activation instead.
+        """
+        if argmax in self._batch_kernels:
+            return self._batch_kernels[argmax]
+
+        argmax_outputs = self._get_argmax_outputs() if argmax else None
+        skipped = argmax_outputs[1] if argmax_outputs is not None else set()
 
-            in_key, out_key = conn_gene.node_in_idx, conn_gene.node_out_idx
-            if out_key not in required and in_key not in required:
+        positions = dict((key, i) for i, key in enumerate(self.values[0]))
+        by_activation = {}
+        for node_eval in self.node_evals:
+            if node_eval[0] in skipped:
                 continue
+            if node_eval[2] is not sum:
+                raise ValueError(f"activate_batch supports only sum aggregation, got {node_eval[2]!r}")
+            by_activation.setdefault(node_eval[1], []).append(node_eval)
 
-            if out_key not in node_inputs:
-                node_inputs[out_key] = [(in_key, conn_gene.weight)]
-            else:
-                node_inputs[out_key].append((in_key, conn_gene.weight))
+        groups = []
+        for activation, node_evals in by_activation.items():
+            weights = np.zeros((len(positions), len(node_evals)), dtype=np.float64)
+            for column, (_node, _activation, _aggregation, _bias, _response, links) in enumerate(node_evals):
+                for i, w in links:
+                    weights[positions[i], column] += w
+            groups.append((
+                np.array([positions[node_eval[0]] for node_eval in node_evals], dtype=np.intp),
+                np.array([node_eval[3] for node_eval in node_evals], dtype=np.float64),
+                np.array([node_eval[4] for node_eval in node_evals], dtype=np.float64),
+                weights,
+                get_activation_by_scalar(activation).vectorized,
+            ))
 
+        output_sums = None
+        if argmax_outputs is not None:
+            output_evals = argmax_outputs[0]
+            weights = np.zeros((len(positions), len(output_evals)), dtype=np.float64)
+            for column, (_node, _activation, _aggregation, _bias, _response, links) in enumerate(output_evals):
+                for i, w in links:
+                    weights[positions[i], column] += w
+            output_sums = (
+                np.array([node_eval[3] for node_eval in output_evals], dtype=np.float64),
+                np.array([node_eval[4] for node_eval in output_evals], dtype=np.float64),
+                weights,
+                get_activation_by_scalar(output_evals[0][1]).vectorized,
+            )
+
+        self._batch_kernels[argmax] = (
+            list(positions),
+            np.array([positions[key] for key in self.input_nodes], dtype=np.intp),
+            np.array([positions[key] for key in self.output_nodes], dtype=np.intp),
+            groups,
+            output_sums,
+        )
+        return self._batch_kernels[argmax]
+
+    @staticmethod
+    def create(genome: Genome):
+        """
+        Receives a genome and returns its phenotype (a RecurrentNetwork).
+        Only the effective topology of the genome is evaluated, see neat.nn.pruning.
+        """
+        topology = get_effective_topology(genome)
         node_evals = []
-        for node_key, inputs in node_inputs.items():
+        for node_key, inputs in topology.node_inputs.items():
             node = genome.nodes[node_key]
-            node_evals.append((node_key, node.bias, inputs))
+            activation = get_activation(node.activation).scalar
+            node_evals.append((node_key, activation, sum, node.bias, 1.0, inputs))
 
-        return RecurrentNetwork(list(genome.inputs.keys()), genome.output_keys, node_evals)
+        network = RecurrentNetwork(list(genome.inputs.keys()), genome.output_keys, node_evals)
+        network.pruning_stats = topology.stats
+        return network
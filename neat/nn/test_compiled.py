@@ -0,0 +1,59 @@
+import pickle
+import random
+
+from neat.genetics.genes import NodeGene, ConnectionGene, NodeType
+from neat.genetics.genome import Genome
+from neat.nn.compiled import CompiledNetwork, get_source
+from neat.nn.recurrent import RecurrentNetwork
+
+
+def get_random_genome(seed: int, num_inputs: int = 4, num_outputs: int = 3, num_hidden: int = 6) -> Genome:
+    """Random genome with cycles, disabled connections and several activation functions."""
+    rng = random.Random(seed)
+    input_keys = list(range(-num_inputs, 0))
+    output_keys = list(range(num_outputs))
+    inputs = dict((key, NodeGene(key, NodeType.SENSOR, 0.0)) for key in input_keys)
+    nodes = dict((key, NodeGene(key, NodeType.OUTPUT, rng.gauss(0.0, 1.0))) for key in output_keys)
+    for key in range(num_outputs, num_outputs + num_hidden):
+        nodes[key] = NodeGene(key, NodeType.HIDDEN, rng.gauss(0.0, 1.0), rng.choice(["sigmoid", "tanh", "relu"]))
+
+    connections = {}
+    for innovation in range(30):
+        key = (rng.choice(input_keys + list(nodes)), rng.choice(list(nodes)))
+        connections[key] = ConnectionGene(*key, rng.gauss(0.0, 2.0), rng.random() < 0.9, innovation)
+    return Genome(seed, inputs, output_keys, nodes, connections)
+
+
+def test_matches_recurrent():
+    for seed in range(20):
+        genome = get_random_genome(seed)
+        recurrent = RecurrentNetwork.create(genome)
+        compiled = CompiledNetwork.create(genome)
+        rng = random.Random(seed)
+        for _ in range(5):
+            inputs = [rng.gauss(0.0, 3.0) for _ in range(4)]
+            assert compiled.activate(inputs) == recurrent.activate(inputs)
+
+        compiled.reset()
+        recurrent.reset()
+        assert compiled.activate([0.5] * 4) == recurrent.activate([0.5] * 4)
+
+
+def test_pickle():
+    genome = get_random_genome(1)
+    compiled = CompiledNetwork.create(genome)
+    compiled.activate([0.1, 0.2, 0.3, 0.4])
+    copy = pickle.loads(pickle.dumps(compiled))
+    assert copy.activate([0.4, 0.3, 0.2, 0.1]) == compiled.activate([0.4, 0.3, 0.2, 0.1])
+
+
+def test_unconnected():
+    network = RecurrentNetwork([], [0], [])
+    assert "return (), [0.0]" in get_source(network)
+    assert CompiledNetwork(network).activate([]) == [0.0]
+
+
+if __name__ == '__main__':
+    test_matches_recurrent()
+    test_pickle()
+    test_unconnected()
@@ -0,0 +1,84 @@
+from neat.genetics.genes import NodeGene, ConnectionGene, NodeType
+from neat.genetics.genome import Genome
+from neat.nn.feed_forward import FeedForwardNetwork
+from neat.nn.recurrent import RecurrentNetwork
+
+
+def assert_almost_equal(x, y, tol):
+    assert abs(x - y) < tol, "{!r} !~= {!r}".format(x, y)
+
+
+def get_genome() -> Genome:
+    """Inputs 0 and 1, outputs 2 and 3 and hidden nodes 4 and 5 (in two layers)."""
+    inputs = {0: NodeGene(0, NodeType.SENSOR, 0.0), 1: NodeGene(1, NodeType.SENSOR, 0.0)}
+    nodes = {
+        2: NodeGene(2, NodeType.OUTPUT, 0.1),
+        3: NodeGene(3, NodeType.OUTPUT, -0.2),
+        4: NodeGene(4, NodeType.HIDDEN, 0.3),
+        5: NodeGene(5, NodeType.HIDDEN, -0.4),
+    }
+    connections = {}
+    for innovation, (in_key, out_key, weight, enabled) in enumerate([
+        (0, 2, 0.5, True),
+        (1, 2, -1.0, False),
+        (0, 4, 1.5, True),
+        (1, 4, -0.7, True),
+        (4, 5, 0.9, True),
+        (5, 2, 2.0, True),
+        (4, 3, -1.2, True),
+        (1, 3, 0.4, True),
+    ]):
+        connections[in_key, out_key] = ConnectionGene(in_key, out_key, weight, enabled, innovation)
+    return Genome(1, inputs, [2, 3], nodes, connections)
+
+
+def test_layers():
+    network = FeedForwardNetwork.create(get_genome())
+    assert [len(positions) for positions, _b, _s, _w, _a in network.layers] == [1, 2, 1]
+
+
+def test_matches_recurrent():
+    """Acyclic recurrent network converges to the feed-forward result when given the same input repeatedly."""
+    genome = get_genome()
+    feed_forward = FeedForwardNetwork.create(genome)
+    recurrent = RecurrentNetwork.create(genome)
+
+    for inputs in ([0.2, -0.3], [1.0, 0.5]):
+        result = feed_forward.activate(inputs)
+        for _ in range(4):
+            expected = recurrent.activate(inputs)
+        for x, y in zip(result, expected):
+            assert_almost_equal(x, y, 1e-12)
+
+
+def test_activation_groups():
+    """Nodes of a layer with different activation functions are evaluated in separate groups."""
+    genome = get_genome()
+    genome.nodes[3].activation = "tanh"
+    genome.nodes[4].activation = "relu"
+    feed_forward = FeedForwardNetwork.create(genome)
+    recurrent = RecurrentNetwork.create(genome)
+    assert [len(positions) for positions, _b, _s, _w, _a in feed_forward.layers] == [1, 1, 1, 1]
+
+    inputs = [0.2, -0.3]
+    result = feed_forward.activate(inputs)
+    for _ in range(4):
+        expected = recurrent.activate(inputs)
+    for x, y in zip(result, expected):
+        assert_almost_equal(x, y, 1e-12)
+
+
+def test_cycle_raises():
+    genome = get_genome()
+    genome.connections[5, 4] = ConnectionGene(5, 4, 1.0, True, 100)
+    try:
+        FeedForwardNetwork.create(genome)
+    except ValueError:
+        return
+    assert False, "Expected ValueError"
+
+
+if __name__ == '__main__':
+    test_layers()
+    test_matches_recurrent()
+    test_cycle_raises()
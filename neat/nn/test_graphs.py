@@ -0,0 +1,85 @@
+from random import Random
+
+from neat.nn.graphs import creates_cycle, required_for_output, feed_forward_layers
+
+
+def reference_creates_cycle(connections, test):
+    """Straightforward fixed-point version for comparison."""
+    i, o = test
+    if i == o:
+        return True
+    visited = {o}
+    while True:
+        num_added = 0
+        for a, b in connections:
+            if a in visited and b not in visited:
+                if b == i:
+                    return True
+                visited.add(b)
+                num_added += 1
+        if num_added == 0:
+            return False
+
+
+def reference_feed_forward_layers(inputs, outputs, connections):
+    """Straightforward fixed-point version for comparison."""
+    required = required_for_output(inputs, outputs, connections)
+    layers = []
+    s = set(inputs)
+    while 1:
+        c = set(b for (a, b) in connections if a in s and b not in s)
+        t = set()
+        for n in c:
+            if n in required and all(a in s for (a, b) in connections if b == n):
+                t.add(n)
+        if not t:
+            break
+        layers.append(t)
+        s = s.union(t)
+    return layers
+
+
+def get_random_acyclic_connections(rng, num_inputs, num_outputs, num_hidden, num_connections):
+    """Random DAG where connections only go from lower to higher rank (hidden nodes are ranked between)."""
+    inputs = list(range(-num_inputs, 0))
+    outputs = list(range(num_outputs))
+    hidden = list(range(num_outputs, num_outputs + num_hidden))
+    order = inputs + hidden + outputs
+    connections = set()
+    for _ in range(num_connections):
+        i = rng.randrange(len(order) - 1)
+        j = rng.randrange(max(i + 1, num_inputs), len(order))
+        connections.add((order[i], order[j]))
+    return inputs, outputs, sorted(connections)
+
+
+def test_required_for_output():
+    connections = [(-1, 2), (2, 0), (-2, 3), (3, 4), (5, 0)]
+    assert required_for_output([-1, -2], [0], connections) == {0, 2, 5}
+
+
+def test_creates_cycle():
+    connections = [(-1, 1), (1, 2), (2, 0)]
+    assert creates_cycle(connections, (0, 1))
+    assert creates_cycle(connections, (2, 2))
+    assert not creates_cycle(connections, (1, 0))
+    assert not creates_cycle(connections, (-1, 0))
+
+
+def test_matches_reference_on_random_graphs():
+    rng = Random(1)
+    for _ in range(50):
+        inputs, outputs, connections = get_random_acyclic_connections(rng, 4, 3, 20, 60)
+        layers = feed_forward_layers(inputs, outputs, connections)
+        assert layers == reference_feed_forward_layers(inputs, outputs, connections)
+
+        nodes = outputs + list(range(len(outputs), len(outputs) + 20))
+        for _ in range(20):
+            test = (rng.choice(nodes), rng.choice(nodes))
+            assert creates_cycle(connections, test) == reference_creates_cycle(connections, test)
+
+
+if __name__ == '__main__':
+    test_required_for_output()
+    test_creates_cycle()
+    test_matches_reference_on_random_graphs()
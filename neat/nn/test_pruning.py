@@ -0,0 +1,91 @@
+import random
+
+from neat.activations import get_activation
+from neat.genetics.genes import NodeGene, ConnectionGene, NodeType
+from neat.genetics.genome import Genome
+from neat.nn.feed_forward import FeedForwardNetwork
+from neat.nn.graphs import required_for_output
+from neat.nn.recurrent import RecurrentNetwork
+from neat.nn.test_compiled import get_random_genome
+
+
+def assert_almost_equal(x, y, tol):
+    assert abs(x - y) < tol, "{!r} !~= {!r}".format(x, y)
+
+
+def create_unpruned(genome: Genome) -> RecurrentNetwork:
+    """Keeps every enabled connection with a required endpoint, for comparison."""
+    required = required_for_output(list(genome.inputs.keys()), genome.output_keys, genome.connections)
+    node_inputs = {}
+    for conn in genome.connections.values():
+        if conn.enabled and (conn.node_out_idx in required or conn.node_in_idx in required):
+            node_inputs.setdefault(conn.node_out_idx, []).append((conn.node_in_idx, conn.weight))
+    node_evals = []
+    for key, links in node_inputs.items():
+        activation = get_activation(genome.nodes[key].activation).scalar
+        node_evals.append((key, activation, sum, genome.nodes[key].bias, 1.0, links))
+    return RecurrentNetwork(list(genome.inputs.keys()), genome.output_keys, node_evals)
+
+
+def test_matches_unpruned():
+    for seed in range(30):
+        genome = get_random_genome(seed)
+        rng = random.Random(seed)
+        for conn in genome.connections.values():
+            if rng.random() < 0.2:
+                conn.weight = 0.0
+
+        pruned = RecurrentNetwork.create(genome)
+        unpruned = create_unpruned(genome)
+        assert len(pruned.node_evals) <= len(unpruned.node_evals)
+        for _ in range(5):
+            inputs = [rng.gauss(0.0, 1.0) for _ in range(4)]
+            assert pruned.activate(inputs) == unpruned.activate(inputs)
+
+
+def get_genome() -> Genome:
+    """Inputs -1 and -2, output 0, identity node 1, dead node 2 and node 3 behind a zero weight."""
+    inputs = {-1: NodeGene(-1, NodeType.SENSOR, 0.0), -2: NodeGene(-2, NodeType.SENSOR, 0.0)}
+    nodes = {
+        0: NodeGene(0, NodeType.OUTPUT, 0.1),
+        1: NodeGene(1, NodeType.HIDDEN, 0.0, "identity"),
+        2: NodeGene(2, NodeType.HIDDEN, 0.3),
+        3: NodeGene(3, NodeType.HIDDEN, -0.4),
+    }
+    connections = {}
+    for innovation, (in_key, out_key, weight, enabled) in enumerate([
+        (-1, 0, 0.5, False),
+        (-1, 1, 1.5, True),
+        (1, 0, -0.7, True),
+        (-2, 0, 0.9, True),
+        (-2, 2, 2.0, True),  # node 2 does not reach the output
+        (-1, 3, 1.2, True),
+        (3, 0, 0.0, True),   # node 3 only reaches the output with zero weight
+    ]):
+        connections[in_key, out_key] = ConnectionGene(in_key, out_key, weight, enabled, innovation)
+    return Genome(1, inputs, [0], nodes, connections)
+
+
+def test_pruning_stats():
+    genome = get_genome()
+    recurrent = RecurrentNetwork.create(genome)
+    assert sorted(node_eval[0] for node_eval in recurrent.node_evals) == [0, 1]
+    stats = recurrent.pruning_stats
+    assert (stats.evaluated_nodes, stats.evaluated_connections, stats.collapsed_nodes) == (2, 3, 0)
+    assert (stats.disabled_connections, stats.zero_weight_connections) == (1, 1)
+    assert (stats.pruned_nodes, stats.pruned_connections) == (2, 4)
+
+    feed_forward = FeedForwardNetwork.create(genome)
+    stats = feed_forward.pruning_stats
+    assert (stats.evaluated_nodes, stats.evaluated_connections, stats.collapsed_nodes) == (1, 2, 1)
+
+    for inputs in ([0.2, -0.3], [1.0, 0.5]):
+        result = feed_forward.activate(inputs)
+        for _ in range(3):
+            expected = recurrent.activate(inputs)
+        assert_almost_equal(result[0], expected[0], 1e-12)
+
+
+if __name__ == '__main__':
+    test_matches_unpruned()
+    test_pruning_stats()
@@ -1,4 +1,9 @@
+from random import Random
+
+import numpy as np
+
 from neat import activations
+from neat.genetics.genome import Genome, WeightOptions
 from neat.nn.recurrent import RecurrentNetwork
 
 
@@ -54,6 +59,129 @@ def test_basic():
     assert result[0] == r.values[0][0]
 
 
+def get_cyclic_network() -> RecurrentNetwork:
+    """Inputs -1 and -2, outputs 0 and 1, hidden node 2 with a self-loop and a loop back from output 1."""
+    node_evals = [
+        (0, activations.sigmoid_activation, sum, 0.1, 1.0, [(-1, 0.5), (2, 1.5)]),
+        (1, activations.tanh_activation, sum, -0.2, 1.0, [(2, -1.0), (-2, 0.7)]),
+        (2, activations.sigmoid_activation, sum, 0.3, 1.0, [(-1, 1.2), (2, -0.8), (1, 0.9)]),
+    ]
+    return RecurrentNetwork([-1, -2], [0, 1], node_evals)
+
+
+def test_activate_batch_independent():
+    rng = np.random.default_rng(0)
+    inputs = rng.normal(size=(5, 3, 2))  # 5 steps of 3 independent states
+
+    batch_network = get_cyclic_network()
+    networks = [get_cyclic_network() for _ in range(3)]
+    for step_inputs in inputs:
+        result = batch_network.activate_batch(step_inputs)
+        assert result.shape == (3, 2)
+        for network, row_inputs, row_result in zip(networks, step_inputs, result):
+            expected = network.activate(row_inputs.tolist())
+            for x, y in zip(row_result, expected):
+                assert_almost_equal(x, y, 1e-12)
+
+    batch_network.reset()
+    assert batch_network.batch_values is None
+
+
+def test_activate_batch_sequence():
+    inputs = np.random.default_rng(1).normal(size=(5, 2))
+    batch_network = get_cyclic_network()
+    network = get_cyclic_network()
+
+    result = batch_network.activate_batch(inputs, independent=False)
+    assert result.shape == (5, 2)
+    for row_inputs, row_result in zip(inputs, result):
+        expected = network.activate(row_inputs.tolist())
+        for x, y in zip(row_result, expected):
+            assert_almost_equal(x, y, 1e-12)
+
+    # The sequence continues the state of activate.
+    assert batch_network.active == network.active
+    expected = network.activate([0.3, -0.1])
+    for x, y in zip(batch_network.activate([0.3, -0.1]), expected):
+        assert_almost_equal(x, y, 1e-12)
+
+
+def get_argmax_network() -> RecurrentNetwork:
+    """Identity outputs 0, 1 and 2, of which output 1 feeds back to hidden node 3."""
+    node_evals = [
+        (0, activations.identity_activation, sum, 0.1, 1.0, [(-1, 0.5), (3, 0.3)]),
+        (1, activations.identity_activation, sum, -0.2, 1.0, [(-2, 0.4), (3, -0.6)]),
+        (2, activations.identity_activation, sum, 0.05, 1.0, [(-1, -0.3), (-2, 0.2)]),
+        (3, activations.tanh_activation, sum, 0.0, 1.0, [(-1, 0.8), (1, -1.1)]),
+    ]
+    return RecurrentNetwork([-1, -2], [0, 1, 2], node_evals)
+
+
+def test_activate_argmax():
+    inputs = np.random.default_rng(2).normal(size=(20, 3, 2))
+    for create in (get_argmax_network, get_cyclic_network):
+        network = create()
+        argmax_network = create()
+        batch_network = create()
+        argmax_batch_network = create()
+        for step_inputs in inputs:
+            expected = int(np.argmax(network.activate(step_inputs[0].tolist())))
+            assert argmax_network.activate_argmax(step_inputs[0].tolist()) == expected
+
+            expected = batch_network.activate_batch(step_inputs).argmax(axis=1)
+            assert argmax_batch_network.activate_batch_argmax(step_inputs).tolist() == expected.tolist()
+
+    # The output activations are skipped, except for output 1 which feeds back.
+    node_evals, output_sums = get_argmax_network()._get_argmax_plan()
+    assert [node_eval[0] for node_eval in node_evals] == [1, 3]
+    assert get_cyclic_network()._get_argmax_plan()[1] is None
+
+
+def test_activate_argmax_activations():
+    """
+    The argmax paths match the argmax of the activated outputs for every activation function, also for sums in
+    flat or saturated regions, where e.g. relu or sigmoid outputs are ties (the first one is the argmax).
+    """
+    inputs = np.concatenate([np.linspace(-100.0, 100.0, 81), [-3.0, 0.0, 1e-3]])[:, np.newaxis]
+    for name in activations.get_activation_names():
+        activation = activations.get_activation(name)
+        # Sums -4, -3.5 and -11.5 for input -3, all three large for input 100.
+        node_evals = [
+            (0, activation.scalar, sum, -1.0, 1.0, [(-1, 1.0)]),
+            (1, activation.scalar, sum, -0.5, 1.0, [(-1, 1.0)]),
+            (2, activation.scalar, sum, -10.0, 1.0, [(-1, 0.5)]),
+        ]
+        network = RecurrentNetwork([-1], [0, 1, 2], node_evals)
+        argmax_network = RecurrentNetwork([-1], [0, 1, 2], node_evals)
+        expected = [int(np.argmax(network.activate(row.tolist()))) for row in inputs]
+        assert [argmax_network.activate_argmax(row.tolist()) for row in inputs] == expected, name
+        batch_argmax = RecurrentNetwork([-1], [0, 1, 2], node_evals).activate_batch_argmax(inputs)
+        assert batch_argmax.tolist() == expected, name
+        assert (argmax_network._get_argmax_plan()[1] is not None) == activation.monotonic, name
+
+
+def test_activate_argmax_sigmoid_genome():
+    """A genome with sigmoid outputs, like those evolved by main, skips the activation of its outputs."""
+    options = WeightOptions(0.0, 2.0, 0.03, -10.0, 10.0)
+    genome = Genome.create_new(1, 8, 80, options, options, rng=Random(0))
+    network = RecurrentNetwork.create(genome)
+    node_evals, output_sums = network._get_argmax_plan()
+    assert node_evals == [] and output_sums is not None
+
+    # Unit inputs, and large ones, for which many outputs saturate to ties.
+    rows = np.random.default_rng(3).normal(size=(40, 8))
+    inputs = np.concatenate([rows, 50.0 * rows])
+    expected = [int(np.argmax(network.activate(row.tolist()))) for row in inputs]
+    argmax_network = RecurrentNetwork.create(genome)
+    assert [argmax_network.activate_argmax(row.tolist()) for row in inputs] == expected
+    assert RecurrentNetwork.create(genome).activate_batch_argmax(inputs).tolist() == expected
+
+
 if __name__ == '__main__':
     test_unconnected()
     test_basic()
+    test_activate_batch_independent()
+    test_activate_batch_sequence()
+    test_activate_argmax()
+    test_activate_argmax_activations()
+    test_activate_argmax_sigmoid_genome()
@@ -0,0 +1,87 @@
+"""Cache of phenotypes and their accumulated fitness, keyed by the effective content of the genome."""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from neat.genetics.genome import Genome
+
+
+def get_genome_hash(genome: Genome) -> str:
+    """
+    Returns a stable hash of the genome's enabled connections, weights, biases and activation functions.
+
+    Genomes with equal hashes produce equal phenotypes, regardless of their keys, fitness or disabled connections.
+    The hash is stable across processes and runs.
+    """
+    connections = sorted(
+        (conn.node_in_idx, conn.node_out_idx, conn.weight.hex()) for conn in genome.connections.values() if conn.enabled
+    )
+    nodes = sorted((key, node.bias.hex(), node.activation) for key, node in genome.nodes.items())
+    content = (tuple(genome.inputs), tuple(genome.output_keys), tuple(nodes), tuple(connections))
+    return hashlib.blake2b(repr(content).encode(), digest_size=16).hexdigest()
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """A phenotype and the fitness accumulated for it over the evaluated episodes."""
+    phenotype: Any
+    fitness_sum: float = 0.0
+    num_episodes: int = 0
+
+    @property
+    def fitness(self) -> Optional[float]:
+        """Mean fitness over the evaluated episodes."""
+        if self.num_episodes == 0:
+            return None
+        return self.fitness_sum / self.num_episodes
+
+    def add_episodes(self, fitness_sum: float, num_episodes: int) -> None:
+        self.fitness_sum += fitness_sum
+        self.num_episodes += num_episodes
+
+
+class PhenotypeCache:
+    """
+    LRU cache of CacheEntries keyed by get_genome_hash.
+
+    Genomes carried over unchanged to the next generation (e.g. the elites) hit the cache, so their phenotype
+    need not be rebuilt. With a deterministic evaluation scenario their fitness need not be re-evaluated either,
+    otherwise the cached fitness can be topped up with new episodes.
+    """
+    __slots__ = ("_entries", "maxsize", "hits", "misses")
+
+    def __init__(self, maxsize: int = 1000):
+        assert maxsize > 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Returns the entry without counting a hit or miss or changing the order of eviction."""
+        return self._entries.get(key)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Add an entry, evicting the least recently used one if the cache is full."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
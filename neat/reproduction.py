@@ -1,8 +1,8 @@
 import sys
 from itertools import count
 from math import ceil
-from random import choice
-from typing import Callable
+from random import Random
+from typing import Callable, Optional
 
 from neat.config import NeatParams
 from neat.genetics.genome import Genome, Innovations, MutationParams, WeightOptions
@@ -23,6 +23,7 @@ class Reproduction:
         "node_counter",
         "conn_counter",
         "ancestors",
+        "rng",
     )
 
     def __init__(
@@ -30,8 +31,12 @@ class Reproduction:
         num_inputs: int,
         num_outputs: int,
         neat_params: NeatParams,
-        species_fitness_function: Callable[[list[float]], float]
+        species_fitness_function: Callable[[list[float]], float],
+        rng: Optional[Random] = None,
     ):
+        """
+        :param rng: Source of all the randomness of reproduction and mutation. A new unseeded Random if None.
+        """
         self.num_inputs = num_inputs
         self.num_outputs = num_outputs
         self.neat_params = neat_params
@@ -58,13 +63,18 @@ class Reproduction:
             neat_params.replace_bial_prob,
             weight_options=self._weight_options,
             bias_options=self._bias_options,
+            feed_forward=neat_params.feed_forward,
+            activation_default=neat_params.activation_default,
+            activation_options=neat_params.activation_options,
+            activation_mutate_prob=neat_params.activation_mutate_prob,
         )
         self.species_fitness_function = species_fitness_function
 
         self.genome_indexer = count(1)
         self.node_counter = count(num_inputs + num_outputs)
-        self.conn_counter = count(num_inputs * num_outputs)
+        self.conn_counter = count(num_inputs * num_outputs + 1)  # after the innovations of Genome.create_new
         self.ancestors: dict[int, tuple[int, int]] = {}
+        self.rng = rng if rng is not None else Random()
 
     def create_new_population(self, population_size: int) -> dict[int, Genome]:
         """Creates an entirely new population with randomized minimal genomes."""
@@ -72,7 +82,14 @@ class Reproduction:
         for _ in range(population_size):
             key = next(self.genome_indexer)
             genomes[key] = Genome.create_new(
-                key, self.num_inputs, self.num_outputs, self._weight_options, self._bias_options, 0
+                key,
+                self.num_inputs,
+                self.num_outputs,
+                self._weight_options,
+                self._bias_options,
+                0,
+                activation=self.neat_params.activation_default,
+                rng=self.rng,
             )
             self.ancestors[key] = tuple()
         return genomes
@@ -230,18 +247,19 @@ class Reproduction:
         while spawn_amount > 0:
             spawn_amount -= 1
 
-            parent_1_id, parent_1 = choice(possible_parents)
-            parent_2_id, parent_2 = choice(possible_parents)
+            parent_1_id, parent_1 = self.rng.choice(possible_parents)
+            parent_2_id, parent_2 = self.rng.choice(possible_parents)
 
             genome_id = next(self.genome_indexer)
             offspring = Genome.from_crossover(
-                genome_id, parent_1, parent_2, self.neat_params.keep_disabled_probability
+                genome_id, parent_1, parent_2, self.neat_params.keep_disabled_probability, self.rng
             )
             offspring.mutate(
                 self._mutate_params,
                 self.node_counter,
                 self.conn_counter,
-                new_innovations
+                new_innovations,
+                self.rng,
             )
             new_population[genome_id] = offspring
             self.ancestors[genome_id] = (parent_1_id, parent_2_id)
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from neat import activations
+from neat.activations import get_activation, get_activation_names, add_activation, get_activation_by_scalar
+
+
+class TestActivations(unittest.TestCase):
+    def setUp(self) -> None:
+        self.values = np.concatenate([np.linspace(-100.0, 100.0, 401), np.linspace(-2.0, 2.0, 401), [0.0, 1e-8]])
+
+    def test_vectorized_matches_scalar(self):
+        for name in get_activation_names():
+            activation = get_activation(name)
+            result = activation.vectorized(self.values)
+            self.assertEqual(result.shape, self.values.shape, name)
+            for z, y in zip(self.values, result):
+                expected = activation.scalar(float(z))
+                self.assertAlmostEqual(float(y), expected, delta=1e-12 * max(1.0, abs(expected)), msg=f"{name}({z})")
+
+    def test_add_activation(self):
+        def double(z):
+            return 2.0 * z
+
+        add_activation("double", double, lambda z: 2.0 * z)
+        # The registry is global, remove the function from it for the other tests.
+        self.addCleanup(activations._activations.pop, "double")
+        self.addCleanup(activations._activations_by_scalar.pop, double)
+        self.assertIs(get_activation("double").scalar, double)
+        self.assertEqual("double", get_activation_by_scalar(double).name)
+        self.assertRaises(ValueError, get_activation, "unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
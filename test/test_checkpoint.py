@@ -0,0 +1,115 @@
+import os
+import random
+import tempfile
+import unittest
+from dataclasses import replace
+
+from neat.checkpoint import Checkpointer, get_checkpoint_names, load_states, resume
+from neat.evolution import Evolution
+from neat.metrics import MetricsRecorder
+from neat.phenotype_cache import CacheEntry, PhenotypeCache, get_genome_hash
+from test_run_neat_evolution import get_neat_config, mock_fitness_function, mock_species_fitness_function
+
+
+def get_summary(evolution: Evolution) -> list:
+    return [
+        evolution.generation,
+        [(key, genome.fitness, sorted(genome.connections)) for key, genome in evolution.population.items()],
+        sorted(evolution.species_set.species),
+        evolution.best_genome.fitness,
+        len(evolution.species_history),
+        len(evolution.reproduction.ancestors),
+    ]
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "checkpoints")
+        random.seed(1)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_incremental_checkpoints(self):
+        evolution = Evolution(3, 2, get_neat_config(), mock_species_fitness_function)
+        checkpointer = Checkpointer(self.path, interval=1, full_interval=3)
+        evolution.run(mock_fitness_function, fitness_goal=2.0, n=5, checkpointer=checkpointer)
+        checkpointer.close()
+
+        # Checkpoints 1..5 with full ones at 1 and 4, of which the older ones are removed.
+        self.assertEqual(get_checkpoint_names(self.path), ["000004.ckpt", "000005.ckpt"])
+        full, delta = load_states(self.path)
+        self.assertTrue(full["full"])
+        self.assertEqual(delta["base"], "000004.ckpt")
+        self.assertLess(len(delta["genomes"]), len(full["genomes"]))  # the elites are not stored again
+        self.assertEqual(len(delta["species_history"]), 1)
+
+    def test_resume(self):
+        metrics = MetricsRecorder()
+        evolution = Evolution(3, 2, get_neat_config(), mock_species_fitness_function)
+        checkpointer = Checkpointer(self.path, interval=1, full_interval=2)
+        evolution.run(mock_fitness_function, fitness_goal=2.0, n=3, metrics=metrics, checkpointer=checkpointer)
+        checkpointer.close()
+
+        resumed_metrics = MetricsRecorder()
+        resumed = resume(self.path, mock_species_fitness_function, resumed_metrics)
+        self.assertEqual(get_summary(resumed), get_summary(evolution))
+        self.assertEqual(resumed_metrics.records, metrics.records)
+
+        # Both continue identically, as the random state is restored too.
+        state = random.getstate()
+        evolution.run(mock_fitness_function, fitness_goal=2.0, n=2)
+        random.setstate(state)
+        resumed.run(mock_fitness_function, fitness_goal=2.0, n=2)
+        self.assertEqual(get_summary(resumed), get_summary(evolution))
+
+    def test_resume_other_neat_params(self):
+        neat_params = get_neat_config()
+        evolution = Evolution(3, 2, neat_params, mock_species_fitness_function)
+        checkpointer = Checkpointer(self.path)
+        evolution.run(mock_fitness_function, fitness_goal=2.0, n=1, checkpointer=checkpointer)
+        checkpointer.close()
+
+        resume(self.path, mock_species_fitness_function, neat_params=neat_params)
+        other_params = replace(neat_params, population_size=neat_params.population_size + 1)
+        with self.assertRaisesRegex(ValueError, "population_size"):
+            resume(self.path, mock_species_fitness_function, neat_params=other_params)
+
+    def test_resume_phenotype_cache(self):
+        cache = PhenotypeCache()
+
+        def fitness_function(genomes):
+            for _, genome in genomes:
+                key = get_genome_hash(genome)
+                entry = cache.get(key)
+                if entry is None:
+                    entry = CacheEntry(key)
+                    cache.put(key, entry)
+                entry.add_episodes(random.random(), 1)
+                genome.fitness = entry.fitness
+
+        evolution = Evolution(3, 2, get_neat_config(), mock_species_fitness_function)
+        checkpointer = Checkpointer(self.path, phenotype_cache=cache)
+        evolution.run(fitness_function, fitness_goal=2.0, n=3, checkpointer=checkpointer)
+        checkpointer.close()
+
+        resumed_cache = PhenotypeCache()
+        resumed = resume(
+            self.path, mock_species_fitness_function, phenotype_cache=resumed_cache, create_phenotype=get_genome_hash
+        )
+        # The offspring are not evaluated yet, the elites carried over are.
+        num_restored = 0
+        for genome in resumed.population.values():
+            expected, entry = cache.peek(get_genome_hash(genome)), resumed_cache.peek(get_genome_hash(genome))
+            if expected is None:
+                self.assertIsNone(entry)
+            else:
+                self.assertEqual((expected.fitness_sum, expected.num_episodes), (entry.fitness_sum, entry.num_episodes))
+                self.assertEqual(get_genome_hash(genome), entry.phenotype)
+                num_restored += 1
+        self.assertGreater(num_restored, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
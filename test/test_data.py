@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from dataclasses import astuple
+
+import numpy as np
+import pandas as pd
+
+from microgrid_sim.data import CACHE_DIR_NAME, Dataset, DatasetRegistry, SeriesStats, load_csv_series
+
+
+class TestData(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data_folder = os.path.join(os.path.dirname(os.getcwd()), "data")
+
+    def test_load_csv_series(self):
+        path = os.path.join(self.data_folder, "wind_generation.csv")
+        data = pd.read_csv(path, delimiter=",")
+        series = load_csv_series(path, chunk_size=1000)
+        self.assertEqual(len(data), len(series))
+        for idx in (0, 1, 999, 1000, len(data) - 1):
+            self.assertEqual(float(data.iloc[idx][-1]), float(series.values[idx]))
+            self.assertEqual(int(data.iloc[idx][2].split(" ")[1].split(":")[0]), int(series.hours[idx]))
+        self.assertIsInstance(series.values.base, np.memmap)
+
+    def test_stale_cache(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "prices.csv")
+            data = pd.DataFrame({"a": ["x"], "b": ["y"], "time": ["2017-01-01 05:00:00"], "price": [1.0]})
+            data.to_csv(path, index=False)
+            self.assertEqual([1.0], load_csv_series(path).values.tolist())
+            self.assertTrue(os.path.isfile(os.path.join(folder, CACHE_DIR_NAME, "prices.csv.npy")))
+
+            times = ["2017-01-01 05:00:00", "2017-01-01 06:00:00"]
+            pd.DataFrame({"a": ["x"] * 2, "b": ["y"] * 2, "time": times, "price": [2.0, 3.0]}).to_csv(path, index=False)
+            os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+            series = load_csv_series(path)
+            self.assertEqual([2.0, 3.0], series.values.tolist())
+            self.assertEqual([5, 6], series.hours.tolist())
+
+    def test_dataset_length(self):
+        dataset = Dataset.from_directory(self.data_folder)
+        lengths = [
+            len(pd.read_csv(dataset.up_prices_file_path)),
+            len(pd.read_csv(dataset.down_prices_file_path)),
+            len(pd.read_csv(dataset.hourly_generated_energies_file_path)),
+            len(np.load(dataset.prices_and_temps_path)),
+        ]
+        self.assertEqual(min(lengths), dataset.get_length())
+
+    def test_series_stats(self):
+        dataset = Dataset.from_directory(self.data_folder)
+        data = dataset.load()
+        stats = dataset.get_series_stats()
+        self.assertAlmostEqual(float(np.mean(data.out_temps)), stats.means[0])
+        self.assertAlmostEqual(float(np.std(data.generated_energies)), stats.stds[1])
+        self.assertAlmostEqual(float(np.mean(data.up_prices)) / 1000, stats.means[2])
+        self.assertAlmostEqual(11.5, stats.means[3], delta=0.1)
+        cached = dataset.get_series_stats()  # from the cache
+        self.assertTrue(np.array_equal(stats.means, cached.means) and np.array_equal(stats.stds, cached.stds))
+        self.assertTrue(np.array_equal(SeriesStats.from_data(data).stds, cached.stds))
+
+    def test_resample(self):
+        data = Dataset.from_directory(self.data_folder).load()
+        self.assertIs(data, data.resample(1))
+        resampled = data.resample(4)
+        self.assertEqual(4 * len(data), len(resampled))
+        for idx in (0, 1, 5, 4 * len(data) - 1):
+            self.assertEqual(float(data.up_prices[idx // 4]), float(resampled.up_prices[idx]))
+            self.assertEqual(float(data.base_prices[idx // 4]), float(resampled.base_prices[idx]))
+            self.assertEqual(int(data.hours[idx // 4]), int(resampled.hours[idx]))
+        # Between the midpoints of hours 10 and 11, at 10:45, a quarter of the way
+        expected = 0.75 * float(data.out_temps[10]) + 0.25 * float(data.out_temps[11])
+        self.assertAlmostEqual(expected, float(resampled.out_temps[4 * 10 + 3]))
+        total = float(np.sum(data.generated_energies))
+        self.assertAlmostEqual(1.0, float(np.sum(resampled.generated_energies)) / total, delta=1e-6)
+        self.assertAlmostEqual(float(data.generated_energies[0]) / 4, float(resampled.generated_energies[0]))
+
+    def test_registry(self):
+        with tempfile.TemporaryDirectory() as root:
+            for site, name in [("north", "2017"), ("north", "2018"), ("south", "2017")]:
+                os.makedirs(os.path.join(root, site, name))
+                for path in astuple(Dataset.from_directory(os.path.join(root, site, name))):
+                    open(path, "w").close()
+            os.makedirs(os.path.join(root, "south", "incomplete"))
+
+            registry = DatasetRegistry.from_directory(root)
+            self.assertEqual(["north", "south"], registry.get_sites())
+            self.assertEqual(2, len(registry.get_datasets("north")))
+            self.assertEqual(3, len(registry.get_datasets()))
+            self.assertEqual(Dataset.from_directory(os.path.join(root, "south", "2017")), registry.get("south", "2017"))
+            with self.assertRaises(KeyError):
+                registry.get("south", "incomplete")
+            with self.assertRaises(ValueError):
+                registry.register("north", "2017", registry.get("north", "2017"))
+
+
+if __name__ == '__main__':
+    unittest.main()
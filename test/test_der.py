@@ -1,7 +1,7 @@
 import os
 import unittest
-import pandas as pd
 from microgrid_sim.components.der import DER
+from microgrid_sim.data import load_csv_series
 
 
 class TestDER(unittest.TestCase):
@@ -9,10 +9,10 @@ class TestDER(unittest.TestCase):
         curr_path = os.getcwd()
         parent_folder = os.path.dirname(curr_path)
         path = os.path.join(parent_folder, "data", "wind_generation.csv")
-        data = pd.read_csv(path, delimiter=",")
-        der = DER(data, 32.0)
-        for i, _ in enumerate(der._data):
+        der = DER(load_csv_series(path), 32.0)
+        for i in range(der.get_data_size()):
             self.assertIsInstance(der.get_generated_energy(i), float)
+            self.assertIn(der.get_hour_of_day(i), range(24))
 
 
 if __name__ == '__main__':
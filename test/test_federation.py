@@ -0,0 +1,71 @@
+import os
+import unittest
+
+import numpy as np
+
+from microgrid_sim.environment import Environment, get_default_microgrid_params
+from microgrid_sim.federation import Federation, LocalGrids, get_default_federation, settle
+
+
+class TestFederation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data_folder = os.path.join(os.path.dirname(os.getcwd()), "data")
+        self.actions = np.random.default_rng(0).integers(0, 80, (6, 3))
+
+    def get_environment(self, seed: int) -> Environment:
+        params = get_default_microgrid_params(self.data_folder, num_tcls=10, num_households=10)
+        return Environment(params, os.path.join(self.data_folder, "default_price_and_temperatures.npy"), 25, seed)
+
+    def test_settle(self):
+        net_energies = np.array([30.0, -10.0, 10.0, -50.0])
+        settlement = settle(net_energies, buy_price=0.05, sell_price=0.01)
+        self.assertAlmostEqual(0.0, settlement.p2p_energies.sum())
+        # The deficiencies (60) are covered pro rata by the excess (40), the rest from the main grid.
+        np.testing.assert_allclose([30.0, -20.0 / 3, 10.0, -100.0 / 3], settlement.p2p_energies)
+        np.testing.assert_allclose([0.0, -10.0 / 3, 0.0, -50.0 / 3], settlement.main_grid_energies)
+        np.testing.assert_allclose([0.9, -0.2 - 0.5 / 3, 0.3, -1.0 - 2.5 / 3], settlement.returns)
+
+        settlement = settle(net_energies, buy_price=0.05, sell_price=0.01, peer_to_peer=False)
+        np.testing.assert_allclose(net_energies, settlement.main_grid_energies)
+        np.testing.assert_allclose([0.3, -0.5, 0.1, -2.5], settlement.returns)
+
+    def test_without_peer_to_peer(self):
+        """Without P2P exchange, each grid gets the same rewards as alone."""
+        environments = [self.get_environment(seed) for seed in range(3)]
+        main_grid = environments[0].components.main_grid
+        federation = Federation(LocalGrids(environments), main_grid, 25, peer_to_peer=False)
+        alone = [self.get_environment(seed) for seed in range(3)]
+        for action_indices in self.actions:
+            states, rewards = federation.step_idx(action_indices)
+            expected = [env.step_idx(int(action_idx)) for env, action_idx in zip(alone, action_indices)]
+            self.assertEqual([state for state, _ in expected], states)
+            np.testing.assert_allclose([reward for _, reward in expected], rewards, rtol=1e-12)
+
+    def test_peer_to_peer(self):
+        federation = get_default_federation(self.data_folder, 25, 3, num_tcls=10, num_households=10, seed=1)
+        separate = get_default_federation(
+            self.data_folder, 25, 3, num_tcls=10, num_households=10, seed=1, peer_to_peer=False
+        )
+        for action_indices in self.actions:
+            _, rewards = federation.step_idx(action_indices)
+            _, separate_rewards = separate.step_idx(action_indices)
+            self.assertAlmostEqual(0.0, federation.settlement.p2p_energies.sum())
+            # P2P trades at the mid price, which is better than the main grid prices for both sides.
+            self.assertGreaterEqual(rewards.sum(), separate_rewards.sum() - 1e-9)
+
+    def test_workers(self):
+        local = get_default_federation(self.data_folder, 25, 3, num_tcls=10, num_households=10, seed=2)
+        workers = get_default_federation(
+            self.data_folder, 25, 3, num_tcls=10, num_households=10, seed=2, num_workers=2
+        )
+        try:
+            for action_indices in self.actions:
+                local_rewards = local.step_idx(action_indices)[1]
+                self.assertEqual(local_rewards.tolist(), workers.step_idx(action_indices)[1].tolist())
+            self.assertEqual(local.get_states(), workers.get_states())
+        finally:
+            workers.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import unittest
+
+import numpy as np
+
+from microgrid_sim.environment import get_default_microgrid_env
+from microgrid_sim.forecasts import Forecaster, ForecastParams
+
+
+class TestForecasts(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data_folder = os.path.join(os.path.dirname(os.getcwd()), "data")
+
+    def test_windows(self):
+        forecaster = Forecaster(np.arange(10.0) * 1000, np.arange(10.0) + 100, np.arange(10.0) - 5, ForecastParams(3))
+        self.assertEqual(7, forecaster.get_data_size())
+        self.assertEqual([2, 3, 4, 102, 103, 104, -3, -2, -1], forecaster.get_forecast(2).tolist())
+        self.assertEqual([7, 8, 9, 107, 108, 109, 2, 3, 4], forecaster.get_forecast(7).tolist())
+
+    def test_perfect_forecast(self):
+        horizon = 6
+        env = get_default_microgrid_env(self.data_folder, 25, 10, 10, seed=0, forecast=ForecastParams(horizon))
+        forecast = env.get_forecast().reshape(3, horizon)
+        states = [env.step_idx(0)[0] for _ in range(horizon)]
+        for hour, state in enumerate(states):
+            self.assertEqual(state[4], forecast[0, hour])  # up price
+            self.assertEqual(state[3], forecast[1, hour])  # generated energy
+            self.assertEqual(state[2], forecast[2, hour])  # out temperature
+
+    def test_noisy_forecast(self):
+        params = ForecastParams(24, (0.001, 10.0, 0.5))
+        env = get_default_microgrid_env(self.data_folder, 25, 10, 10, seed=0, forecast=params)
+        perfect = get_default_microgrid_env(self.data_folder, 25, 10, 10, seed=0, forecast=ForecastParams(24))
+        self.assertIs(env.get_forecast(), env.get_forecast())
+        errors = env.get_forecast() - perfect.get_forecast()
+        self.assertTrue(np.all(errors != 0.0))
+
+        env.step_idx(0)
+        snapshot = env.snapshot()
+        forecasts = [env.get_forecast().copy()]
+        for _ in range(3):
+            env.step_idx(0)
+            forecasts.append(env.get_forecast().copy())
+        env.restore(snapshot)
+        self.assertTrue(np.array_equal(forecasts[0], env.get_forecast()))
+        for forecast in forecasts[1:]:
+            env.step_idx(0)
+            self.assertTrue(np.array_equal(forecast, env.get_forecast()))
+
+        same_seed = get_default_microgrid_env(self.data_folder, 25, 10, 10, seed=0, forecast=params)
+        self.assertTrue(np.array_equal(errors + perfect.get_forecast(), same_seed.get_forecast()))
+
+    def test_data_size(self):
+        env = get_default_microgrid_env(self.data_folder, 25, 10, 10)
+        env_with_forecasts = get_default_microgrid_env(self.data_folder, 25, 10, 10, forecast=ForecastParams(24))
+        self.assertEqual(env.get_data_size() - 24, env_with_forecasts.get_data_size())
+
+
+if __name__ == '__main__':
+    unittest.main()
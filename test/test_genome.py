@@ -0,0 +1,31 @@
+import unittest
+
+from neat.evolution import Evolution
+from neat.genetics.genome import Genome, WeightOptions
+from test_run_neat_evolution import get_neat_config, mock_species_fitness_function
+
+
+class TestGenome(unittest.TestCase):
+    def test_create_new_innovation_nums(self):
+        options = WeightOptions(0.0, 1.0, 0.1, -5.0, 5.0)
+        for num_inputs, num_outputs in ((1, 1), (3, 2), (5, 4)):
+            with self.subTest(num_inputs=num_inputs, num_outputs=num_outputs):
+                genome = Genome.create_new(1, num_inputs, num_outputs, options, options)
+                innovation_nums = [conn.innovation_num for conn in genome.connections.values()]
+                self.assertEqual(num_inputs * num_outputs, len(set(innovation_nums)))
+                self.assertEqual(len(innovation_nums), len(genome.conns_by_innovation))
+
+                # The innovations of the new connections of the evolution come after those of the initial genomes.
+                evolution = Evolution(num_inputs, num_outputs, get_neat_config(), mock_species_fitness_function)
+                initial_nums = {
+                    conn.innovation_num
+                    for initial_genome in evolution.population.values()
+                    for conn in initial_genome.connections.values()
+                }
+                self.assertEqual(set(innovation_nums), initial_nums)
+                new_nums = [next(evolution.reproduction.conn_counter) for _ in range(num_inputs * num_outputs)]
+                self.assertFalse(initial_nums.intersection(new_nums))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,14 @@
 """Test that our GridV0Env runs with gym."""
 
+import os
+
 import gym
+import numpy as np
+
 import custom_envs.grid_v0
+from microgrid_sim.data import Dataset
+from microgrid_sim.forecasts import ForecastParams
+from microgrid_sim.scenarios import ScenarioGenerator
 
 
 def test_grid_v0_with_gym():
@@ -25,5 +32,54 @@ def test_grid_v0_with_gym():
         print(f"Episode: {episode}, Step count: {step_count}, Episode reward: {ep_reward}")
 
 
+def test_grid_v0_seeded_reset():
+    env = gym.make("Grid-v0", max_total_steps=24*100)
+
+    def get_rewards(seed: int) -> list[float]:
+        env.reset(seed=seed)
+        return [env.unwrapped.step_idx(action_idx)[1] for action_idx in range(0, 80, 4)]
+
+    assert get_rewards(5) == get_rewards(5)
+    assert get_rewards(5) != get_rewards(6)
+
+
+def test_grid_v0_scenarios():
+    data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
+    scenarios = ScenarioGenerator.from_dataset(Dataset.from_directory(data_path), 24 * 10, 4, seed=0)
+    env = gym.make("Grid-v0", max_total_steps=24 * 5, scenarios=scenarios)
+    for seed in range(8):
+        env.reset(seed=seed)
+        for _ in range(24):
+            env.step(env.action_space.sample())
+    assert scenarios.misses <= 4
+
+
+def test_grid_v0_forecast():
+    env = gym.make("Grid-v0", max_total_steps=24 * 5, forecast=ForecastParams(12))
+    assert env.observation_space[0].shape == (6 + 3 * 12,)
+    observation, _ = env.reset(seed=0)
+    assert observation[0].shape == (6 + 3 * 12,)
+    next_observation, _, _, _, _ = env.step(env.action_space.sample())
+    # The forecast of the next hour is the next observed up price, generated energy and out temperature.
+    assert next_observation[0][[4, 3, 2]].tolist() == observation[0][[6, 6 + 12, 6 + 24]].tolist()
+
+
+def test_grid_v0_normalize():
+    env = gym.make("Grid-v0", max_total_steps=24 * 5, forecast=ForecastParams(12), normalize=True)
+    assert env.observation_space.shape == (8 + 3 * 12,)
+    observation, _ = env.reset(seed=0)
+    assert observation.shape == (8 + 3 * 12,) and observation.dtype == np.float64
+    next_observation, _, _, _, _ = env.step(env.action_space.sample())
+    assert np.all(np.abs(next_observation) < 10.0)
+
+
+def test_grid_v0_steps_per_hour():
+    env = gym.make("Grid-v0", max_total_steps=24 * 5, steps_per_hour=4)
+    env.reset(seed=0)
+    hours = [env.unwrapped.step_idx(79)[0][2] for _ in range(12)]  # hour of day of the observations
+    counts = [hours.count(hour) for hour in dict.fromkeys(hours)]
+    assert len(counts) >= 3 and counts[1:-1] == [4] * (len(counts) - 2)
+
+
 if __name__ == "__main__":
     test_grid_v0_with_gym()
@@ -2,7 +2,17 @@ import os
 import unittest
 import numpy as np
 
-from microgrid_sim.environment import Environment
+from microgrid_sim.data import Dataset
+from microgrid_sim.environment import (
+    Environment,
+    ACTION_TABLE,
+    get_actions_from_indices,
+    get_default_microgrid_env,
+    get_default_microgrid_params,
+    get_microgrid_env,
+)
+from microgrid_sim.forecasts import ForecastParams
+from microgrid_sim.profiling import ProfiledComponent
 
 
 class TestMicrogridEnvironment(unittest.TestCase):
@@ -71,6 +81,114 @@ class TestMicrogridEnvironment(unittest.TestCase):
         print(f"    Hour of day:           {state[7]}")
         print(f"reward: {reward}")
 
+    def test_action_table(self):
+        """The flat action index must match the decoding of MultiDiscrete([4, 5, 2, 2]) sub actions."""
+        idx = 0
+        for tcl_action in range(4):
+            for price_action in range(5):
+                for def_action in range(2):
+                    for exc_action in range(2):
+                        expected = [tcl_action, price_action - 2, def_action, exc_action]
+                        self.assertEqual(expected, ACTION_TABLE[idx].tolist())
+                        idx += 1
+        actions = get_actions_from_indices(np.array([0, 79, 27]))
+        self.assertEqual([[0, -2, 0, 0], [3, 2, 1, 1], [1, -1, 1, 1]], actions.tolist())
+
+    def test_step_idx(self):
+        data_folder = os.path.join(os.path.dirname(os.getcwd()), "data")
+        env = get_default_microgrid_env(data_folder, 25)
+        state, reward = env.step_idx(79)
+        self.assertEqual(8, len(state))
+        self.assertIsInstance(reward, float)
+
+    def test_seeded(self):
+        data_folder = os.path.join(os.path.dirname(os.getcwd()), "data")
+
+        def get_rewards(seed: int) -> list[float]:
+            env = get_default_microgrid_env(data_folder, 25, num_tcls=10, num_households=10, seed=seed)
+            return [env.step_idx(action_idx)[1] for action_idx in (79, 0, 27, 42, 5)]
+
+        self.assertEqual(get_rewards(3), get_rewards(3))
+        self.assertNotEqual(get_rewards(3), get_rewards(4))
+
+    def test_snapshot_restore(self):
+        data_folder = os.path.join(os.path.dirname(os.getcwd()), "data")
+        for model in ("device", "aggregate"):
+            with self.subTest(model):
+                params = get_default_microgrid_params(data_folder, num_tcls=10, num_households=10)
+                params["tcl_params"]["model"] = model
+                env = Environment(params, os.path.join(data_folder, "default_price_and_temperatures.npy"), 25, 0)
+                for action_idx in (79, 40, 79):
+                    env.step_idx(action_idx)
+                snapshot = env.snapshot()
+
+                actions = [0, 79, 27, 79, 42, 5, 79, 79]
+                expected = [env.step_idx(action_idx) for action_idx in actions]
+                for _ in range(2):
+                    env.restore(snapshot)
+                    self.assertEqual(expected, [env.step_idx(action_idx) for action_idx in actions])
+
+    def test_normalized_observation(self):
+        data_folder = os.path.join(os.path.dirname(os.getcwd()), "data")
+        dataset = Dataset.from_directory(data_folder)
+        stats = dataset.get_series_stats()
+        env = get_microgrid_env(dataset, 25, 10, 10, seed=0, forecast=ForecastParams(4), normalization=stats)
+        state, _ = env.step_idx(79)
+        observation = env.get_normalized_observation(state)
+        self.assertEqual((8 + 3 * 4,), observation.shape)
+        self.assertEqual(np.float64, observation.dtype)
+
+        means, stds = env.get_observation_stats(stats)
+        expected = (np.concatenate((np.array(state, dtype=float), env.get_forecast())) - means) / stds
+        self.assertTrue(np.allclose(expected, observation))
+        self.assertAlmostEqual((state[3] - stats.means[1]) / stats.stds[1], observation[3])
+        self.assertAlmostEqual((env.get_forecast()[4] - stats.means[1]) / stats.stds[1], observation[8 + 4])
+
+        # Over the data, the time series values are normalized to zero mean and unit variance
+        data = dataset.load()
+        temps = (np.asarray(data.out_temps) - means[2]) / stds[2]
+        self.assertAlmostEqual(0.0, float(np.mean(temps)))
+        self.assertAlmostEqual(1.0, float(np.std(temps)))
+
+    def test_steps_per_hour(self):
+        data_folder = os.path.join(os.path.dirname(os.getcwd()), "data")
+        dataset = Dataset.from_directory(data_folder)
+        hourly = get_microgrid_env(dataset, 25, 10, 10, seed=0)
+        env = get_microgrid_env(dataset, 4 * 25, 10, 10, seed=0, steps_per_hour=4)
+        self.assertEqual(4 * hourly.get_data_size(), env.get_data_size())
+        self.assertAlmostEqual(hourly._tcl_energies[3] / 4, env._tcl_energies[3])
+        self.assertEqual(hourly.components.ess.energy, env.components.ess.energy)
+        self.assertEqual(250.0 / 4, env.components.ess._max_charge_power)
+        self.assertAlmostEqual(hourly.get_state()[5] / 4, env.get_state()[5])
+
+        states = [env.step_idx(79)[0] for _ in range(8)]
+        hours = [hourly.components.get_hour_of_day(25)] * 4 + [hourly.components.get_hour_of_day(26)] * 4
+        self.assertEqual(hours, [state[7] for state in states])
+        self.assertEqual(hourly.step_idx(79)[0][4], states[0][4])
+
+        stats = dataset.get_series_stats()
+        means, stds = env.get_observation_stats(stats)
+        self.assertAlmostEqual(stats.means[1] / 4, means[3])
+        self.assertAlmostEqual(stats.stds[1] / 4, stds[3])
+
+    def test_profiling(self):
+        data_folder = os.path.join(os.path.dirname(os.getcwd()), "data")
+        env = get_default_microgrid_env(data_folder, 25)
+        with env.profiling() as profiler:
+            env.step_idx(79)
+            env.step_idx(0)
+            # The timing wrappers are created once per method.
+            ess = env.components.ess
+            self.assertIs(ess.charge, ess.charge)
+        breakdown = profiler.get_breakdown()
+        self.assertEqual((2, 2), (breakdown["tcl_aggregator.allocate_energy"][1], breakdown["get_state"][1]))
+        self.assertIn("households_manager.get_consumption_and_profit", breakdown)
+        self.assertTrue(any(key.startswith("main_grid.get_") for key in breakdown))
+
+        env.step_idx(0)
+        self.assertEqual(2, profiler.get_breakdown()["get_state"][1])
+        self.assertNotIsInstance(env.components.ess, ProfiledComponent)
+
 
 if __name__ == '__main__':
     unittest.main()
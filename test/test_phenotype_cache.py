@@ -0,0 +1,47 @@
+import unittest
+from copy import deepcopy
+
+from neat.genetics.genome import Genome, WeightOptions
+from neat.phenotype_cache import PhenotypeCache, CacheEntry, get_genome_hash
+
+
+class TestPhenotypeCache(unittest.TestCase):
+    def setUp(self) -> None:
+        options = WeightOptions(0.0, 1.0, 0.1, -5.0, 5.0)
+        self.genome = Genome.create_new(1, 3, 2, options, options)
+
+    def test_genome_hash(self):
+        other = deepcopy(self.genome)
+        other.key = 2
+        other.fitness = 1.0
+        self.assertEqual(get_genome_hash(self.genome), get_genome_hash(other))
+
+        conn = next(iter(other.connections.values()))
+        conn.weight += 0.5
+        self.assertNotEqual(get_genome_hash(self.genome), get_genome_hash(other))
+
+        conn.weight -= 0.5
+        conn.enabled = False
+        self.assertNotEqual(get_genome_hash(self.genome), get_genome_hash(other))
+
+    def test_lru_eviction_and_counters(self):
+        cache = PhenotypeCache(maxsize=2)
+        cache.put("a", CacheEntry("phenotype a"))
+        cache.put("b", CacheEntry("phenotype b"))
+        self.assertIsNotNone(cache.get("a"))
+        cache.put("c", CacheEntry("phenotype c"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual("phenotype a", cache.get("a").phenotype)
+        self.assertEqual(2, len(cache))
+        self.assertEqual((2, 1), (cache.hits, cache.misses))
+
+    def test_entry_fitness(self):
+        entry = CacheEntry(None)
+        self.assertIsNone(entry.fitness)
+        entry.add_episodes(3.0, 2)
+        entry.add_episodes(1.0, 2)
+        self.assertEqual(1.0, entry.fitness)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,12 @@
 import unittest
-from itertools import count
+from collections import deque
 from unittest.mock import patch
 from microgrid_sim.components.price_responsive import PriceResponsiveLoad
 
 
 class TestPriceResponsive(unittest.TestCase):
     def setUp(self) -> None:
-        self.price_resp = PriceResponsiveLoad(0.0, 0.5, 3)
+        self.price_resp = PriceResponsiveLoad(0.5, 3)
 
     def test_execute_load(self):
         cases = [
@@ -18,25 +18,50 @@ class TestPriceResponsive(unittest.TestCase):
         ]
         for case in cases:
             with self.subTest(case["case"]):
-                with patch("microgrid_sim.components.price_responsive.random", return_value=case["rand_out"]):
+                with patch.object(self.price_resp.rng, "random", return_value=case["rand_out"]):
                     res = self.price_resp._execute_load(case["load"], case["l_time"], case["c_time"], case["price"])
                 self.assertEqual(res, case["res"])
 
     def test_get_load(self):
         """Just one simple case for this one."""
-        self.price_resp._timestep_counter = count(4)
-        self.price_resp._shifted_loads = {
-            1: -1.0,
-            2: 1.0,
-            3: -1.0,
-        }
-        with patch("microgrid_sim.components.price_responsive.random", return_value=0.5):
-            load = self.price_resp.get_load(3.0, -2)
+        self.price_resp._shifted_loads.extend([(1, -1.0), (2, 1.0), (3, -1.0)])
+        with patch.object(self.price_resp.rng, "random", return_value=0.5):
+            load = self.price_resp.get_load(3.0, -2, 4)
         self.assertEqual(7.0, load)
-        self.assertIn(1, self.price_resp._shifted_loads)
-        self.assertNotIn(2, self.price_resp._shifted_loads)
-        self.assertIn(3, self.price_resp._shifted_loads)
-        self.assertEqual(-3.0, self.price_resp._shifted_loads[4])
+        self.assertEqual(deque([(1, -1.0), (3, -1.0), (4, -3.0)]), self.price_resp._shifted_loads)
+
+    def test_due_loads(self):
+        """Loads 2 * patience timesteps old are executed without drawing random numbers."""
+        self.price_resp._shifted_loads.extend([(1, 1.0), (5, 2.0)])
+        with patch.object(self.price_resp.rng, "random", return_value=0.99) as mock_random:
+            load = self.price_resp.get_load(3.0, 0, 7)
+        self.assertEqual(4.0, load)
+        self.assertEqual(1, mock_random.call_count)
+        self.assertEqual(deque([(5, 2.0)]), self.price_resp._shifted_loads)
+
+    def test_separate_clocks(self):
+        """Each load only sees the timesteps it is given, not the steps of the other loads."""
+        other = PriceResponsiveLoad(0.5, 3)
+        for timestep in range(10, 20):
+            other.get_load(1.0, 2, timestep)
+        self.price_resp.get_load(2.0, 2, 0)
+        with patch.object(self.price_resp.rng, "random", return_value=0.5):
+            load = self.price_resp.get_load(1.0, 0, 1)
+        self.assertEqual(1.0, load)
+        self.assertEqual(deque([(0, 2.0)]), self.price_resp._shifted_loads)
+
+    def test_steps_per_hour(self):
+        """With 4 timesteps per hour, the loads shifted in the same hour are pending as one load."""
+        price_resp = PriceResponsiveLoad(0.5, 3 * 4, steps_per_hour=4)
+        for timestep in range(8, 14):
+            price_resp.get_load(1.0, 2, timestep)
+        self.assertEqual(deque([(8, 4.0), (12, 2.0)]), price_resp._shifted_loads)
+
+        # The hourly probability 0.5 + 1 / 3 of executing a load is 1 - (1 / 6) ** (1 / 4) ~ 0.36 per timestep.
+        with patch.object(price_resp.rng, "random", return_value=0.35):
+            self.assertTrue(price_resp._execute_load(1.0, 0, 4, -1))
+        with patch.object(price_resp.rng, "random", return_value=0.37):
+            self.assertFalse(price_resp._execute_load(1.0, 0, 4, -1))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,80 @@
+import os
+import unittest
+
+import numpy as np
+
+from microgrid_sim.components.pricing import (
+    BatchRollingPricing, PricingManager, RollingPricingManager, get_pricing_manager
+)
+from microgrid_sim.environment import Environment, get_default_microgrid_params
+
+
+class TestPricing(unittest.TestCase):
+    def test_cumulative(self):
+        manager = PricingManager(over_pricing_threshold=4)
+        levels = [manager.validate_price_level(level, 0.05) for level in (2, 2, 1, 2, -1, 2)]
+        self.assertEqual([2, 2, 1, 0, 0, 0], levels)
+        self.assertEqual(5, manager.get_pricing_counter())
+
+    def test_rolling(self):
+        # The window is over-priced by levels_sum * 0.01 / prices_sum, which may be at most 5 %
+        manager = RollingPricingManager(price_interval=0.01, max_over_price=0.05, window=3)
+        cases = [
+            {"case": "within the limit", "level": 2, "price": 0.5, "expected": 2, "counter": 2},
+            {"case": "over the limit", "level": 2, "price": 0.1, "expected": 0, "counter": 2},  # 0.04 / 0.6
+            {"case": "no price level", "level": 0, "price": 0.5, "expected": 0, "counter": 2},
+            {"case": "first hour out of the window", "level": 2, "price": 0.5, "expected": 2, "counter": 2},
+            {"case": "discount", "level": -2, "price": 0.1, "expected": -2, "counter": 0},
+        ]
+        for case in cases:
+            with self.subTest(case["case"]):
+                self.assertEqual(case["expected"], manager.validate_price_level(case["level"], case["price"]))
+                self.assertEqual(case["counter"], manager.get_pricing_counter())
+
+    def test_batch_equals_scalar(self):
+        rng = np.random.default_rng(0)
+        num_envs, num_steps = 16, 200
+        requested = rng.integers(-2, 3, (num_steps, num_envs))
+        prices = rng.uniform(0.0, 0.1, (num_steps, num_envs))
+        managers = [RollingPricingManager(0.0015, 0.029, 24) for _ in range(num_envs)]
+        batch = BatchRollingPricing(num_envs, 0.0015, 0.029, 24)
+        for step in range(num_steps):
+            if step == 100:
+                batch_state = batch.snapshot()
+                states = [manager.snapshot() for manager in managers]
+            self.assertEqual(
+                [m.validate_price_level(int(l), float(p)) for m, l, p in zip(managers, requested[step], prices[step])],
+                batch.validate_price_levels(requested[step], prices[step]).tolist(),
+            )
+        self.assertEqual([m.get_pricing_counter() for m in managers], batch.price_levels_sum.tolist())
+
+        batch.restore(batch_state)
+        for manager, state in zip(managers, states):
+            manager.restore(state)
+        for step in range(100, num_steps):
+            self.assertEqual(
+                [m.validate_price_level(int(l), float(p)) for m, l, p in zip(managers, requested[step], prices[step])],
+                batch.validate_price_levels(requested[step], prices[step]).tolist(),
+            )
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            get_pricing_manager("daily", 4, 0.0015, 0.029, 24)
+
+    def test_environment(self):
+        data_folder = os.path.join(os.path.dirname(os.getcwd()), "data")
+        params = get_default_microgrid_params(data_folder, num_tcls=10, num_households=10)
+        params["residential_params"]["pricing_mode"] = "rolling"
+        env = Environment(params, os.path.join(data_folder, "default_price_and_temperatures.npy"), 25, 0)
+        counters = [env.step_idx(79)[0][6] for _ in range(48)]  # always the highest price level
+        self.assertEqual(max(counters), max(counters[24:]))  # no longer growing after the first day
+        self.assertLess(max(counters), 2 * 24)
+
+        snapshot = env.snapshot()
+        expected = [env.step_idx(action_idx) for action_idx in (79, 0, 79)]
+        env.restore(snapshot)
+        self.assertEqual(expected, [env.step_idx(action_idx) for action_idx in (79, 0, 79)])
+
+
+if __name__ == '__main__':
+    unittest.main()
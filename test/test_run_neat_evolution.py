@@ -1,8 +1,12 @@
+import io
+import json
 from random import random
 
 from neat.config import NeatParams
 from neat.evolution import Evolution
 from neat.genetics.genome import Genome
+from neat.metrics import MetricsRecorder
+from neat.nn.feed_forward import FeedForwardNetwork
 
 
 def mock_fitness_function(genomes: list[tuple[int, Genome]]) -> None:
@@ -22,9 +26,8 @@ def mock_species_fitness_function(species_fitnesses: list[float]) -> float:
     return sum(species_fitnesses) / len(species_fitnesses)
 
 
-def test_run_neat_evolution():
-    """Test that the neat algorithm runs properly"""
-    neat_config = NeatParams(
+def get_neat_config(feed_forward: bool = False) -> NeatParams:
+    return NeatParams(
         population_size=20,
 
         repro_survival_rate=0.1,
@@ -55,9 +58,62 @@ def test_run_neat_evolution():
         bias_max_adjust=0.5,
         bias_min_val=-10.0,
         bias_max_val=10.0,
+
+        feed_forward=feed_forward,
     )
-    evolution = Evolution(2, 3, neat_config, mock_species_fitness_function)
+
+
+def test_run_neat_evolution():
+    """Test that the neat algorithm runs properly"""
+    evolution = Evolution(2, 3, get_neat_config(), mock_species_fitness_function)
+    evolution.run(mock_fitness_function, fitness_goal=2.0, n=10)
+
+
+def test_run_neat_evolution_feed_forward():
+    """Test that all genomes stay acyclic when cycles are forbidden"""
+    evolution = Evolution(2, 3, get_neat_config(feed_forward=True), mock_species_fitness_function)
     evolution.run(mock_fitness_function, fitness_goal=2.0, n=10)
+    for genome in evolution.population.values():
+        network = FeedForwardNetwork.create(genome)
+        assert len(network.activate([0.5, -0.5])) == 3
+
+
+def test_run_neat_evolution_with_metrics():
+    """Test that a record is emitted for each generation"""
+    output = io.StringIO()
+    metrics = MetricsRecorder(output)
+    evolution = Evolution(2, 3, get_neat_config(), mock_species_fitness_function)
+    evolution.run(mock_fitness_function, fitness_goal=2.0, n=5, metrics=metrics)
+
+    lines = output.getvalue().splitlines()
+    assert len(lines) == len(metrics.records) == 5
+    record = json.loads(lines[-1])
+    assert record["generation"] == 4
+    assert record["population_size"] == metrics.records[-1].population_size
+    assert record["env_steps"] is None
+    assert record["distance_computations"] > 0
+    assert 0.0 <= record["distance_cache_hit_rate"] <= 1.0
+    assert metrics.get_total_time("evaluation") >= 0.0
+
+
+def weight_sum_fitness_function(genomes: list[tuple[int, Genome]]) -> None:
+    """A deterministic fitness function, the sum of the enabled weights."""
+    for (_, genome) in genomes:
+        genome.fitness = sum(conn.weight for conn in genome.connections.values() if conn.enabled)
+
+
+def test_run_neat_evolution_seeded():
+    """Test that evolutions with the same seed evolve the same genomes"""
+    def get_population(seed: int) -> list:
+        evolution = Evolution(2, 3, get_neat_config(), mock_species_fitness_function, seed=seed)
+        evolution.run(weight_sum_fitness_function, fitness_goal=1e9, n=5)
+        return [
+            (key, genome.fitness, [(k, c.weight, c.enabled) for k, c in genome.connections.items()])
+            for key, genome in evolution.population.items()
+        ]
+
+    assert get_population(7) == get_population(7)
+    assert get_population(7) != get_population(8)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+import os
+import unittest
+
+import numpy as np
+
+from microgrid_sim.data import Dataset
+from microgrid_sim.environment import Environment, get_microgrid_params
+from microgrid_sim.scenarios import ScenarioGenerator
+
+
+class TestScenarioGenerator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dataset = Dataset.from_directory(os.path.join(os.path.dirname(os.getcwd()), "data"))
+        self.source = self.dataset.load()
+        self.generator = ScenarioGenerator(self.source, 24 * 10, 8, seed=0, maxsize=2)
+
+    def test_blocks(self):
+        scenario = self.generator.get_scenario(3)
+        indices = self.generator.get_source_indices(3)
+        self.assertEqual(24 * 10, len(scenario))
+        self.assertTrue(np.array_equal(self.source.out_temps[indices], scenario.out_temps))
+        self.assertTrue(np.array_equal(self.source.up_prices[indices], scenario.up_prices))
+        # Blocks are shifted by whole days, so the hours of day follow the anchor
+        self.assertTrue(np.array_equal(self.source.hours[indices[0] + np.arange(24 * 10)], scenario.hours))
+        self.assertLessEqual(np.ptp(indices - np.arange(24 * 10)), 2 * 24 * 15)
+
+    def test_deterministic(self):
+        first = self.generator.get_scenario(0).generated_energies
+        for idx in (1, 2, 3):
+            self.generator.get_scenario(idx)
+        self.assertEqual(2, len(self.generator._cache))
+        self.assertTrue(np.array_equal(first, self.generator.get_scenario(0).generated_energies))
+        self.assertEqual(0, self.generator.hits)
+        self.generator.get_scenario(0)
+        self.assertEqual(1, self.generator.hits)
+
+        other = ScenarioGenerator(self.source, 24 * 10, 8, seed=1)
+        self.assertFalse(np.array_equal(first, other.get_scenario(0).generated_energies))
+        with self.assertRaises(IndexError):
+            self.generator.get_scenario(8)
+
+    def test_environment(self):
+        scenario = self.generator.get_scenario(5)
+        params = get_microgrid_params(self.dataset, num_tcls=10, num_households=10)
+        env = Environment(params, None, 0, seed=0, data=scenario)
+        self.assertEqual(len(scenario), env.get_data_size())
+        for idx in range(24):
+            state, reward = env.step_idx(idx)
+            self.assertEqual(scenario.out_temps[idx], state[2])
+            self.assertEqual(scenario.generated_energies[idx], state[3])
+            self.assertEqual(scenario.hours[idx], state[7])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from microgrid_sim.components.tcl_aggregate import AggregateTCLAggregator
+from microgrid_sim.components.tcl_aggregator import TCLAggregator, TCLParams
+
+
+class TestAggregateTCLAggregator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.out_temps = np.linspace(-10.0, 5.0, 48)
+        self.aggregate = AggregateTCLAggregator.from_params(TCLParams(1000, self.out_temps, model="aggregate"))
+
+    def test_initial_state(self):
+        self.assertEqual(1000, self.aggregate.get_number_of_tcls())
+        self.assertAlmostEqual(1000.0, self.aggregate._masses.sum())
+        self.assertAlmostEqual(0.5, self.aggregate.get_state_of_charge())
+
+    def test_on_fractions(self):
+        masses = np.zeros((self.aggregate._dynamics.in_temps.num, self.aggregate._dynamics.building_temps.num))
+        in_temps = self.aggregate._in_temps
+        masses[np.argmin(np.abs(in_temps - 18.0)), 0] = 2.0  # forced on
+        masses[np.argmin(np.abs(in_temps - 20.0)), 0] = 4.0
+        masses[np.argmin(np.abs(in_temps - 22.0)), 0] = 4.0
+        masses[np.argmin(np.abs(in_temps - 26.0)), 0] = 2.0  # forced off
+        self.aggregate._masses = masses.ravel()
+
+        cases = [
+            {"case": "no energy", "energy": 0.0, "on": [1.0, 0.0, 0.0, 0.0]},
+            {"case": "enough for four", "energy": 7.5, "on": [1.0, 0.5, 0.0, 0.0]},
+            {"case": "enough for eight", "energy": 13.5, "on": [1.0, 1.0, 0.5, 0.0]},
+            {"case": "too much energy", "energy": 100.0, "on": [1.0, 1.0, 1.0, 0.0]},
+        ]
+        for case in cases:
+            with self.subTest(case["case"]):
+                on_fractions = self.aggregate._get_on_fractions(case["energy"])
+                on = [on_fractions[np.argmin(np.abs(in_temps - temp))] for temp in (18.0, 20.0, 22.0, 26.0)]
+                self.assertEqual(case["on"], on)
+
+    def test_against_devices(self):
+        devices = TCLAggregator.from_params(TCLParams(1000, self.out_temps), np.random.default_rng(0))
+        actions = np.random.default_rng(1).integers(0, 4, len(self.out_temps))
+        device_energy = aggregate_energy = 0.0
+        for idx, action in enumerate(actions.tolist()):
+            energy = 1000 * 1.5 * action / 3
+            device_energy += devices.allocate_energy(energy, idx)
+            aggregate_energy += self.aggregate.allocate_energy(energy, idx)
+            self.assertAlmostEqual(devices.get_state_of_charge(), self.aggregate.get_state_of_charge(), delta=0.02)
+        self.assertAlmostEqual(1.0, aggregate_energy / device_energy, delta=0.02)
+        self.assertAlmostEqual(1000.0, self.aggregate._masses.sum())
+
+    def test_steps_per_hour(self):
+        """With the parameters scaled to 15 minute timesteps, the TCLs drift like with hourly timesteps."""
+        out_temps = np.zeros(6)
+        for model in ("device", "aggregate"):
+            with self.subTest(model):
+                hourly = self._get_tcl_aggregator(model, out_temps, 1)
+                quarterly = self._get_tcl_aggregator(model, out_temps, 4)
+                for hour in range(len(out_temps)):
+                    hourly.allocate_energy(0.0, hour)
+                    for idx in range(4 * hour, 4 * hour + 4):
+                        quarterly.allocate_energy(0.0, idx)
+                    self.assertAlmostEqual(hourly.get_state_of_charge(), quarterly.get_state_of_charge(), delta=0.005)
+                self.assertLess(hourly.get_state_of_charge(), 0.47)
+
+    @staticmethod
+    def _get_tcl_aggregator(model: str, out_temps: np.ndarray, steps_per_hour: int):
+        params = TCLParams(1000, np.repeat(out_temps, steps_per_hour), model=model, steps_per_hour=steps_per_hour)
+        if model == "aggregate":
+            return AggregateTCLAggregator.from_params(params)
+        return TCLAggregator.from_params(params, np.random.default_rng(0))
+
+
+if __name__ == '__main__':
+    unittest.main()